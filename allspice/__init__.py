@@ -4,31 +4,38 @@
    :end-before: Installation
 """
 
-from .allspice import (
-    AllSpice,
-)
-from .apiobject import (
-    Branch,
-    Comment,
-    Commit,
-    Content,
-    DesignReview,
-    DesignReviewReview,
-    Issue,
-    Milestone,
-    Organization,
-    Release,
-    Repository,
-    Team,
-    User,
-)
-from .exceptions import (
-    AlreadyExistsException,
-    APIError,
-    InternalServerException,
-    NotFoundException,
-    RenderException,
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .allspice import (
+        AllSpice,
+    )
+    from .apiobject import (
+        Branch,
+        Comment,
+        Commit,
+        Content,
+        DesignReview,
+        DesignReviewReview,
+        Issue,
+        Milestone,
+        Organization,
+        Release,
+        Repository,
+        Team,
+        User,
+    )
+    from .asyncallspice import (
+        AsyncAllSpice,
+    )
+    from .exceptions import (
+        AlreadyExistsException,
+        APIError,
+        InternalServerException,
+        NotFoundException,
+        RenderException,
+    )
 
 __version__ = "4.2.0"
 
@@ -36,6 +43,7 @@ __all__ = [
     "APIError",
     "AllSpice",
     "AlreadyExistsException",
+    "AsyncAllSpice",
     "Branch",
     "Comment",
     "Commit",
@@ -53,3 +61,43 @@ __all__ = [
     "Team",
     "User",
 ]
+
+# The exported names are imported when first used, so that `import allspice`
+# doesn't import requests, urllib3 and the API objects until they are needed.
+_LAZY_IMPORTS = {
+    "AllSpice": ".allspice",
+    "Branch": ".apiobject",
+    "Comment": ".apiobject",
+    "Commit": ".apiobject",
+    "Content": ".apiobject",
+    "DesignReview": ".apiobject",
+    "DesignReviewReview": ".apiobject",
+    "Issue": ".apiobject",
+    "Milestone": ".apiobject",
+    "Organization": ".apiobject",
+    "Release": ".apiobject",
+    "Repository": ".apiobject",
+    "Team": ".apiobject",
+    "User": ".apiobject",
+    "AsyncAllSpice": ".asyncallspice",
+    "AlreadyExistsException": ".exceptions",
+    "APIError": ".exceptions",
+    "InternalServerException": ".exceptions",
+    "NotFoundException": ".exceptions",
+    "RenderException": ".exceptions",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache the value, so that __getattr__ isn't called for it again.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
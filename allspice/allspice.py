@@ -1,15 +1,24 @@
+import contextvars
+import importlib
 import json
 import logging
+import math
 import sys
-from typing import Any, Dict, List, Mapping, Optional, Union
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+from urllib.parse import parse_qs, urlparse
 
 import requests
 import urllib3
 from frozendict import frozendict
-from requests.adapters import HTTPAdapter
+from requests.adapters import BaseAdapter, HTTPAdapter
 from urllib3.util import Retry
 
 from .apiobject import Organization, Repository, Team, User
+from .bulk import BulkResult, BulkSummary, run_bulk
+from .cache import CacheStore, GeneratedContentCache, cached_get
 from .exceptions import (
     AlreadyExistsException,
     APIError,
@@ -18,7 +27,10 @@ from .exceptions import (
     NotFoundException,
     NotYetGeneratedException,
 )
-from .ratelimiter import RateLimitedSession
+from .identitymap import IdentityMap
+from .metrics import RequestMetrics
+from .ratelimiter import Priority, RateLimitedSession, RateLimiter, _parse_retry_after
+from .singleflight import SingleFlight, request_key
 
 DEFAULT_RETRY = Retry(
     total=6,
@@ -39,6 +51,165 @@ DEFAULT_RETRY = Retry(
 )
 
 
+def _json_loads(backend: str) -> Callable[[bytes], Any]:
+    """
+    Get the `loads` function of a JSON backend. All of them parse bytes
+    directly, without decoding them to a str first.
+
+    :param backend: "orjson", "ujson" or "json" for the standard library, or
+        "auto" for the fastest one that is installed.
+    """
+
+    if backend not in ("auto", "orjson", "ujson", "json"):
+        raise ValueError(f"Unknown JSON backend: {backend}")
+
+    if backend != "auto":
+        return importlib.import_module(backend).loads
+    for name in ("orjson", "ujson"):
+        try:
+            return importlib.import_module(name).loads
+        except ImportError:
+            pass
+    return json.loads
+
+
+def _raise_for_get(response) -> None:
+    """
+    Raise the exception matching the status of a response to a GET request.
+
+    This accepts any response object with `status_code`, `url` and `text`
+    attributes, so that the sync and async clients map errors the same way.
+    """
+
+    if response.status_code in [200, 201]:
+        return
+    message = f"Received status code: {response.status_code} ({response.url})"
+    if response.status_code in [404]:
+        raise NotFoundException(message)
+    if response.status_code in [403]:
+        raise Exception(
+            f"Unauthorized: {response.url} - Check your permissions and try again! ({message})"
+        )
+    if response.status_code in [409]:
+        raise ConflictException(message)
+    if response.status_code in [503]:
+        raise NotYetGeneratedException(
+            message, retry_after=_parse_retry_after(response.headers.get("Retry-After"))
+        )
+    if response.status_code in [500]:
+        raise InternalServerException(message, APIError.from_json(response.text))
+    raise Exception(message)
+
+
+def _raise_for_put(logger: logging.Logger, response) -> None:
+    if response.status_code not in [200, 204]:
+        message = f"Received status code: {response.status_code} ({response.url}) {response.text}"
+        logger.error(message)
+        raise Exception(message)
+
+
+def _raise_for_delete(logger: logging.Logger, response) -> None:
+    if response.status_code not in [200, 204]:
+        message = f"Received status code: {response.status_code} ({response.url})"
+        logger.error(message)
+        raise Exception(message)
+
+
+def _raise_for_post(logger: logging.Logger, response, data: Optional[dict], headers: dict) -> None:
+    if response.status_code not in [200, 201, 202]:
+        if "already exists" in response.text or "e-mail already in use" in response.text:
+            logger.warning(response.text)
+            raise AlreadyExistsException()
+        logger.error(f"Received status code: {response.status_code} ({response.url})")
+        logger.error(f"With info: {data} ({headers})")
+        logger.error(f"Answer: {response.text}")
+        raise Exception(
+            f"Received status code: {response.status_code} ({response.url}), {response.text}"
+        )
+
+
+def _raise_for_patch(logger: logging.Logger, response, data: dict) -> None:
+    if response.status_code not in [200, 201]:
+        error_message = f"Received status code: {response.status_code} ({response.url}) {data}"
+        logger.error(error_message)
+        raise Exception(error_message)
+
+
+def _page_items(result) -> Optional[list]:
+    """
+    Get the entries of one page of a paginated response.
+
+    :return: The entries on the page, or None if the page is empty, which marks
+        the end of the listing.
+    """
+
+    if not result:
+        return None
+
+    if isinstance(result, dict):
+        if "data" in result:
+            data = result["data"]
+        elif "tree" in result:
+            data = result["tree"]
+        else:
+            raise NotImplementedError(
+                "requests_get_paginated does not know how to handle responses of this type."
+            )
+    else:
+        data = result
+
+    if data is None or len(data) == 0:
+        return None
+    return data
+
+
+def _last_page(
+    headers: Mapping,
+    result,
+    page_key: str,
+    page: int,
+    page_length: int,
+) -> Optional[int]:
+    """
+    Work out the number of the last page of a paginated listing from the
+    response to one of its pages.
+
+    AllSpice Hub sends a `Link` header with a `rel="last"` link on all but the
+    last page, and an `X-Total-Count` header with the total number of entries.
+    Git tree responses carry the total in a `total_count` field of the body
+    instead.
+
+    :param headers: The headers of the response.
+    :param result: The parsed body of the response.
+    :param page_key: The name of the query param used for the page number.
+    :param page: The number of the page this response is for.
+    :param page_length: The number of entries on this page.
+    :return: The number of the last page, or None if the response has no
+        pagination information.
+    """
+
+    link = headers.get("Link")
+    if link:
+        links = requests.utils.parse_header_links(link)
+        for entry in links:
+            if entry.get("rel") == "last":
+                query = parse_qs(urlparse(entry["url"]).query)
+                if page_key in query:
+                    return int(query[page_key][0])
+        if not any(entry.get("rel") == "next" for entry in links):
+            return page
+
+    total = headers.get("X-Total-Count")
+    if total is None and isinstance(result, dict):
+        total = result.get("total_count")
+    if total is not None:
+        # The server may clamp the requested page size, so we use the size of
+        # the page we got instead of the size we asked for.
+        return page + max(math.ceil(int(total) / page_length) - 1, 0)
+
+    return None
+
+
 class AllSpice:
     """Object to establish a session with AllSpice Hub."""
 
@@ -61,6 +232,16 @@ class AllSpice:
         ratelimiting=(100, 60),
         retry: Union[Retry, int, None] = DEFAULT_RETRY,
         use_new_schdoc_renderer: Optional[bool] = None,
+        pagination_concurrency: int = 1,
+        pagination_limit: Optional[int] = None,
+        cache: Optional[CacheStore] = None,
+        generated_cache: Optional[GeneratedContentCache] = None,
+        json_backend: str = "auto",
+        metrics: Optional[RequestMetrics] = None,
+        coalesce_requests: bool = False,
+        transport: Optional[BaseAdapter] = None,
+        lazy_parsing: bool = False,
+        identity_map: bool = False,
     ):
         """Initializing an instance of the AllSpice Hub Client
 
@@ -78,9 +259,13 @@ class AllSpice:
 
             log_level (str): The log level, by default `INFO`.
 
-            ratelimiting (tuple[int, int], None): `(max_calls, period)`,
+            ratelimiting (tuple[int, int], RateLimiter, None): `(max_calls, period)`,
                 If None, no rate limiting is applied. By default, 100 calls
-                per minute are allowed.
+                per minute are allowed. A `RateLimiter` can be passed instead
+                to configure bursts, or to share one budget between clients.
+                Pass an `AdaptiveRateLimiter` to follow the rate limit headers
+                sent by AllSpice Hub instead of a fixed rate, or a
+                `SharedRateLimiter` to share one budget between processes.
 
             retry (Retry, int, None): Set a retry policy for requests using a
                 urllib3 Retry object, an integer for the number of retries, or None
@@ -97,6 +282,66 @@ class AllSpice:
 
             use_new_schdoc_renderer (bool): Allows explicit override for using the new Altium schematic renderer. If set,
             this will take precedence over the default behavior on the AllSpice Hub instance.
+
+            pagination_concurrency (int): The default number of pages that
+                `requests_get_paginated` fetches at the same time. If greater
+                than 1, the number of pages is read from the first page and
+                the remaining pages are fetched concurrently. By default, 1,
+                i.e. pages are fetched one after another.
+
+            pagination_limit (int, None): The default page size requested by
+                `requests_get_paginated` and `requests_iter_paginated`. If
+                None, the server default is used. Hub clamps this to its
+                configured maximum.
+
+            cache (CacheStore, None): A store to cache GET responses in, such
+                as a `MemoryCache` or a `DiskCache`. Responses with an ETag or
+                Last-Modified header are stored, and requested again with
+                If-None-Match or If-Modified-Since. When the server responds
+                with 304 Not Modified, the stored response is used instead of
+                downloading it again. By default, None, i.e. nothing is cached.
+
+            generated_cache (GeneratedContentCache, None): A cache for the
+                generated JSON, SVG and project data of design files. These
+                are cached by commit, and reused without any request to the
+                server once cached. By default, None, i.e. nothing is cached.
+
+            json_backend (str): The library used to parse JSON responses:
+                "orjson", "ujson" or "json" for the standard library. By
+                default, "auto", which uses orjson or ujson if installed, and
+                the standard library otherwise. orjson can be installed with
+                `pip install py-allspice[json]`.
+
+            metrics (RequestMetrics, None): Record per endpoint counts,
+                latencies, bytes transferred, retries and rate limiting waits
+                of the requests made by this client. By default, None, i.e.
+                nothing is recorded.
+
+            coalesce_requests (bool): If True, identical GET requests made at
+                the same time by several threads share one request to the
+                server, and all of them receive its response or exception.
+                Requests are identical if they have the same endpoint, params
+                and sudo user. By default, False.
+
+            transport (BaseAdapter, None): The requests transport adapter to
+                send requests with, instead of the default one configured by
+                `retry`, which is then ignored. Pass a `ReplayTransport` to
+                serve recorded responses without a server, e.g. for offline
+                benchmarks, or a `RecordTransport` to record them. By default,
+                None.
+
+            lazy_parsing (bool): If True, fields of API objects that need to
+                be converted, such as timestamps and nested users, are kept
+                as returned by the server and only converted when first read.
+                This makes listing many objects faster when only some of
+                their fields are used. By default, False.
+
+            identity_map (bool): If True, users and organizations parsed from
+                identical data share one object, e.g. the owner of every
+                repository in a listing of an organization's repositories.
+                This saves memory and parsing time on large listings. Shared
+                objects are held weakly, and are the same instance, so
+                changing one changes all of them. By default, False.
         """
 
         self.logger = logging.getLogger(__name__)
@@ -113,11 +358,16 @@ class AllSpice:
 
         if ratelimiting is None:
             self.requests = requests.Session()
+        elif isinstance(ratelimiting, RateLimiter):
+            self.requests = RateLimitedSession(limiter=ratelimiting)
         else:
             (max_calls, period) = ratelimiting
             self.requests = RateLimitedSession(max_calls=max_calls, period=period)
 
-        if retry is not None:
+        if transport is not None:
+            self.requests.mount("https://", transport)
+            self.requests.mount("http://", transport)
+        elif retry is not None:
             adapter = HTTPAdapter(max_retries=retry)
             self.requests.mount("https://", adapter)
             self.requests.mount("http://", adapter)
@@ -139,36 +389,58 @@ class AllSpice:
             urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
         self.use_new_schdoc_renderer = use_new_schdoc_renderer
+        self.pagination_concurrency = pagination_concurrency
+        self.pagination_limit = pagination_limit
+        self.cache = cache
+        self.generated_cache = generated_cache
+        self.json_loads = _json_loads(json_backend)
+        self.metrics = metrics
+        self.lazy_parsing = lazy_parsing
+        self.identity_map = IdentityMap() if identity_map else None
+        self._single_flight = SingleFlight() if coalesce_requests else None
+        if metrics is not None and isinstance(self.requests, RateLimitedSession):
+            self.requests.on_wait = metrics.record_wait
 
     def __get_url(self, endpoint):
         url = self.url + "/api/v1" + endpoint
         self.logger.debug("Url: %s" % url)
         return url
 
+    def __request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        if self.metrics is None:
+            return self.__send(method, endpoint, **kwargs)
+        started = time.perf_counter()
+        response = self.__send(method, endpoint, **kwargs)
+        self.metrics.observe(method, endpoint, response, time.perf_counter() - started)
+        return response
+
+    def __send(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        url = self.__get_url(endpoint)
+        if method == "GET" and self.cache is not None:
+            return cached_get(self.cache, self.requests, url, kwargs["headers"], kwargs["params"])
+        return self.requests.request(method, url, **kwargs)
+
     def __get(self, endpoint: str, params: Mapping = frozendict()) -> requests.Response:
-        response = self.requests.get(self.__get_url(endpoint), headers=self.headers, params=params)
-        if response.status_code not in [200, 201]:
-            message = f"Received status code: {response.status_code} ({response.url})"
-            if response.status_code in [404]:
-                raise NotFoundException(message)
-            if response.status_code in [403]:
-                raise Exception(
-                    f"Unauthorized: {response.url} - Check your permissions and try again! ({message})"
-                )
-            if response.status_code in [409]:
-                raise ConflictException(message)
-            if response.status_code in [503]:
-                raise NotYetGeneratedException(message)
-            if response.status_code in [500]:
-                raise InternalServerException(message, APIError.from_json(response.text))
-            raise Exception(message)
+        if self._single_flight is None:
+            response = self.__request("GET", endpoint, headers=self.headers, params=params)
+        else:
+            response = self._single_flight.do(
+                request_key(endpoint, params),
+                lambda: self.__request("GET", endpoint, headers=self.headers, params=params),
+            )
+        _raise_for_get(response)
         return response
 
     @staticmethod
-    def parse_result(result) -> Dict:
-        """Parses the result-JSON to a dict."""
-        if result.text and len(result.text) > 3:
-            return json.loads(result.text)
+    def parse_result(result, loads: Callable[[bytes], Any] = json.loads) -> Dict:
+        """
+        Parses the result-JSON to a dict.
+
+        The body is parsed as bytes, which skips decoding it to a str first.
+        """
+        content = result.content
+        if len(content) > 3:
+            return loads(content)
         return {}
 
     def requests_get(self, endpoint: str, params: Mapping = frozendict(), sudo=None):
@@ -176,7 +448,7 @@ class AllSpice:
         combined_params.update(params)
         if sudo:
             combined_params["sudo"] = sudo.username
-        return self.parse_result(self.__get(endpoint, combined_params))
+        return self.parse_result(self.__get(endpoint, combined_params), self.json_loads)
 
     def requests_get_raw(self, endpoint: str, params=frozendict(), sudo=None) -> bytes:
         combined_params = {}
@@ -192,59 +464,156 @@ class AllSpice:
         sudo=None,
         page_key: str = "page",
         first_page: int = 1,
+        concurrency: Optional[int] = None,
+        limit: Optional[int] = None,
+        limit_key: str = "limit",
     ):
+        """
+        Get all entries of a paginated listing.
+
+        :param endpoint: The path to the endpoint
+        :param params: A dictionary of query params
+        :param sudo: The user to make the request as
+        :param page_key: The name of the query param used for the page number
+        :param first_page: The number of the first page
+        :param concurrency: The maximum number of pages to fetch at the same
+            time. If greater than 1, the number of pages is read from the
+            `Link`/`X-Total-Count` headers of the first page, and the
+            remaining pages are fetched concurrently. If the first page has no
+            such headers, this falls back to fetching pages one after another.
+            Defaults to `pagination_concurrency` of this client.
+        :param limit: The page size to request. Defaults to
+            `pagination_limit` of this client.
+        :param limit_key: The name of the query param used for the page size,
+            e.g. "per_page" for git trees.
+        :return: The entries of all pages, in order.
+        """
+
+        if concurrency is None:
+            concurrency = self.pagination_concurrency
+        if limit is None:
+            limit = self.pagination_limit
+
         page = first_page
         combined_params = {}
         combined_params.update(params)
+        if limit is not None:
+            combined_params[limit_key] = limit
         aggregated_result = []
-        while True:
-            combined_params[page_key] = page
-            result = self.requests_get(endpoint, combined_params, sudo)
 
-            if not result:
+        if concurrency > 1:
+            sudo_params = {"sudo": sudo.username} if sudo else {}
+            combined_params[page_key] = page
+            response = self.__get(endpoint, {**combined_params, **sudo_params})
+            result = self.parse_result(response, self.json_loads)
+            data = _page_items(result)
+            if not data:
                 return aggregated_result
+            aggregated_result.extend(data)
 
-            if isinstance(result, dict):
-                if "data" in result:
-                    data = result["data"]
-                    if len(data) == 0:
-                        return aggregated_result
-                    aggregated_result.extend(data)
-                elif "tree" in result:
-                    data = result["tree"]
-                    if data is None or len(data) == 0:
-                        return aggregated_result
-                    aggregated_result.extend(data)
-                else:
-                    raise NotImplementedError(
-                        "requests_get_paginated does not know how to handle responses of this type."
+            last_page = _last_page(response.headers, result, page_key, page, len(data))
+            if last_page is not None:
+
+                def get_page(page_number: int) -> Optional[list]:
+                    page_params = {**combined_params, **sudo_params, page_key: page_number}
+                    return _page_items(
+                        self.parse_result(self.__get(endpoint, page_params), self.json_loads)
                     )
-            else:
-                aggregated_result.extend(result)
 
+                page_numbers = range(page + 1, last_page + 1)
+                # Run each page in a copy of this context, so that the pages
+                # are fetched at the priority set by the caller.
+                contexts = [contextvars.copy_context() for _ in page_numbers]
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    for data in executor.map(
+                        lambda context, number: context.run(get_page, number),
+                        contexts,
+                        page_numbers,
+                    ):
+                        if data:
+                            aggregated_result.extend(data)
+                return aggregated_result
+
+            # Without pagination headers, fall back to fetching page by page.
+            page += 1
+
+        aggregated_result.extend(
+            self.requests_iter_paginated(
+                endpoint,
+                combined_params,
+                sudo,
+                page_key,
+                page,
+                limit=limit,
+                limit_key=limit_key,
+            )
+        )
+        return aggregated_result
+
+    def requests_iter_paginated(
+        self,
+        endpoint: str,
+        params: Mapping = frozendict(),
+        sudo=None,
+        page_key: str = "page",
+        first_page: int = 1,
+        max_items: Optional[int] = None,
+        limit: Optional[int] = None,
+        limit_key: str = "limit",
+    ) -> Iterator[Any]:
+        """
+        Iterate over the entries of a paginated listing, fetching one page at a
+        time as the entries are consumed.
+
+        Unlike `requests_get_paginated`, this does not hold all pages in memory,
+        and stops fetching pages when the caller stops iterating.
+
+        :param endpoint: The path to the endpoint
+        :param params: A dictionary of query params
+        :param sudo: The user to make the request as
+        :param page_key: The name of the query param used for the page number
+        :param first_page: The number of the first page
+        :param max_items: If set, stop after this many entries have been
+            yielded, without fetching further pages.
+        :param limit: The page size to request. Defaults to
+            `pagination_limit` of this client.
+        :param limit_key: The name of the query param used for the page size,
+            e.g. "per_page" for git trees.
+        """
+
+        if max_items is not None and max_items <= 0:
+            return
+        if limit is None:
+            limit = self.pagination_limit
+
+        page = first_page
+        combined_params = {}
+        combined_params.update(params)
+        if limit is not None:
+            combined_params[limit_key] = limit
+        yielded = 0
+        while True:
+            combined_params[page_key] = page
+            result = self.requests_get(endpoint, combined_params, sudo)
+            data = _page_items(result)
+            if not data:
+                return
+            for entry in data:
+                yield entry
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
             page += 1
 
     def requests_put(self, endpoint: str, data: Optional[dict] = None):
         if not data:
             data = {}
-        response = self.requests.put(
-            self.__get_url(endpoint), headers=self.headers, data=json.dumps(data)
-        )
-        if response.status_code not in [200, 204]:
-            message = (
-                f"Received status code: {response.status_code} ({response.url}) {response.text}"
-            )
-            self.logger.error(message)
-            raise Exception(message)
+        response = self.__request("PUT", endpoint, headers=self.headers, data=json.dumps(data))
+        _raise_for_put(self.logger, response)
 
     def requests_delete(self, endpoint: str, data: Optional[dict] = None):
-        response = self.requests.delete(
-            self.__get_url(endpoint), headers=self.headers, data=json.dumps(data)
-        )
-        if response.status_code not in [200, 204]:
-            message = f"Received status code: {response.status_code} ({response.url})"
-            self.logger.error(message)
-            raise Exception(message)
+        response = self.__request("DELETE", endpoint, headers=self.headers, data=json.dumps(data))
+        _raise_for_delete(self.logger, response)
 
     def requests_post(
         self,
@@ -277,29 +646,94 @@ class AllSpice:
             args["headers"].pop("Content-type")
             args["files"] = files
 
-        response = self.requests.post(self.__get_url(endpoint), **args)
-
-        if response.status_code not in [200, 201, 202]:
-            if "already exists" in response.text or "e-mail already in use" in response.text:
-                self.logger.warning(response.text)
-                raise AlreadyExistsException()
-            self.logger.error(f"Received status code: {response.status_code} ({response.url})")
-            self.logger.error(f"With info: {data} ({self.headers})")
-            self.logger.error(f"Answer: {response.text}")
-            raise Exception(
-                f"Received status code: {response.status_code} ({response.url}), {response.text}"
-            )
-        return self.parse_result(response)
+        response = self.__request("POST", endpoint, **args)
+        _raise_for_post(self.logger, response, data, self.headers)
+        return self.parse_result(response, self.json_loads)
 
     def requests_patch(self, endpoint: str, data: dict):
-        response = self.requests.patch(
-            self.__get_url(endpoint), headers=self.headers, data=json.dumps(data)
+        response = self.__request("PATCH", endpoint, headers=self.headers, data=json.dumps(data))
+        _raise_for_patch(self.logger, response, data)
+        return self.parse_result(response, self.json_loads)
+
+    def bulk(
+        self,
+        operations: Iterable[Callable[[], Any]],
+        concurrency: int = 8,
+        progress: Optional[Callable[[BulkResult], None]] = None,
+    ) -> BulkSummary:
+        """
+        Run many operations, such as creating issues or adding topics, with up
+        to `concurrency` of them running at the same time.
+
+        The operations share this client, so they are rate limited and
+        retried like any other request. An operation that raises an exception
+        does not stop the others; the exception is recorded in its result.
+
+        Note that the connection pool of requests keeps at most 10 connections per
+        host, so concurrency above 10 opens and closes extra connections.
+
+        :param operations: Functions taking no arguments that make the calls,
+            e.g. made with `functools.partial` or lambdas. This can be a
+            generator, which is consumed as operations finish.
+        :param concurrency: The maximum number of operations running at once.
+        :param progress: If given, called with the result of each operation
+            as it finishes.
+        :return: A summary with the result of each operation, in order.
+
+        Example:
+
+            summary = client.bulk(
+                (functools.partial(repo.add_topic, topic) for topic in topics),
+                concurrency=8,
+            )
+            for result in summary.errors:
+                print(topics[result.index], result.exception)
+        """
+
+        summary = run_bulk(operations, concurrency, progress)
+        self.logger.debug(
+            "Ran %d operations in %.2fs, %d failed",
+            len(summary.results),
+            summary.elapsed,
+            summary.failed,
         )
-        if response.status_code not in [200, 201]:
-            error_message = f"Received status code: {response.status_code} ({response.url}) {data}"
-            self.logger.error(error_message)
-            raise Exception(error_message)
-        return self.parse_result(response)
+        return summary
+
+    @contextmanager
+    def priority(self, priority: Union[Priority, int]) -> Iterator[None]:
+        """
+        Make the requests in this block at a different priority. When the
+        client is rate limited, waiting requests are sent in order of
+        priority, and in the order they were made within a priority, while
+        all of them share the one `ratelimiting` budget. This lets e.g. a user
+        waiting for a BOM skip ahead of a background crawl using the same
+        client.
+
+        This applies to requests made by the current thread, including the
+        pages fetched for it by `requests_get_paginated` and the operations
+        run for it by `bulk`. `AsyncAllSpice.priority` does the same for
+        asyncio tasks. Without rate limiting, this has no effect.
+
+        :param priority: `Priority.HIGH`, `Priority.NORMAL` or `Priority.LOW`,
+            or any int. Lower values go first. The default for requests is
+            `Priority.NORMAL`.
+
+        Example:
+
+            with client.priority(Priority.LOW):
+                for repo in organization.get_repositories():
+                    index(repo)
+
+            # Elsewhere, in another thread:
+            with client.priority(Priority.HIGH):
+                bom = generate_bom(client, repo, "Project.PrjPcb", columns)
+        """
+
+        if not isinstance(self.requests, RateLimitedSession):
+            yield
+            return
+        with self.requests.priority(priority):
+            yield
 
     def get_orgs_public_members_all(self, orgname):
         path = "/orgs/" + orgname + "/public_members"
@@ -7,13 +7,14 @@ import re
 from dataclasses import asdict, dataclass
 from datetime import datetime, timezone
 from enum import Enum
-from functools import cached_property
+from functools import cached_property, lru_cache
 from typing import (
     IO,
     Any,
     ClassVar,
     Dict,
     FrozenSet,
+    Iterator,
     List,
     Literal,
     Optional,
@@ -21,6 +22,7 @@ from typing import (
     Set,
     Tuple,
     Union,
+    overload,
 )
 
 try:
@@ -30,6 +32,7 @@ except ImportError:
 
 from .baseapiobject import ApiObject, ReadonlyApiObject
 from .exceptions import ConflictException, NotFoundException
+from .projection import list_results
 
 
 class Organization(ApiObject):
@@ -93,6 +96,8 @@ class Organization(ApiObject):
             Organization._add_read_property("name", result["username"], api_object)
         return api_object
 
+    _interned: ClassVar[bool] = True
+
     _patchable_fields: ClassVar[set[str]] = {
         "description",
         "full_name",
@@ -144,11 +149,44 @@ class Organization(ApiObject):
             raise Exception("Repository not created... (gitea: %s)" % result["message"])
         return Repository.parse_response(self.allspice_client, result)
 
-    def get_repositories(self) -> List["Repository"]:
+    @overload
+    def get_repositories(
+        self, *, fields: None = None, raw: Literal[False] = False
+    ) -> List["Repository"]: ...
+
+    @overload
+    def get_repositories(
+        self, *, fields: Sequence[str], raw: Literal[False] = False
+    ) -> List[Any]: ...
+
+    @overload
+    def get_repositories(
+        self, *, fields: None = None, raw: Literal[True]
+    ) -> List[Dict[str, Any]]: ...
+
+    def get_repositories(
+        self, *, fields: Optional[Sequence[str]] = None, raw: bool = False
+    ) -> List[Any]:
+        """
+        Get all Repositories owned by this Organization.
+
+        :param fields: If given, return a record with only these fields for
+            each repository instead, which is much cheaper than a Repository.
+            See `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each repository instead.
+        """
+
         results = self.allspice_client.requests_get_paginated(
             Organization.ORG_REPOS_REQUEST % self.username
         )
-        return [Repository.parse_response(self.allspice_client, result) for result in results]
+        return list(
+            list_results(
+                results,
+                lambda result: Repository.parse_response(self.allspice_client, result),
+                fields,
+                raw,
+            )
+        )
 
     def get_repository(self, name) -> "Repository":
         repos = self.get_repositories()
@@ -302,6 +340,8 @@ class User(ApiObject):
         api_object = cls._request(allspice_client, {"name": name})
         return api_object
 
+    _interned: ClassVar[bool] = True
+
     _patchable_fields: ClassVar[set[str]] = {
         "active",
         "admin",
@@ -374,11 +414,42 @@ class User(ApiObject):
             raise Exception("Repository not created... (gitea: %s)" % result["message"])
         return Repository.parse_response(self.allspice_client, result)
 
-    def get_repositories(self) -> List["Repository"]:
-        """Get all Repositories owned by this User."""
+    @overload
+    def get_repositories(
+        self, *, fields: None = None, raw: Literal[False] = False
+    ) -> List["Repository"]: ...
+
+    @overload
+    def get_repositories(
+        self, *, fields: Sequence[str], raw: Literal[False] = False
+    ) -> List[Any]: ...
+
+    @overload
+    def get_repositories(
+        self, *, fields: None = None, raw: Literal[True]
+    ) -> List[Dict[str, Any]]: ...
+
+    def get_repositories(
+        self, *, fields: Optional[Sequence[str]] = None, raw: bool = False
+    ) -> List[Any]:
+        """
+        Get all Repositories owned by this User.
+
+        :param fields: If given, return a record with only these fields for
+            each repository instead, which is much cheaper than a Repository.
+            See `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each repository instead.
+        """
         url = f"/users/{self.username}/repos"
         results = self.allspice_client.requests_get_paginated(url)
-        return [Repository.parse_response(self.allspice_client, result) for result in results]
+        return list(
+            list_results(
+                results,
+                lambda result: Repository.parse_response(self.allspice_client, result),
+                fields,
+                raw,
+            )
+        )
 
     def get_orgs(self) -> List[Organization]:
         """Get all Organizations this user is a member of."""
@@ -618,6 +689,51 @@ class Repository(ApiObject):
     ) -> Repository:
         return cls._request(allspice_client, {"owner": owner, "name": name})
 
+    @overload
+    @classmethod
+    def search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> list[Repository]: ...
+
+    @overload
+    @classmethod
+    def search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> list[Any]: ...
+
+    @overload
+    @classmethod
+    def search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> list[Dict[str, Any]]: ...
+
     @classmethod
     def search(
         cls,
@@ -627,7 +743,10 @@ class Repository(ApiObject):
         include_description: bool = False,
         user: Optional[User] = None,
         owner_to_prioritize: Union[User, Organization, None] = None,
-    ) -> list[Repository]:
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> list[Any]:
         """
         Search for repositories.
 
@@ -642,10 +761,121 @@ class Repository(ApiObject):
             contributes to will be searched.
         :param owner_to_prioritize: If specified, repositories owned by the
             given entity will be prioritized in the search.
+        :param fields: If given, return a record with only these fields for
+            each repository instead, which is much cheaper than a Repository.
+            See `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each repository instead.
         :returns: All repositories matching the query. If there are many
             repositories matching this query, this may take some time.
+
+        Example:
+
+            for name, updated_at in Repository.search(client, "board", fields=["name", "updated_at"]):
+                print(name, updated_at)
         """
 
+        params = cls._search_params(query, topic, include_description, user, owner_to_prioritize)
+        responses = allspice_client.requests_get_paginated(cls.REPO_SEARCH, params=params)
+
+        return list(
+            list_results(
+                responses,
+                lambda response: Repository.parse_response(allspice_client, response),
+                fields,
+                raw,
+            )
+        )
+
+    @overload
+    @classmethod
+    def iter_search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> Iterator[Repository]: ...
+
+    @overload
+    @classmethod
+    def iter_search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> Iterator[Any]: ...
+
+    @overload
+    @classmethod
+    def iter_search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> Iterator[Dict[str, Any]]: ...
+
+    @classmethod
+    def iter_search(
+        cls,
+        allspice_client,
+        query: Optional[str] = None,
+        topic: bool = False,
+        include_description: bool = False,
+        user: Optional[User] = None,
+        owner_to_prioritize: Union[User, Organization, None] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Search for repositories, yielding them page by page.
+
+        This takes the same arguments as `search`, but only fetches the next
+        page of results once the previous one has been consumed.
+
+        :param max_items: If set, stop after this many repositories.
+        """
+
+        params = cls._search_params(query, topic, include_description, user, owner_to_prioritize)
+        responses = allspice_client.requests_iter_paginated(
+            cls.REPO_SEARCH, params=params, max_items=max_items
+        )
+        yield from list_results(
+            responses,
+            lambda response: Repository.parse_response(allspice_client, response),
+            fields,
+            raw,
+        )
+
+    @staticmethod
+    def _search_params(
+        query: Optional[str],
+        topic: bool,
+        include_description: bool,
+        user: Optional[User],
+        owner_to_prioritize: Union[User, Organization, None],
+    ) -> dict:
         params = {}
 
         if query is not None:
@@ -659,9 +889,7 @@ class Repository(ApiObject):
         if owner_to_prioritize is not None:
             params["owner_to_prioritize"] = owner_to_prioritize.id
 
-        responses = allspice_client.requests_get_paginated(cls.REPO_SEARCH, params=params)
-
-        return [Repository.parse_response(allspice_client, response) for response in responses]
+        return params
 
     _patchable_fields: ClassVar[set[str]] = {
         "allow_manual_merge",
@@ -727,6 +955,22 @@ class Repository(ApiObject):
         )
         return Branch.parse_response(self.allspice_client, result)
 
+    @overload
+    def get_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> List["Issue"]: ...
+
+    @overload
     def get_issues(
         self,
         state: Literal["open", "closed", "all"] = "all",
@@ -736,7 +980,39 @@ class Repository(ApiObject):
         assignee: Optional[Union[User, str]] = None,
         since: Optional[datetime] = None,
         before: Optional[datetime] = None,
-    ) -> List["Issue"]:
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> List[Any]: ...
+
+    @overload
+    def get_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> List[Dict[str, Any]]: ...
+
+    def get_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> List[Any]:
         """
         Get all Issues of this Repository (open and closed)
 
@@ -753,9 +1029,110 @@ class Repository(ApiObject):
         :param assignee: Filter issues by the assigned user.
         :param since: Filter issues by the date they were created.
         :param before: Filter issues by the date they were created.
+        :param fields: If given, return a record with only these fields for
+            each issue instead, which is much cheaper than an Issue. See
+            `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each issue instead, e.g. to
+            fill `allspice.columns.Columns`.
         :return: A list of Issues.
         """
 
+        data = self._issues_params(state, search_query, labels, milestones, assignee, since, before)
+        results = self.allspice_client.requests_get_paginated(
+            Repository.REPO_ISSUES.format(owner=self.owner.username, repo=self.name),
+            params=data,
+        )
+        return list(list_results(results, self._parse_issue, fields, raw))
+
+    @overload
+    def iter_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> Iterator["Issue"]: ...
+
+    @overload
+    def iter_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> Iterator[Any]: ...
+
+    @overload
+    def iter_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> Iterator[Dict[str, Any]]: ...
+
+    def iter_issues(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        search_query: Optional[str] = None,
+        labels: Optional[List[str]] = None,
+        milestones: Optional[List[Union[Milestone, str]]] = None,
+        assignee: Optional[Union[User, str]] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        max_items: Optional[int] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Iterate over the Issues of this Repository, fetching them page by page.
+
+        This takes the same filters as `get_issues`, but only fetches the next
+        page of Issues once the previous one has been consumed.
+
+        :param max_items: If set, stop after this many Issues.
+        """
+
+        data = self._issues_params(state, search_query, labels, milestones, assignee, since, before)
+        results = self.allspice_client.requests_iter_paginated(
+            Repository.REPO_ISSUES.format(owner=self.owner.username, repo=self.name),
+            params=data,
+            max_items=max_items,
+        )
+        yield from list_results(results, self._parse_issue, fields, raw)
+
+    @staticmethod
+    def _issues_params(
+        state: str,
+        search_query: Optional[str],
+        labels: Optional[List[str]],
+        milestones: Optional[List[Union[Milestone, str]]],
+        assignee: Optional[Union[User, str]],
+        since: Optional[datetime],
+        before: Optional[datetime],
+    ) -> dict:
         data = {
             "state": state,
         }
@@ -779,29 +1156,58 @@ class Repository(ApiObject):
             data["since"] = Util.format_time(since)
         if before:
             data["before"] = Util.format_time(before)
+        return data
 
-        results = self.allspice_client.requests_get_paginated(
-            Repository.REPO_ISSUES.format(owner=self.owner.username, repo=self.name),
-            params=data,
-        )
+    def _parse_issue(self, result: dict) -> "Issue":
+        issue = Issue.parse_response(self.allspice_client, result)
+        # See Issue.request
+        setattr(issue, "_repository", self)
+        # This is mostly for compatibility with an older implementation
+        Issue._add_read_property("repo", self, issue)
+        return issue
 
-        issues = []
-        for result in results:
-            issue = Issue.parse_response(self.allspice_client, result)
-            # See Issue.request
-            setattr(issue, "_repository", self)
-            # This is mostly for compatibility with an older implementation
-            Issue._add_read_property("repo", self, issue)
-            issues.append(issue)
+    @overload
+    def get_design_reviews(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        milestone: Optional[Union[Milestone, str]] = None,
+        labels: Optional[List[str]] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> List["DesignReview"]: ...
 
-        return issues
+    @overload
+    def get_design_reviews(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        milestone: Optional[Union[Milestone, str]] = None,
+        labels: Optional[List[str]] = None,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> List[Any]: ...
+
+    @overload
+    def get_design_reviews(
+        self,
+        state: Literal["open", "closed", "all"] = "all",
+        milestone: Optional[Union[Milestone, str]] = None,
+        labels: Optional[List[str]] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> List[Dict[str, Any]]: ...
 
     def get_design_reviews(
         self,
         state: Literal["open", "closed", "all"] = "all",
         milestone: Optional[Union[Milestone, str]] = None,
         labels: Optional[List[str]] = None,
-    ) -> List["DesignReview"]:
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> List[Any]:
         """
         Get all Design Reviews of this Repository.
 
@@ -811,6 +1217,11 @@ class Repository(ApiObject):
                       are returned.
         :param milestone: The milestone of the Design Reviews to get.
         :param labels: A list of label IDs to filter DRs by.
+        :param fields: If given, return a record with only these fields for
+            each Design Review instead, which is much cheaper than a
+            DesignReview. See `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each Design Review instead,
+            e.g. to fill `allspice.columns.Columns`.
         :return: A list of Design Reviews.
         """
 
@@ -829,14 +1240,57 @@ class Repository(ApiObject):
             self.REPO_DESIGN_REVIEWS.format(owner=self.owner.username, repo=self.name),
             params=params,
         )
-        return [DesignReview.parse_response(self.allspice_client, result) for result in results]
+        return list(
+            list_results(
+                results,
+                lambda result: DesignReview.parse_response(self.allspice_client, result),
+                fields,
+                raw,
+            )
+        )
+
+    @overload
+    def get_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> List["Commit"]: ...
+
+    @overload
+    def get_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> List[Any]: ...
+
+    @overload
+    def get_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> List[Dict[str, Any]]: ...
 
     def get_commits(
         self,
         sha: Optional[str] = None,
         path: Optional[str] = None,
         stat: bool = True,
-    ) -> List["Commit"]:
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> List[Any]:
         """
         Get all the Commits of this Repository.
 
@@ -846,17 +1300,15 @@ class Repository(ApiObject):
         :param path: filepath of a file/dir.
         :param stat: Include the number of additions and deletions in the response.
                      Disable for speedup.
+        :param fields: If given, return a record with only these fields for
+            each commit instead, which is much cheaper than a Commit. See
+            `allspice.projection.Projection`.
+        :param raw: If true, return the JSON of each commit instead, e.g. to
+            fill `allspice.columns.Columns`.
         :return: A list of Commits.
         """
 
-        data = {}
-        if sha:
-            data["sha"] = sha
-        if path:
-            data["path"] = path
-        if not stat:
-            data["stat"] = False
-
+        data = self._commits_params(sha, path, stat)
         try:
             results = self.allspice_client.requests_get_paginated(
                 Repository.REPO_COMMITS % (self.owner.username, self.name),
@@ -866,7 +1318,97 @@ class Repository(ApiObject):
             logging.warning(err)
             logging.warning("Repository %s/%s is Empty" % (self.owner.username, self.name))
             results = []
-        return [Commit.parse_response(self.allspice_client, result) for result in results]
+        return list(
+            list_results(
+                results,
+                lambda result: Commit.parse_response(self.allspice_client, result),
+                fields,
+                raw,
+            )
+        )
+
+    @overload
+    def iter_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[False] = False,
+    ) -> Iterator["Commit"]: ...
+
+    @overload
+    def iter_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        max_items: Optional[int] = None,
+        *,
+        fields: Sequence[str],
+        raw: Literal[False] = False,
+    ) -> Iterator[Any]: ...
+
+    @overload
+    def iter_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        max_items: Optional[int] = None,
+        *,
+        fields: None = None,
+        raw: Literal[True],
+    ) -> Iterator[Dict[str, Any]]: ...
+
+    def iter_commits(
+        self,
+        sha: Optional[str] = None,
+        path: Optional[str] = None,
+        stat: bool = True,
+        max_items: Optional[int] = None,
+        *,
+        fields: Optional[Sequence[str]] = None,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Iterate over the Commits of this Repository, fetching them page by page.
+
+        This takes the same arguments as `get_commits`, but only fetches the
+        next page of Commits once the previous one has been consumed. This is
+        useful for walking long histories, where you may want to stop early.
+
+        :param max_items: If set, stop after this many Commits.
+        """
+
+        results = self.allspice_client.requests_iter_paginated(
+            Repository.REPO_COMMITS % (self.owner.username, self.name),
+            params=self._commits_params(sha, path, stat),
+            max_items=max_items,
+        )
+        try:
+            yield from list_results(
+                results,
+                lambda result: Commit.parse_response(self.allspice_client, result),
+                fields,
+                raw,
+            )
+        except ConflictException as err:
+            logging.warning(err)
+            logging.warning("Repository %s/%s is Empty" % (self.owner.username, self.name))
+
+    @staticmethod
+    def _commits_params(sha: Optional[str], path: Optional[str], stat: bool) -> dict:
+        data = {}
+        if sha:
+            data["sha"] = sha
+        if path:
+            data["path"] = path
+        if not stat:
+            data["stat"] = False
+        return data
 
     def get_issues_state(self, state) -> List["Issue"]:
         """
@@ -1093,9 +1635,36 @@ class Repository(ApiObject):
         ref = Util.data_params_for_ref(ref).get("ref", self.default_branch)
         url = self.REPO_GET_TREE.format(owner=self.owner.username, repo=self.name, ref=ref)
         params = {"recursive": recursive}
-        results = self.allspice_client.requests_get_paginated(url, params=params)
+        # Git trees take the page size as `per_page`, not `limit`.
+        results = self.allspice_client.requests_get_paginated(
+            url, params=params, limit_key="per_page"
+        )
         return [GitEntry.parse_response(self.allspice_client, result) for result in results]
 
+    def iter_tree(
+        self,
+        ref: Optional[Ref] = None,
+        recursive: bool = False,
+        max_items: Optional[int] = None,
+    ) -> Iterator[GitEntry]:
+        """
+        Iterate over the repository's tree on a given ref, fetching it page by
+        page.
+
+        This takes the same arguments as `get_tree`, but only fetches the next
+        page of entries once the previous one has been consumed.
+
+        :param max_items: If set, stop after this many entries.
+        """
+
+        ref = Util.data_params_for_ref(ref).get("ref", self.default_branch)
+        url = self.REPO_GET_TREE.format(owner=self.owner.username, repo=self.name, ref=ref)
+        params = {"recursive": recursive}
+        for result in self.allspice_client.requests_iter_paginated(
+            url, params=params, max_items=max_items, limit_key="per_page"
+        ):
+            yield GitEntry.parse_response(self.allspice_client, result)
+
     def get_file_content(
         self,
         content: Content,
@@ -1201,22 +1770,16 @@ class Repository(ApiObject):
         See https://hub.allspice.io/api/swagger#/repository/repoGetAllSpiceJSON
         """
 
-        if isinstance(content, Content):
-            content = content.path
-
-        url = self.REPO_GET_ALLSPICE_JSON.format(
-            owner=self.owner.username,
-            repo=self.name,
-            content=content,
+        url, data = self._generated_request(
+            self.REPO_GET_ALLSPICE_JSON,
+            content,
+            ref,
+            params,
+            self.allspice_client.use_new_schdoc_renderer,
         )
-        data = Util.data_params_for_ref(ref)
-        if params:
-            data.update(params)
-        if self.allspice_client.use_new_schdoc_renderer is not None:
-            data["use_new_schdoc_renderer"] = (
-                "true" if self.allspice_client.use_new_schdoc_renderer else "false"
-            )
-        return self.allspice_client.requests_get(url, data)
+        if self.allspice_client.generated_cache is None:
+            return self.allspice_client.requests_get(url, data)
+        return self._parse_generated_json(self._get_generated(url, data))
 
     def get_generated_svg(
         self,
@@ -1235,22 +1798,14 @@ class Repository(ApiObject):
         See https://hub.allspice.io/api/swagger#/repository/repoGetAllSpiceSVG
         """
 
-        if isinstance(content, Content):
-            content = content.path
-
-        url = self.REPO_GET_ALLSPICE_SVG.format(
-            owner=self.owner.username,
-            repo=self.name,
-            content=content,
+        url, data = self._generated_request(
+            self.REPO_GET_ALLSPICE_SVG,
+            content,
+            ref,
+            params,
+            self.allspice_client.use_new_schdoc_renderer,
         )
-        data = Util.data_params_for_ref(ref)
-        if params:
-            data.update(params)
-        if self.allspice_client.use_new_schdoc_renderer is not None:
-            data["use_new_schdoc_renderer"] = (
-                "true" if self.allspice_client.use_new_schdoc_renderer else "false"
-            )
-        return self.allspice_client.requests_get_raw(url, data)
+        return self._get_generated(url, data)
 
     def get_generated_projectdata(
         self,
@@ -1267,10 +1822,44 @@ class Repository(ApiObject):
 
         See https://hub.allspice.io/api/swagger#/repository/repoGetAllSpiceProject
         """
+        url, data = self._generated_request(self.REPO_GET_ALLSPICE_PROJECT, content, ref, params)
+        if self.allspice_client.generated_cache is None:
+            return self.allspice_client.requests_get(url, data)
+        return self._parse_generated_json(self._get_generated(url, data))
+
+    def _get_generated(self, url: str, data: dict) -> bytes:
+        """
+        Get a generated file, through the client's `generated_cache` if it
+        has one.
+        """
+
+        cache = self.allspice_client.generated_cache
+        if cache is None:
+            return self.allspice_client.requests_get_raw(url, data)
+        return cache.get(self, url, data)
+
+    def _parse_generated_json(self, content: bytes) -> dict:
+        if len(content) > 3:
+            return self.allspice_client.json_loads(content)
+        return {}
+
+    def _generated_request(
+        self,
+        endpoint: str,
+        content: Union[Content, str],
+        ref: Optional[Ref] = None,
+        params: Optional[dict] = None,
+        use_new_schdoc_renderer: Optional[bool] = None,
+    ) -> Tuple[str, dict]:
+        """
+        Build the endpoint and query params for one of the allspice_generated
+        endpoints. Shared by the sync methods above and by `AsyncAllSpice`.
+        """
+
         if isinstance(content, Content):
             content = content.path
 
-        url = self.REPO_GET_ALLSPICE_PROJECT.format(
+        url = endpoint.format(
             owner=self.owner.username,
             repo=self.name,
             content=content,
@@ -1278,7 +1867,9 @@ class Repository(ApiObject):
         data = Util.data_params_for_ref(ref)
         if params:
             data.update(params)
-        return self.allspice_client.requests_get(url, data)
+        if use_new_schdoc_renderer is not None:
+            data["use_new_schdoc_renderer"] = "true" if use_new_schdoc_renderer else "false"
+        return url, data
 
     def create_file(self, file_path: str, content: str, data: Optional[dict] = None):
         """https://hub.allspice.io/api/swagger#/repository/repoCreateFile"""
@@ -2963,14 +3554,29 @@ class Content(ReadonlyApiObject):
 Ref = Union[Branch, Commit, str]
 
 
+@lru_cache(maxsize=4096)
+def _convert_time(time: str) -> datetime:
+    # The last three characters are replaced as by the strptime parsing this
+    # replaces, so that the results are the same: in "+01:00", the minutes
+    # of the offset become "00", and in "...:05Z", the seconds do.
+    truncated = time[:-3] + "00"
+    if len(truncated) == 24 and truncated[10] == "T" and truncated[19] in "+-":
+        # "2024-01-02T03:04:05+0100", which fromisoformat on Python 3.10
+        # only accepts with a ":" in the offset.
+        return datetime.fromisoformat(truncated[:22] + ":" + truncated[22:])
+    if len(truncated) == 19 and truncated[10] == "T":
+        return datetime.fromisoformat(truncated)
+    try:
+        return datetime.strptime(truncated, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return datetime.strptime(truncated, "%Y-%m-%dT%H:%M:%S")
+
+
 class Util:
     @staticmethod
     def convert_time(time: str) -> datetime:
         """Parsing of strange Gitea time format ("%Y-%m-%dT%H:%M:%S:%z" but with ":" in time zone notation)"""
-        try:
-            return datetime.strptime(time[:-3] + "00", "%Y-%m-%dT%H:%M:%S%z")
-        except ValueError:
-            return datetime.strptime(time[:-3] + "00", "%Y-%m-%dT%H:%M:%S")
+        return _convert_time(time)
 
     @staticmethod
     def format_time(time: datetime) -> str:
@@ -0,0 +1,491 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Iterator, Mapping, Optional, Union
+
+from frozendict import frozendict
+from urllib3.exceptions import MaxRetryError
+from urllib3.util import Retry
+
+from .allspice import (
+    DEFAULT_RETRY,
+    AllSpice,
+    _json_loads,
+    _last_page,
+    _page_items,
+    _raise_for_delete,
+    _raise_for_get,
+    _raise_for_patch,
+    _raise_for_post,
+    _raise_for_put,
+)
+from .apiobject import Content, DesignReview, Ref, Repository, User, Util
+from .ratelimiter import Priority, PriorityScheduler, RateLimiter
+from .singleflight import AsyncSingleFlight, request_key
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class AsyncAllSpice:
+    """
+    An asyncio client for AllSpice Hub.
+
+    This offers awaitable versions of the `requests_*` methods of `AllSpice`,
+    so that one process can keep many Hub requests in flight without a thread
+    per request. Errors are mapped to the same exceptions as in `AllSpice`.
+
+    This requires the optional `httpx` dependency, which can be installed with
+    `pip install py-allspice[async]`.
+
+    Example:
+
+        async with AsyncAllSpice(token_text=TOKEN) as client:
+            repo = await client.get_repository("owner", "repo")
+            jsons = await asyncio.gather(
+                *(client.get_generated_json(repo, path) for path in paths)
+            )
+
+    API objects returned by this client, such as `Repository` or
+    `DesignReview`, are bound to `sync_client`, a regular `AllSpice` client
+    with the same settings, so all their methods keep working as usual.
+    """
+
+    def __init__(
+        self,
+        allspice_hub_url="https://hub.allspice.io",
+        token_text=None,
+        auth=None,
+        verify=True,
+        log_level="INFO",
+        ratelimiting=(100, 60),
+        retry: Union[Retry, int, None] = DEFAULT_RETRY,
+        use_new_schdoc_renderer: Optional[bool] = None,
+        json_backend: str = "auto",
+        coalesce_requests: bool = False,
+        lazy_parsing: bool = False,
+        identity_map: bool = False,
+        max_connections: int = 100,
+    ):
+        """Initializing an instance of the async AllSpice Hub Client
+
+        The arguments are the same as for `AllSpice`, with the addition of:
+
+        Args:
+            max_connections (int): The maximum number of concurrent connections
+                to AllSpice Hub. Requests beyond this wait for a free
+                connection. By default, 100.
+        """
+
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError(
+                "AsyncAllSpice requires httpx. Install it with `pip install py-allspice[async]`."
+            ) from e
+
+        self.logger = logging.getLogger(__name__)
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(
+            logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+        )
+        self.logger.addHandler(handler)
+        self.logger.setLevel(log_level)
+        self.headers = {
+            "Content-type": "application/json",
+        }
+        self.url = allspice_hub_url
+
+        if not token_text and not auth:
+            raise ValueError("Please provide auth or token_text, but not both")
+        if token_text:
+            self.headers["Authorization"] = "token " + token_text
+        if auth:
+            self.logger.warning(
+                "Using basic auth is not recommended. Prefer using a token instead."
+            )
+
+        self.ratelimiter: Optional[RateLimiter]
+        if ratelimiting is None or isinstance(ratelimiting, RateLimiter):
+            self.ratelimiter = ratelimiting
+        else:
+            (max_calls, period) = ratelimiting
+            self.ratelimiter = RateLimiter(max_calls=max_calls, period=period)
+        self.scheduler = None if self.ratelimiter is None else PriorityScheduler(self.ratelimiter)
+
+        if retry is None:
+            self.retry = None
+        else:
+            self.retry = Retry.from_int(retry)
+
+        self.use_new_schdoc_renderer = use_new_schdoc_renderer
+        self.json_loads = _json_loads(json_backend)
+        self._single_flight = AsyncSingleFlight() if coalesce_requests else None
+
+        self._settings = {
+            "allspice_hub_url": allspice_hub_url,
+            "token_text": token_text,
+            "auth": auth,
+            "verify": verify,
+            "log_level": log_level,
+            # Share the rate limit budget with the sync client.
+            "ratelimiting": self.ratelimiter,
+            "retry": retry,
+            "use_new_schdoc_renderer": use_new_schdoc_renderer,
+            "json_backend": json_backend,
+            "coalesce_requests": coalesce_requests,
+            "lazy_parsing": lazy_parsing,
+            "identity_map": identity_map,
+        }
+        self.client: httpx.AsyncClient = httpx.AsyncClient(
+            auth=auth,
+            verify=verify,
+            limits=httpx.Limits(max_connections=max_connections),
+            timeout=None,
+        )
+
+    async def __aenter__(self) -> AsyncAllSpice:
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close all connections held by this client."""
+        await self.client.aclose()
+
+    @cached_property
+    def sync_client(self) -> AllSpice:
+        """
+        A blocking `AllSpice` client with the same settings as this one. API
+        objects returned by this client are bound to it.
+        """
+
+        return AllSpice(**self._settings)
+
+    @contextmanager
+    def priority(self, priority: Union[Priority, int]) -> Iterator[None]:
+        """
+        Make the requests of the current asyncio task in this block at a
+        different priority. Tasks created in the block inherit it. See
+        `AllSpice.priority`. Without rate limiting, this has no effect.
+
+        :param priority: `Priority.HIGH`, `Priority.NORMAL` or `Priority.LOW`,
+            or any int. Lower values go first.
+
+        Example:
+
+            with client.priority(Priority.LOW):
+                await asyncio.gather(*(index(repo) for repo in repos))
+        """
+
+        if self.scheduler is None:
+            yield
+            return
+        with self.scheduler.priority(priority):
+            yield
+
+    def __get_url(self, endpoint):
+        url = self.url + "/api/v1" + endpoint
+        self.logger.debug("Url: %s" % url)
+        return url
+
+    @staticmethod
+    def _encode_params(params: Optional[Mapping]) -> Optional[dict]:
+        """Encode query params the same way requests does."""
+
+        if params is None:
+            return None
+        encoded = {}
+        for key, value in params.items():
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple)):
+                encoded[key] = [str(v) for v in value]
+            else:
+                encoded[key] = str(value)
+        return encoded
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> httpx.Response:
+        """
+        Send a request, applying the rate limit and the retry policy. The
+        retry policy is evaluated the same way urllib3 does for the sync
+        client: statuses in the forcelist, and statuses that carry a
+        Retry-After header, are retried with backoff.
+        """
+
+        url = self.__get_url(endpoint)
+        if "params" in kwargs:
+            kwargs["params"] = self._encode_params(kwargs["params"])
+
+        retries = self.retry
+        while True:
+            if self.scheduler is not None:
+                await self.scheduler.acquire_async()
+
+            response = await self.client.request(method, url, **kwargs)
+            if self.ratelimiter is not None:
+                self.ratelimiter.observe(response)
+
+            has_retry_after = "Retry-After" in response.headers
+            if retries is None or not retries.is_retry(
+                method, response.status_code, has_retry_after
+            ):
+                return response
+
+            try:
+                retries = retries.increment(method, url)
+            except MaxRetryError:
+                return response
+
+            delay = None
+            if has_retry_after and retries.respect_retry_after_header:
+                delay = retries.parse_retry_after(response.headers["Retry-After"])
+            if delay is None:
+                delay = retries.get_backoff_time()
+            self.logger.debug("Retrying %s %s in %.2fs", method, url, delay)
+            await asyncio.sleep(delay)
+
+    async def __get(self, endpoint: str, params: Mapping = frozendict()) -> httpx.Response:
+        if self._single_flight is None:
+            response = await self._request("GET", endpoint, headers=self.headers, params=params)
+        else:
+            response = await self._single_flight.do(
+                request_key(endpoint, params),
+                lambda: self._request("GET", endpoint, headers=self.headers, params=params),
+            )
+        _raise_for_get(response)
+        return response
+
+    def parse_result(self, result) -> dict:
+        """Parses the result-JSON to a dict."""
+        return AllSpice.parse_result(result, self.json_loads)
+
+    async def requests_get(self, endpoint: str, params: Mapping = frozendict(), sudo=None):
+        combined_params = {}
+        combined_params.update(params)
+        if sudo:
+            combined_params["sudo"] = sudo.username
+        return self.parse_result(await self.__get(endpoint, combined_params))
+
+    async def requests_get_raw(
+        self, endpoint: str, params: Mapping = frozendict(), sudo=None
+    ) -> bytes:
+        combined_params = {}
+        combined_params.update(params)
+        if sudo:
+            combined_params["sudo"] = sudo.username
+        return (await self.__get(endpoint, combined_params)).content
+
+    async def requests_get_paginated(
+        self,
+        endpoint: str,
+        params: Mapping = frozendict(),
+        sudo=None,
+        page_key: str = "page",
+        first_page: int = 1,
+        concurrency: int = 1,
+        limit: Optional[int] = None,
+        limit_key: str = "limit",
+    ):
+        """
+        Get all entries of a paginated listing. See
+        `AllSpice.requests_get_paginated` for the meaning of `concurrency`,
+        `limit` and `limit_key`.
+        """
+
+        page = first_page
+        combined_params = {}
+        combined_params.update(params)
+        if limit is not None:
+            combined_params[limit_key] = limit
+        aggregated_result = []
+
+        if concurrency > 1:
+            sudo_params = {"sudo": sudo.username} if sudo else {}
+            combined_params[page_key] = page
+            response = await self.__get(endpoint, {**combined_params, **sudo_params})
+            result = self.parse_result(response)
+            data = _page_items(result)
+            if not data:
+                return aggregated_result
+            aggregated_result.extend(data)
+
+            last_page = _last_page(response.headers, result, page_key, page, len(data))
+            if last_page is not None:
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def get_page(page_number: int) -> Optional[list]:
+                    page_params = {**combined_params, **sudo_params, page_key: page_number}
+                    async with semaphore:
+                        response = await self.__get(endpoint, page_params)
+                    return _page_items(self.parse_result(response))
+
+                pages = await asyncio.gather(
+                    *(get_page(page_number) for page_number in range(page + 1, last_page + 1))
+                )
+                for data in pages:
+                    if data:
+                        aggregated_result.extend(data)
+                return aggregated_result
+
+            page += 1
+
+        while True:
+            combined_params[page_key] = page
+            result = await self.requests_get(endpoint, combined_params, sudo)
+            data = _page_items(result)
+            if not data:
+                return aggregated_result
+            aggregated_result.extend(data)
+            page += 1
+
+    async def requests_put(self, endpoint: str, data: Optional[dict] = None):
+        if not data:
+            data = {}
+        response = await self._request(
+            "PUT", endpoint, headers=self.headers, content=json.dumps(data)
+        )
+        _raise_for_put(self.logger, response)
+
+    async def requests_delete(self, endpoint: str, data: Optional[dict] = None):
+        response = await self._request(
+            "DELETE", endpoint, headers=self.headers, content=json.dumps(data)
+        )
+        _raise_for_delete(self.logger, response)
+
+    async def requests_post(
+        self,
+        endpoint: str,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        files: Optional[dict] = None,
+    ):
+        """
+        Make a POST call to the endpoint.
+
+        :param endpoint: The path to the endpoint
+        :param data: A dictionary for JSON data
+        :param params: A dictionary of query params
+        :param files: A dictionary of files, see httpx.AsyncClient.post. Using
+                      both files and data can lead to unexpected results!
+        :return: The JSON response parsed as a dict
+        """
+
+        args: dict[str, Any] = {
+            "headers": self.headers.copy(),
+        }
+        if data is not None:
+            args["content"] = json.dumps(data)
+        if params is not None:
+            args["params"] = params
+        if files is not None:
+            args["headers"].pop("Content-type")
+            args["files"] = files
+
+        response = await self._request("POST", endpoint, **args)
+        _raise_for_post(self.logger, response, data, self.headers)
+        return self.parse_result(response)
+
+    async def requests_patch(self, endpoint: str, data: dict):
+        response = await self._request(
+            "PATCH", endpoint, headers=self.headers, content=json.dumps(data)
+        )
+        _raise_for_patch(self.logger, response, data)
+        return self.parse_result(response)
+
+    async def get_version(self) -> str:
+        result = await self.requests_get(AllSpice.ALLSPICE_HUB_VERSION)
+        return result["version"]
+
+    async def get_user(self) -> User:
+        result = await self.requests_get(AllSpice.GET_USER)
+        return User.parse_response(self.sync_client, result)
+
+    async def get_repository(self, owner: str, name: str) -> Repository:
+        result = await self.requests_get(Repository.API_OBJECT.format(owner=owner, name=name))
+        return Repository.parse_response(self.sync_client, result)
+
+    async def get_design_review(self, owner: str, repo: str, number: int) -> DesignReview:
+        result = await self.requests_get(
+            DesignReview.API_OBJECT.format(owner=owner, repo=repo, index=number)
+        )
+        return DesignReview.parse_response(self.sync_client, result)
+
+    async def get_design_reviews(
+        self,
+        repository: Repository,
+        state: str = "all",
+    ) -> list[DesignReview]:
+        """The awaitable version of `Repository.get_design_reviews`."""
+
+        results = await self.requests_get_paginated(
+            Repository.REPO_DESIGN_REVIEWS.format(
+                owner=repository.owner.username, repo=repository.name
+            ),
+            params={"state": state},
+        )
+        return [DesignReview.parse_response(self.sync_client, result) for result in results]
+
+    async def get_raw_file(
+        self,
+        repository: Repository,
+        file_path: str,
+        ref: Optional[Ref] = None,
+    ) -> bytes:
+        """The awaitable version of `Repository.get_raw_file`."""
+
+        url = Repository.REPO_GET_MEDIA.format(
+            owner=repository.owner.username,
+            repo=repository.name,
+            path=file_path,
+        )
+        params = Util.data_params_for_ref(ref)
+        return await self.requests_get_raw(url, params=params)
+
+    async def get_generated_json(
+        self,
+        repository: Repository,
+        content: Union[Content, str],
+        ref: Optional[Ref] = None,
+        params: Optional[dict] = None,
+    ) -> dict:
+        """The awaitable version of `Repository.get_generated_json`."""
+
+        url, data = repository._generated_request(
+            Repository.REPO_GET_ALLSPICE_JSON, content, ref, params, self.use_new_schdoc_renderer
+        )
+        return await self.requests_get(url, data)
+
+    async def get_generated_svg(
+        self,
+        repository: Repository,
+        content: Union[Content, str],
+        ref: Optional[Ref] = None,
+        params: Optional[dict] = None,
+    ) -> bytes:
+        """The awaitable version of `Repository.get_generated_svg`."""
+
+        url, data = repository._generated_request(
+            Repository.REPO_GET_ALLSPICE_SVG, content, ref, params, self.use_new_schdoc_renderer
+        )
+        return await self.requests_get_raw(url, data)
+
+    async def get_generated_projectdata(
+        self,
+        repository: Repository,
+        content: Union[Content, str],
+        ref: Optional[Ref] = None,
+        params: Optional[dict] = None,
+    ) -> dict:
+        """The awaitable version of `Repository.get_generated_projectdata`."""
+
+        url, data = repository._generated_request(
+            Repository.REPO_GET_ALLSPICE_PROJECT, content, ref, params
+        )
+        return await self.requests_get(url, data)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import copy
+import threading
 from typing import TYPE_CHECKING, Any, ClassVar, Mapping, Optional
 
 try:
@@ -11,6 +13,12 @@ if TYPE_CHECKING:
     from allspice.allspice import AllSpice
 
 from .exceptions import MissingEqualityImplementation, ObjectIsInvalid, RawRequestEndpointMissing
+from .identitymap import IdentityMap, identity_key
+
+# Held while parsing a lazy field, so that objects shared between threads,
+# e.g. through the identity map, parse each field only once. It is reentrant,
+# as parsing a field can read lazy fields of other objects.
+_lazy_parse_lock = threading.RLock()
 
 
 class ReadonlyApiObject:
@@ -29,6 +37,79 @@ class ReadonlyApiObject:
         """Hash only fields that are part of the gitea-data identity"""
         raise MissingEqualityImplementation()
 
+    def __getstate__(self) -> dict[str, Any]:
+        """
+        The state of this object for pickling, without the client, which
+        can't be pickled. Objects this object holds, such as the owner of a
+        repository, are pickled without their client as well.
+
+        The field properties are added to the class as objects are parsed, so
+        the names of the fields are kept to add them again when unpickling
+        in another process.
+        """
+
+        state = self.__dict__.copy()
+        state.pop("allspice_client", None)
+        installed = type(self)._read_properties()
+        state["__fields__"] = [name for name in installed if "_" + name in state]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        """
+        Restore a pickled object. It has no client until `attach` is called.
+        """
+
+        state = state.copy()
+        fields = state.pop("__fields__", [])
+        self.__dict__.update(state)
+        self.__dict__["allspice_client"] = None
+        cls = type(self)
+        for name in fields:
+            cls._install_read_property(name)
+
+    def __copy__(self) -> Self:
+        # A copy keeps the client, unlike a pickled object.
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        # The copy tracks which of its fields are parsed or changed itself.
+        for name in ("_unparsed_fields", "_dirty_fields"):
+            if name in self.__dict__:
+                clone.__dict__[name] = self.__dict__[name].copy()
+        return clone
+
+    def __deepcopy__(self, memo: dict) -> Self:
+        # Like a copy, a deep copy keeps the client. The client is shared by
+        # this object and the objects it holds, not copied.
+        clone = type(self).__new__(type(self))
+        memo[id(self)] = clone
+        allspice_client = self.__dict__.get("allspice_client")
+        memo.setdefault(id(allspice_client), allspice_client)
+        for name, value in self.__dict__.items():
+            clone.__dict__[name] = copy.deepcopy(value, memo)
+        return clone
+
+    def attach(self, allspice_client) -> Self:
+        """
+        Use `allspice_client` for the requests made by this object, and by
+        the objects it holds. This is needed after unpickling an object, e.g.
+        one returned from a worker process or read from a cache.
+
+        :param allspice_client: The client to use.
+        :return: This object.
+
+        Example:
+
+            with ProcessPoolExecutor() as executor:
+                repositories = executor.map(fetch_repository, names)
+            for repository in repositories:
+                repository.attach(client).get_branches()
+        """
+
+        self.allspice_client = allspice_client
+        for value in self.__dict__.values():
+            _attach_all(value, allspice_client)
+        return self
+
     _fields_to_parsers: ClassVar[dict] = {}
 
     # TODO: This should probably be made an abstract function as all children
@@ -54,40 +135,118 @@ class ReadonlyApiObject:
         else:
             raise RawRequestEndpointMissing()
 
+    _interned: ClassVar[bool] = False
+    """
+    Whether objects of this class are shared through the identity map of the
+    client, if it has one.
+    """
+
     @classmethod
     def parse_response(cls, allspice_client: AllSpice, result: Mapping) -> Self:
         # allspice_client.logger.debug("Found api object of type %s (id: %s)" % (type(cls), id))
+        if cls._interned:
+            identity_map = getattr(allspice_client, "identity_map", None)
+            key = identity_key(cls, result)
+            if isinstance(identity_map, IdentityMap) and key is not None:
+                return identity_map.intern(
+                    key, result, lambda: cls._parse_new(allspice_client, result)
+                )
+        return cls._parse_new(allspice_client, result)
+
+    @classmethod
+    def _parse_new(cls, allspice_client: AllSpice, result: Mapping) -> Self:
         api_object = cls(allspice_client)
         cls._initialize(allspice_client, api_object, result)
         return api_object
 
     @classmethod
     def _initialize(cls, allspice_client: AllSpice, api_object: Self, result: Mapping):
+        parsers = cls._fields_to_parsers
+        installed = cls._read_properties()
+        values = api_object.__dict__
+        # Clients may be mocks in tests, so only a real True enables this.
+        lazy = getattr(allspice_client, "lazy_parsing", False) is True
+        unparsed = set()
         for name, value in result.items():
-            if name in cls._fields_to_parsers and value is not None:
-                parse_func = cls._fields_to_parsers[name]
-                value = parse_func(allspice_client, value)
-            cls._add_read_property(name, value, api_object)
+            if value is not None and name in parsers:
+                if lazy:
+                    # Keep the raw value, and parse it when first read.
+                    unparsed.add(name)
+                else:
+                    value = parsers[name](allspice_client, value)
+            if name in installed and "_" + name not in values:
+                # The property is already on the class, so only the value
+                # needs to be set.
+                values["_" + name] = value
+            else:
+                cls._add_read_property(name, value, api_object)
+        if unparsed:
+            values["_unparsed_fields"] = unparsed
         # add all patchable fields missing in the request to be writable
-        for name in cls._fields_to_parsers.keys():
-            if not hasattr(api_object, name):
+        for name in parsers:
+            if "_" + name not in values and not hasattr(api_object, name):
                 cls._add_read_property(name, None, api_object)
 
+    @classmethod
+    def _read_properties(cls) -> set[str]:
+        """
+        The names of the fields that have a read property on this class.
+        Properties are added to the class when the first object with a field
+        is parsed, and reused by all later objects of the class.
+        """
+
+        try:
+            return cls.__dict__["_installed_read_properties"]
+        except KeyError:
+            installed: set[str] = set()
+            cls._installed_read_properties = installed
+            return installed
+
+    _installed_read_properties: ClassVar[set[str]]
+
     @classmethod
     def _add_read_property(cls, name: str, value: Any, api_object: ReadonlyApiObject):
         if not hasattr(api_object, name):
             setattr(api_object, "_" + name, value)
-            prop = property((lambda n: lambda self: self._get_var(n))(name))
-            setattr(cls, name, prop)
+            cls._install_read_property(name)
         else:
             raise AttributeError(f"Attribute {name} already exists on api object.")
 
+    @classmethod
+    def _install_read_property(cls, name: str):
+        installed = cls._read_properties()
+        if name not in installed:
+            prop = property((lambda n: lambda self: self._get_var(n))(name))
+            setattr(cls, name, prop)
+            installed.add(name)
+
     def _get_var(self, name: str) -> Any:
         if self.deleted:
             raise ObjectIsInvalid()
+        unparsed = self.__dict__.get("_unparsed_fields")
+        if unparsed and name in unparsed:
+            with _lazy_parse_lock:
+                # Another thread may have parsed the field while we waited.
+                if name in unparsed:
+                    raw = getattr(self, "_" + name)
+                    value = self._fields_to_parsers[name](self.allspice_client, raw)
+                    setattr(self, "_" + name, value)
+                    unparsed.discard(name)
+                    return value
         return getattr(self, "_" + name)
 
 
+def _attach_all(value: Any, allspice_client):
+    # Objects already using the client were attached before, which also
+    # stops at cycles between objects.
+    if isinstance(value, ReadonlyApiObject):
+        if value.allspice_client is not allspice_client:
+            value.attach(allspice_client)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _attach_all(item, allspice_client)
+
+
 class ApiObject(ReadonlyApiObject):
     _patchable_fields: ClassVar[set[str]] = set()
 
@@ -95,6 +254,11 @@ class ApiObject(ReadonlyApiObject):
         super().__init__(allspice_client)
         self._dirty_fields = set()
 
+    def __setstate__(self, state: dict[str, Any]):
+        super().__setstate__(state)
+        for name in self._patchable_fields:
+            self._add_write_property(name, None, self)
+
     def _commit(self, route_fields: dict, dirty_fields: Optional[Mapping] = None):
         if self.deleted:
             raise ObjectIsInvalid()
@@ -133,18 +297,37 @@ class ApiObject(ReadonlyApiObject):
         for name in cls._patchable_fields:
             cls._add_write_property(name, None, api_object)
 
+    _installed_write_properties: ClassVar[set[str]]
+
     @classmethod
     def _add_write_property(cls, name: str, value: Any, api_object: Self):
         if not hasattr(api_object, "_" + name):
             setattr(api_object, "_" + name, value)
+        try:
+            installed = cls.__dict__["_installed_write_properties"]
+        except KeyError:
+            installed = cls._installed_write_properties = set()
+        if name in installed:
+            return
         prop = property(
             (lambda n: lambda self: self._get_var(n))(name),
             (lambda n: lambda self, v: self.__set_var(n, v))(name),
         )
         setattr(cls, name, prop)
+        installed.add(name)
+        # The property is now writable, but it is still the read property
+        # for this field.
+        cls._read_properties().add(name)
 
     def __set_var(self, name: str, value: Any):
         if self.deleted:
             raise ObjectIsInvalid()
         self._dirty_fields.add(name)
-        setattr(self, "_" + name, value)
+        unparsed = self.__dict__.get("_unparsed_fields")
+        if unparsed:
+            with _lazy_parse_lock:
+                # The new value replaces the raw one, so it must not be parsed.
+                unparsed.discard(name)
+                setattr(self, "_" + name, value)
+        else:
+            setattr(self, "_" + name, value)
@@ -0,0 +1,106 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Set
+
+
+@dataclass
+class BulkResult:
+    """The outcome of one operation run by `AllSpice.bulk`."""
+
+    index: int
+    """The position of the operation in the operations passed in."""
+
+    value: Any = None
+    """The return value of the operation, if it succeeded."""
+
+    exception: Optional[BaseException] = None
+    """The exception raised by the operation, if it failed."""
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
+
+
+@dataclass
+class BulkSummary:
+    """The outcome of all operations run by `AllSpice.bulk`."""
+
+    results: List[BulkResult] = field(default_factory=list)
+    """One result per operation, in the order the operations were passed in."""
+
+    elapsed: float = 0.0
+    """The time taken to run all operations, in seconds."""
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def errors(self) -> List[BulkResult]:
+        """The results of the operations that failed."""
+
+        return [result for result in self.results if not result.ok]
+
+    def raise_for_errors(self):
+        """
+        Raise the exception of the first operation that failed, if any. All
+        other operations will still have run.
+        """
+
+        for result in self.results:
+            if result.exception is not None:
+                raise result.exception
+
+
+def _run(index: int, operation: Callable[[], Any]) -> BulkResult:
+    try:
+        return BulkResult(index, value=operation())
+    except Exception as e:
+        return BulkResult(index, exception=e)
+
+
+def run_bulk(
+    operations: Iterable[Callable[[], Any]],
+    concurrency: int = 8,
+    progress: Optional[Callable[[BulkResult], None]] = None,
+) -> BulkSummary:
+    """
+    Run operations in a thread pool, with at most `concurrency` running at
+    the same time. See `AllSpice.bulk`.
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    started = time.monotonic()
+    results: List[BulkResult] = []
+    pending: Set[Future] = set()
+
+    def collect(done: Iterable[Future]):
+        for future in done:
+            result = future.result()
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for index, operation in enumerate(operations):
+            # Only take more operations from the iterable as earlier ones
+            # finish, so that a generator of operations isn't read up front.
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+            # Run each operation in a copy of this context, so that e.g. the
+            # request priority set by the caller applies to it.
+            context = contextvars.copy_context()
+            pending.add(executor.submit(context.run, _run, index, operation))
+        collect(wait(pending).done)
+
+    results.sort(key=lambda result: result.index)
+    return BulkSummary(results=results, elapsed=time.monotonic() - started)
@@ -0,0 +1,464 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Mapping, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from .apiobject import Repository
+
+# Headers describing the encoding of the body on the wire. Cached bodies are
+# already decoded, so these don't apply to them.
+_WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class CacheStore:
+    """
+    A size bounded store of byte strings by key. Subclasses implement `get`
+    and `set`, and must be safe to use from multiple threads.
+    """
+
+    max_size: int
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        :param key: The key to look up.
+        :return: The stored value, or None if there is none.
+        """
+
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes):
+        """
+        Store a value, evicting the least recently used values to stay within
+        `max_size`. Values larger than `max_size` are not stored.
+
+        :param key: The key to store the value under.
+        :param value: The value to store.
+        """
+
+        raise NotImplementedError
+
+
+class MemoryCache(CacheStore):
+    """
+    An in-memory least recently used cache.
+
+    :param max_size: The maximum total size of stored values, in bytes.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_size:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskCache(CacheStore):
+    """
+    A least recently used cache that stores each value in a file in
+    `directory`. The cache can be shared by several processes, and persists
+    between runs.
+
+    Recency is tracked with the modification time of the files, which is
+    updated on every hit.
+
+    :param directory: The directory to store values in. It is created if it
+        doesn't exist.
+    :param max_size: The maximum total size of stored values, in bytes.
+    """
+
+    directory: str
+
+    def __init__(self, directory: str, max_size: int = 512 * 1024 * 1024):
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(size for _, _, size in self._files())
+
+    def _path(self, key: str) -> str:
+        # Keys may contain characters that aren't valid in file names.
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    def _files(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                value = file.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Possibly evicted by another process in the meantime.
+            return None
+        return value
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_size:
+            return
+        path = self._path(key)
+        # Write to a temporary file first, so that readers never see a
+        # partially written value.
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, prefix=".")
+        with os.fdopen(fd, "wb") as file:
+            file.write(value)
+        with self._lock:
+            try:
+                self._size -= os.path.getsize(path)
+            except FileNotFoundError:
+                pass
+            os.replace(temporary_path, path)
+            self._size += len(value)
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self):
+        """Remove the least recently used files. Must be called with the lock held."""
+
+        # Other processes may have written to the directory, so recount.
+        files = sorted(self._files(), key=lambda file: file[1])
+        self._size = sum(size for _, _, size in files)
+        for path, _, size in files:
+            if self._size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+
+class SQLiteCache(CacheStore):
+    """
+    A least recently used cache that stores values in a SQLite database. Like
+    `DiskCache`, this can be shared by several processes and persists between
+    runs, but keeps everything in a single file.
+
+    :param path: The path to the database file. It is created if it doesn't
+        exist.
+    :param max_size: The maximum total size of stored values, in bytes.
+    """
+
+    path: str
+
+    def __init__(self, path: str, max_size: int = 512 * 1024 * 1024):
+        self.path = os.fspath(path)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._connection_pid: Optional[int] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Must be called with the lock held."""
+
+        # Connections can't be used across a fork, so reconnect in children.
+        if self._connection_pid != os.getpid():
+            self._db = sqlite3.connect(
+                self.path, timeout=60, isolation_level=None, check_same_thread=False
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+            self._connection_pid = os.getpid()
+        return self._db
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            connection = self._connection()
+            row = connection.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE entries SET used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def set(self, key: str, value: bytes):
+        if len(value) > self.max_size:
+            return
+        with self._lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, used) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time()),
+                )
+                (size,) = connection.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                if size > self.max_size:
+                    rows = connection.execute(
+                        "SELECT key, size FROM entries ORDER BY used"
+                    ).fetchall()
+                    for evicted_key, evicted_size in rows:
+                        if size <= self.max_size:
+                            break
+                        connection.execute("DELETE FROM entries WHERE key = ?", (evicted_key,))
+                        size -= evicted_size
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+
+def _cache_key(session: requests.Session, url: str, headers: Mapping, params: Mapping) -> str:
+    """
+    The key for a GET request. This includes a hash of the credentials, so
+    that clients with different credentials sharing a store never see each
+    other's responses.
+    """
+
+    prepared_url = requests.Request("GET", url, params=params).prepare().url
+    return "GET {} {}".format(prepared_url, _credentials_hash(session, headers))
+
+
+def _credentials_hash(session: requests.Session, headers: Mapping) -> str:
+    """A hash of the credentials a request is made with."""
+
+    credentials = repr((headers.get("Authorization"), session.auth)).encode()
+    return hashlib.sha256(credentials).hexdigest()
+
+
+def _pack(response: requests.Response) -> bytes:
+    response_headers = {
+        name: value for name, value in response.headers.items() if name.lower() not in _WIRE_HEADERS
+    }
+    metadata = {"headers": response_headers, "encoding": response.encoding}
+    return json.dumps(metadata).encode() + b"\n" + response.content
+
+
+def _unpack(value: bytes, not_modified: requests.Response) -> requests.Response:
+    """Build a response from a cached value, for a 304 response to revalidating it."""
+
+    metadata, _, content = value.partition(b"\n")
+    metadata = json.loads(metadata)
+
+    response = requests.Response()
+    response.status_code = 200
+    response.reason = "OK"
+    response._content = content
+    response.encoding = metadata["encoding"]
+    response.headers = CaseInsensitiveDict(metadata["headers"])
+    # The 304 may carry updated metadata, such as a new Date or rate limit.
+    response.headers.update(
+        {
+            name: value
+            for name, value in not_modified.headers.items()
+            if name.lower() not in _WIRE_HEADERS
+        }
+    )
+    response.url = not_modified.url
+    response.request = not_modified.request
+    response.elapsed = not_modified.elapsed
+    response.raw = not_modified.raw
+    return response
+
+
+def cached_get(
+    store: CacheStore,
+    session: requests.Session,
+    url: str,
+    headers: Mapping,
+    params: Mapping,
+) -> requests.Response:
+    """
+    Make a GET request, revalidating a cached response if there is one.
+
+    If a response to the same request was stored before, the request is made
+    conditional on its `ETag` and `Last-Modified` headers. If the server
+    responds with 304 Not Modified, the stored response is returned instead.
+    Successful responses with either header are stored for next time.
+
+    :param store: The store to keep responses in.
+    :param session: The session to make the request with.
+    :param url: The URL to request.
+    :param headers: Headers to send with the request.
+    :param params: Query parameters to send with the request.
+    :return: The response, or the stored response if it was not modified.
+    """
+
+    key = _cache_key(session, url, headers, params)
+    cached = store.get(key)
+
+    request_headers = dict(headers)
+    if cached is not None:
+        cached_headers = CaseInsensitiveDict(json.loads(cached.partition(b"\n")[0])["headers"])
+        if "ETag" in cached_headers:
+            request_headers["If-None-Match"] = cached_headers["ETag"]
+        if "Last-Modified" in cached_headers:
+            request_headers["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+    response = session.get(url, headers=request_headers, params=params)
+
+    if response.status_code == 304 and cached is not None:
+        return _unpack(cached, response)
+
+    cacheable = "ETag" in response.headers or "Last-Modified" in response.headers
+    if (
+        response.status_code == 200
+        and cacheable
+        and "no-store" not in response.headers.get("Cache-Control", "")
+    ):
+        store.set(key, _pack(response))
+    return response
+
+
+def _client_credentials(repository: Repository) -> str:
+    client = repository.allspice_client
+    return _credentials_hash(client.requests, client.headers)
+
+
+class GeneratedContentCache:
+    """
+    A cache for the generated JSON, SVG and project data of design files.
+
+    The output generated for a file at a given commit never changes, so it is
+    cached under the commit SHA, file path and query parameters, and never
+    needs to be revalidated. To do this, the ref a generated file is requested
+    for is first resolved to a commit SHA, and the file is then requested for
+    that commit.
+
+    Refs are resolved with the API, and the result is remembered for
+    `ref_ttl` seconds, so that a branch that moves is picked up shortly after.
+    Entries are kept per credentials, like the responses of the `cache` of
+    the client. As refs, including commit SHAs, are resolved with the
+    credentials of the client, a client that lost access to a repository is
+    no longer served its files after at most `ref_ttl` seconds.
+
+    :param store: The store to keep generated files in. By default, a
+        `MemoryCache`. A `DiskCache` or `SQLiteCache` can be shared between
+        processes and runs.
+    :param ref_ttl: How long to remember which commit a ref points to, in
+        seconds.
+    :param max_refs: The maximum number of resolved refs to remember. The
+        oldest are forgotten first.
+
+    Example:
+
+        client = AllSpice(token_text=TOKEN, generated_cache=GeneratedContentCache(DiskCache(".cache")))
+    """
+
+    store: CacheStore
+    ref_ttl: float
+
+    def __init__(
+        self,
+        store: Optional[CacheStore] = None,
+        ref_ttl: float = 30.0,
+        max_refs: int = 1024,
+    ):
+        self.store = MemoryCache() if store is None else store
+        self.ref_ttl = ref_ttl
+        self.max_refs = max_refs
+        self._lock = threading.Lock()
+        self._resolved: OrderedDict[Tuple[str, str, str, str], Tuple[str, float]] = OrderedDict()
+
+    def resolve_ref(self, repository: Repository, ref: Optional[str]) -> str:
+        """
+        Resolve a ref of a repository to a commit SHA.
+
+        :param repository: The repository the ref belongs to.
+        :param ref: A branch, tag or commit SHA. If None, the default branch
+            of the repository.
+        :return: The SHA of the commit the ref points to.
+        """
+
+        if ref is None:
+            ref = repository.default_branch
+
+        owner, name = repository.owner.username, repository.name
+        credentials = _client_credentials(repository)
+        key = (credentials, owner, name, ref)
+        with self._lock:
+            resolved = self._resolved.get(key)
+            if resolved is not None:
+                if resolved[1] > time.monotonic():
+                    return resolved[0]
+                del self._resolved[key]
+
+        # Commit SHAs are resolved as well, which checks that the client can
+        # still read the repository.
+        commit = repository.allspice_client.requests_get(
+            f"/repos/{owner}/{name}/git/commits/{ref}",
+            {"stat": "false", "verification": "false", "files": "false"},
+        )
+        sha = commit["sha"]
+        with self._lock:
+            now = time.monotonic()
+            for resolved_key in (key, (credentials, owner, name, sha)):
+                self._resolved.pop(resolved_key, None)
+                self._resolved[resolved_key] = (sha, now + self.ref_ttl)
+            # Refs are kept in the order they were resolved, which is also the
+            # order they expire in.
+            while self._resolved and (
+                len(self._resolved) > self.max_refs or next(iter(self._resolved.values()))[1] <= now
+            ):
+                self._resolved.popitem(last=False)
+        return sha
+
+    def get(self, repository: Repository, url: str, params: Mapping) -> bytes:
+        """
+        Get a generated file from the cache, or from the API if it isn't
+        cached yet.
+
+        :param repository: The repository the file belongs to.
+        :param url: The allspice_generated endpoint to request.
+        :param params: The query parameters for the endpoint, including the ref.
+        :return: The generated file.
+        """
+
+        params = dict(params)
+        params["ref"] = self.resolve_ref(repository, params.get("ref"))
+        key = json.dumps(
+            [
+                repository.allspice_client.url,
+                _client_credentials(repository),
+                url,
+                sorted(params.items()),
+            ]
+        )
+
+        content = self.store.get(key)
+        if content is None:
+            # Failed requests, including files that aren't generated yet,
+            # raise here, so only generated files are stored.
+            content = repository.allspice_client.requests_get_raw(url, params)
+            self.store.set(key, content)
+        return content
@@ -0,0 +1,177 @@
+import importlib
+from array import array
+from typing import Any, Dict, Iterable, Iterator, Mapping, MutableSequence, Optional, Sequence
+
+try:
+    from typing_extensions import Self
+except ImportError:
+    from typing import Self
+
+from .projection import field_getter
+
+
+def _import_optional(name: str, purpose: str) -> Any:
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError(
+            f"{purpose} requires {name}. Install it with `pip install {name}`."
+        ) from e
+
+
+class Columns:
+    """
+    The results of a listing as one column per field, filled directly from
+    the JSON of the results, without creating an API object per row. This
+    is much cheaper than building objects when the results are turned into a
+    table anyway.
+
+    Fill it from the `raw=True` mode of listing methods, such as
+    `Repository.iter_issues`, `Repository.get_commits` or
+    `Repository.get_design_reviews`.
+
+    The values are as returned by the API, e.g. timestamps are strings.
+    Fields missing from a result are None.
+
+    :param fields: The names of the fields to keep. Use dots to get fields
+        of nested objects, e.g. `user.login`.
+    :param types: `array` type codes for fields that should be stored in a
+        compact `array.array` instead of a list, e.g. `{"number": "q"}`. The
+        field must have a value of that type in every result.
+
+    Example:
+
+        issues = Columns(["number", "title", "state", "user.login", "created_at"])
+        issues.extend(repository.iter_issues(raw=True))
+        data_frame = issues.to_pandas()
+    """
+
+    def __init__(self, fields: Sequence[str], types: Optional[Mapping[str, str]] = None):
+        if isinstance(fields, str):
+            raise TypeError("fields must be a sequence of field names, not a string")
+        types = types or {}
+        unknown = set(types) - set(fields)
+        if unknown:
+            raise ValueError(f"Types given for unknown fields: {', '.join(sorted(unknown))}")
+
+        self.fields = tuple(fields)
+        self.columns: Dict[str, MutableSequence] = {
+            field: array(types[field]) if field in types else [] for field in self.fields
+        }
+        self._getters = [field_getter(field) for field in self.fields]
+        self._fillers = [
+            (self.columns[field].append, getter)
+            for field, getter in zip(self.fields, self._getters)
+        ]
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, field: str) -> MutableSequence:
+        return self.columns[field]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields)
+
+    def _reject_row(self, result: Mapping, error: Exception) -> Exception:
+        """
+        Remove the values of a row that a typed column rejected from the
+        columns they were already added to, and make the error name the field.
+        """
+
+        columns = [self.columns[field] for field in self.fields]
+        # Values are added field by field, so the rejected field is the first
+        # one whose column did not grow.
+        index = next(i for i, column in enumerate(columns) if len(column) == self._length)
+        for column in columns[:index]:
+            column.pop()
+        value = self._getters[index](result)
+        return type(error)(f"Invalid value for {self.fields[index]}: {value!r}")
+
+    def append(self, result: Mapping):
+        """
+        Add the fields of one result as a row.
+
+        :raises TypeError: If a typed field has a value of a different type.
+            No column is changed then.
+        """
+
+        try:
+            for append, get in self._fillers:
+                append(get(result))
+        except (TypeError, OverflowError) as e:
+            raise self._reject_row(result, e) from e
+        self._length += 1
+
+    def extend(self, results: Iterable[Any]) -> Self:
+        """
+        Add the fields of every result as rows.
+
+        :param results: The JSON of the results, e.g. as returned by a
+            listing method with `raw=True`.
+        :return: These columns, to allow chaining.
+        :raises TypeError: If a typed field has a value of a different type.
+            The rows before that result are kept.
+        """
+
+        fillers = self._fillers
+        for result in results:
+            try:
+                for append, get in fillers:
+                    append(get(result))
+            except (TypeError, OverflowError) as e:
+                raise self._reject_row(result, e) from e
+            self._length += 1
+        return self
+
+    def to_dict(self) -> Dict[str, MutableSequence]:
+        """The columns by field name. The columns are not copied."""
+
+        return dict(self.columns)
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        The columns as NumPy arrays by field name. Requires numpy.
+
+        Typed columns are converted without copying element by element.
+        Other columns get the type NumPy infers for them.
+        """
+
+        numpy = _import_optional("numpy", "Columns.to_numpy")
+        return {field: numpy.asarray(column) for field, column in self.columns.items()}
+
+    def to_pandas(self) -> Any:
+        """
+        The columns as a pandas DataFrame. Requires pandas. Typed columns are
+        passed as NumPy arrays, without a Python object per value.
+        """
+
+        pandas = _import_optional("pandas", "Columns.to_pandas")
+        numpy = _import_optional("numpy", "Columns.to_pandas")
+        return pandas.DataFrame(
+            {
+                field: numpy.asarray(column) if isinstance(column, array) else column
+                for field, column in self.columns.items()
+            },
+            columns=list(self.fields),
+        )
+
+    def to_arrow(self) -> Any:
+        """The columns as a PyArrow Table. Requires pyarrow."""
+
+        pyarrow = _import_optional("pyarrow", "Columns.to_arrow")
+        try:
+            numpy = importlib.import_module("numpy")
+        except ImportError:
+            numpy = None
+
+        def arrow_array(column):
+            if not isinstance(column, array):
+                return pyarrow.array(column)
+            if numpy is not None:
+                # Typed columns are converted without a Python object per value.
+                return pyarrow.array(numpy.asarray(column))
+            return pyarrow.array(column.tolist())
+
+        return pyarrow.table({field: arrow_array(column) for field, column in self.columns.items()})
@@ -90,7 +90,12 @@ class NotYetGeneratedException(Exception):
     Usually, retrying after a while will be successful.
     """
 
-    pass
+    retry_after: Optional[float]
+    """The seconds the server asked to wait before retrying, if it did."""
+
+    def __init__(self, *args, retry_after: Optional[float] = None):
+        super().__init__(*args)
+        self.retry_after = retry_after
 
 
 class RawRequestEndpointMissing(Exception):
@@ -0,0 +1,86 @@
+import threading
+import weakref
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Mapping, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IdentityMap:
+    """
+    Shares one API object between all responses that contain the same data
+    for it, e.g. the owner embedded in every repository of an organization.
+
+    Objects are held by weak references, so an object is dropped from the
+    map once nothing else uses it. An object is only shared if the data in
+    the new response equals the data it was parsed from. Otherwise, the new
+    data is parsed into a new object, which replaces the old one in the map.
+
+    Note that shared objects are the same instance, so changing a field of
+    one, e.g. before calling `commit`, changes it for all of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[weakref.ref, Mapping]] = {}
+        # Keys of objects that were garbage collected. Weak reference
+        # callbacks can run at any time, even while the lock is held by the
+        # same thread, so they only queue the keys to remove.
+        self._dead: deque[Tuple[Hashable, weakref.ref]] = deque()
+        self.hits = 0
+        """The number of times a shared object was returned."""
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._prune()
+            return len(self._entries)
+
+    def _prune(self):
+        """Remove the entries of collected objects. Must hold the lock."""
+
+        while self._dead:
+            key, ref = self._dead.popleft()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is ref:
+                del self._entries[key]
+
+    def intern(self, key: Hashable, result: Mapping, parse: Callable[[], T]) -> T:
+        """
+        Get the object for `key` if it was parsed from data equal to
+        `result`, or parse it with `parse` and add it to the map.
+
+        :param key: The identity of the object, e.g. its class and id.
+        :param result: The data of the object in the response.
+        :param parse: Parses `result` into a new object.
+        """
+
+        with self._lock:
+            self._prune()
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == result:
+                api_object = entry[0]()
+                if api_object is not None:
+                    self.hits += 1
+                    return api_object
+
+        api_object = parse()
+        ref = weakref.ref(api_object, lambda ref: self._dead.append((key, ref)))
+        with self._lock:
+            self._entries[key] = (ref, result)
+        return api_object
+
+    def clear(self):
+        """Forget all objects. Objects returned so far stay valid."""
+
+        with self._lock:
+            self._entries.clear()
+            self._dead.clear()
+
+
+def identity_key(cls: type, result: Mapping) -> Any:
+    """The key of an object in an `IdentityMap`, or None if it has no id."""
+
+    object_id = result.get("id")
+    if object_id is None:
+        return None
+    return (cls, object_id)
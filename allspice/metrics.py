@@ -0,0 +1,277 @@
+import json
+import re
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds of the latency histogram buckets, in seconds.
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Rules to turn an endpoint into its template, applied in order. Paths of
+# files and refs may contain slashes, so those are matched to the end.
+_TEMPLATE_RULES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"^/repos/(?!search/?$)[^/]+/[^/]+"), "/repos/{owner}/{repo}"),
+    (re.compile(r"^/admin/users/[^/]+"), "/admin/users/{username}"),
+    (re.compile(r"^/users/[^/]+"), "/users/{username}"),
+    (re.compile(r"^/orgs/[^/]+"), "/orgs/{org}"),
+    (
+        re.compile(r"/allspice_generated/(json|svg|project)/.+$"),
+        r"/allspice_generated/\1/{content}",
+    ),
+    (re.compile(r"/(contents|media|raw)/.+$"), r"/\1/{path}"),
+    (re.compile(r"/git/trees/.+$"), "/git/trees/{ref}"),
+    (re.compile(r"/archive/.+$"), "/archive/{archive}"),
+    (re.compile(r"/(git/commits|commits|statuses)/[^/]+"), r"/\1/{sha}"),
+    (re.compile(r"/branches/.+$"), "/branches/{branch}"),
+    (re.compile(r"/releases/tags/.+$"), "/releases/tags/{tag}"),
+    (re.compile(r"/topics/[^/]+"), "/topics/{topic}"),
+    (re.compile(r"/(collaborators|members)/[^/]+"), r"/\1/{username}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{id}"),
+]
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Turn an endpoint into a template by replacing the parts that identify
+    objects with placeholders, e.g.
+    `/repos/jdoe/board/allspice_generated/json/main.PcbDoc` becomes
+    `/repos/{owner}/{repo}/allspice_generated/json/{content}`.
+
+    :param endpoint: The path of the endpoint, without the query string.
+    """
+
+    template = endpoint.split("?", 1)[0]
+    for pattern, replacement in _TEMPLATE_RULES:
+        template = pattern.sub(replacement, template)
+    return template
+
+
+@dataclass
+class RequestRecord:
+    """A request made by the client, as passed to the `RequestMetrics` callback."""
+
+    method: str
+    endpoint: str
+    template: str
+    status: int
+    duration: float
+    bytes_sent: int
+    bytes_received: int
+    retries: int
+    rate_limit_wait: float
+
+
+@dataclass
+class EndpointStats:
+    """The totals recorded for one method and endpoint template."""
+
+    buckets: Sequence[float]
+    count: int = 0
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+    duration_sum: float = 0.0
+    duration_counts: List[int] = field(default_factory=list)
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+    rate_limit_wait: float = 0.0
+
+    def __post_init__(self):
+        # One count per bucket, and one for durations above the last bucket.
+        self.duration_counts = [0] * (len(self.buckets) + 1)
+
+    def add(self, record: RequestRecord):
+        self.count += 1
+        if record.status >= 400:
+            self.errors += 1
+        self.statuses[record.status] = self.statuses.get(record.status, 0) + 1
+        self.duration_sum += record.duration
+        self.duration_counts[bisect_left(self.buckets, record.duration)] += 1
+        self.bytes_sent += record.bytes_sent
+        self.bytes_received += record.bytes_received
+        self.retries += record.retries
+        self.rate_limit_wait += record.rate_limit_wait
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """
+    Per endpoint metrics of the requests made by an `AllSpice` client.
+
+    For each method and endpoint template, this counts requests, errors and
+    response statuses, and records a latency histogram, the bytes sent and
+    received, the retries made by urllib3, and the time spent waiting for the
+    rate limiter. Latencies include retries and rate limiting.
+
+    When no metrics are passed to the client, nothing is recorded, and the
+    only cost is checking for that.
+
+    :param callback: Called with a `RequestRecord` after every request, e.g.
+        to forward it to another metrics library.
+    :param buckets: The upper bounds of the latency histogram buckets, in
+        seconds.
+
+    Example:
+
+        metrics = RequestMetrics()
+        client = AllSpice(token_text=TOKEN, metrics=metrics)
+        ...
+        print(metrics.to_prometheus())
+    """
+
+    buckets: Sequence[float]
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[RequestRecord], None]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.callback = callback
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], EndpointStats] = {}
+        # The rate limiter waits in the thread that then makes the request, so
+        # the wait is kept here until that request is recorded.
+        self._pending_wait = threading.local()
+
+    def record_wait(self, seconds: float):
+        """
+        Record time spent waiting for the rate limiter before the next request
+        made by this thread.
+
+        :param seconds: The time waited.
+        """
+
+        self._pending_wait.seconds = getattr(self._pending_wait, "seconds", 0.0) + seconds
+
+    def observe(self, method: str, endpoint: str, response, duration: float):
+        """
+        Record a request.
+
+        :param method: The HTTP method of the request.
+        :param endpoint: The endpoint requested, relative to the API root.
+        :param response: The `requests.Response` received.
+        :param duration: The time from starting the request to receiving the
+            response, in seconds.
+        """
+
+        request = response.request
+        body = getattr(request, "body", None) or b""
+        if isinstance(body, str):
+            body = body.encode()
+        retries = getattr(getattr(response, "raw", None), "retries", None)
+        rate_limit_wait = getattr(self._pending_wait, "seconds", 0.0)
+        self._pending_wait.seconds = 0.0
+
+        record = RequestRecord(
+            method=method,
+            endpoint=endpoint,
+            template=endpoint_template(endpoint),
+            status=response.status_code,
+            duration=duration,
+            bytes_sent=len(body),
+            bytes_received=len(response.content or b""),
+            retries=len(getattr(retries, "history", None) or ()),
+            rate_limit_wait=rate_limit_wait,
+        )
+        with self._lock:
+            stats = self._stats.get((method, record.template))
+            if stats is None:
+                stats = self._stats[(method, record.template)] = EndpointStats(self.buckets)
+            stats.add(record)
+        if self.callback is not None:
+            self.callback(record)
+
+    def reset(self):
+        """Forget everything recorded so far."""
+
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self) -> List[dict]:
+        """
+        The totals recorded so far.
+
+        :return: A list with a dict for each method and endpoint template.
+            The histogram is given as cumulative counts of requests that took
+            at most each bucket's number of seconds, as in Prometheus.
+        """
+
+        with self._lock:
+            items = sorted(self._stats.items())
+            snapshot = []
+            for (method, template), stats in items:
+                cumulative = 0
+                histogram = {}
+                for bound, count in zip([*self.buckets, "+Inf"], stats.duration_counts):
+                    cumulative += count
+                    histogram[str(bound)] = cumulative
+                snapshot.append(
+                    {
+                        "method": method,
+                        "endpoint": template,
+                        "count": stats.count,
+                        "errors": stats.errors,
+                        "statuses": dict(stats.statuses),
+                        "duration_seconds_sum": stats.duration_sum,
+                        "duration_seconds_histogram": histogram,
+                        "bytes_sent": stats.bytes_sent,
+                        "bytes_received": stats.bytes_received,
+                        "retries": stats.retries,
+                        "rate_limit_wait_seconds": stats.rate_limit_wait,
+                    }
+                )
+            return snapshot
+
+    def to_json(self) -> str:
+        """The snapshot as JSON."""
+
+        return json.dumps(self.snapshot())
+
+    def to_prometheus(self, prefix: str = "allspice_client") -> str:
+        """
+        The snapshot in the Prometheus text exposition format.
+
+        :param prefix: The prefix of the metric names.
+        """
+
+        counters = [
+            ("requests_total", "Requests made.", None),
+            ("request_errors_total", "Requests with a 4xx or 5xx response.", "errors"),
+            ("request_bytes_sent_total", "Bytes sent in request bodies.", "bytes_sent"),
+            ("request_bytes_received_total", "Bytes received.", "bytes_received"),
+            ("request_retries_total", "Retries made by urllib3.", "retries"),
+            (
+                "rate_limit_wait_seconds_total",
+                "Time spent waiting for the rate limiter.",
+                "rate_limit_wait_seconds",
+            ),
+        ]
+
+        snapshot = self.snapshot()
+        lines = []
+        for name, description, key in counters:
+            lines.append(f"# HELP {prefix}_{name} {description}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for entry in snapshot:
+                labels = f'method="{entry["method"]}",endpoint="{_label(entry["endpoint"])}"'
+                if key is None:
+                    for status, count in sorted(entry["statuses"].items()):
+                        lines.append(f'{prefix}_{name}{{{labels},status="{status}"}} {count}')
+                else:
+                    lines.append(f"{prefix}_{name}{{{labels}}} {entry[key]}")
+
+        name = f"{prefix}_request_duration_seconds"
+        lines.append(f"# HELP {name} Request latency, including retries and rate limiting.")
+        lines.append(f"# TYPE {name} histogram")
+        for entry in snapshot:
+            labels = f'method="{entry["method"]}",endpoint="{_label(entry["endpoint"])}"'
+            for bound, count in entry["duration_seconds_histogram"].items():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {entry['duration_seconds_sum']}")
+            lines.append(f"{name}_count{{{labels}}} {entry['count']}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,117 @@
+from collections import namedtuple
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=256)
+def record_type(fields: Tuple[str, ...]) -> Type[tuple]:
+    """
+    The named tuple type holding the given fields. A dotted field, such as
+    `owner.login`, is named with underscores instead, e.g. `owner_login`.
+
+    Types are cached, so all records with the same fields have the same type.
+    """
+
+    return namedtuple("Record", [field.replace(".", "_") for field in fields])
+
+
+def field_getter(field: str) -> Callable[[Mapping], Any]:
+    """
+    A function getting `field` from the JSON of an API object, or None if it
+    is missing. Dots in `field` separate the fields of nested objects.
+    """
+
+    if "." not in field:
+        return lambda result: result.get(field)
+
+    path = field.split(".")
+
+    def get(result):
+        for key in path:
+            if not isinstance(result, Mapping):
+                return None
+            result = result.get(key)
+        return result
+
+    return get
+
+
+class Projection:
+    """
+    Turns the JSON of an API object into a record holding only some of its
+    fields, without creating the API object.
+
+    The values are as returned by the API, e.g. timestamps are not parsed to
+    datetimes and nested objects are dicts. Fields missing from the JSON are
+    None.
+
+    :param fields: The names of the fields to keep. Use dots to get fields
+        of nested objects, e.g. `owner.login`.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        if isinstance(fields, str):
+            raise TypeError("fields must be a sequence of field names, not a string")
+        self.fields = tuple(fields)
+        self.record_type = record_type(self.fields)
+        self._getters = [field_getter(field) for field in self.fields]
+
+    def __call__(self, result: Mapping) -> Any:
+        return self.record_type(*[get(result) for get in self._getters])
+
+
+def projection(fields: Optional[Sequence[str]], raw: bool) -> Optional[Callable[[Mapping], Any]]:
+    """
+    The function to apply to each result of a listing for the `fields` and
+    `raw` arguments of listing methods, or None to parse API objects.
+
+    :param fields: If given, return records with only these fields. See
+        `Projection`.
+    :param raw: If true, return the JSON of each result as a dict.
+    """
+
+    if raw and fields is not None:
+        raise ValueError("Only one of fields and raw can be given.")
+    if raw:
+        return _raw
+    if fields is not None:
+        return Projection(fields)
+    return None
+
+
+def _raw(result: Mapping) -> Any:
+    return result
+
+
+def list_results(
+    results: Iterable[Mapping],
+    parse: Callable[[Any], T],
+    fields: Optional[Sequence[str]],
+    raw: bool,
+) -> Iterator[Any]:
+    """
+    The items of a listing method with `fields` and `raw` arguments: the
+    results parsed with `parse`, or projected as given by `fields` or `raw`.
+
+    :param results: The JSON of the results, e.g. from paginated requests.
+    :param parse: Parses the JSON of one result into an API object.
+    :param fields: If given, records with only these fields. See `Projection`.
+    :param raw: If true, the JSON of each result.
+    :raises ValueError: If both `fields` and `raw` are given.
+    """
+
+    project = projection(fields, raw)
+    return map(parse if project is None else project, results)
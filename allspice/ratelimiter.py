@@ -1,6 +1,535 @@
+import asyncio
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
 import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 
 import requests
+from frozendict import frozendict
+
+
+class RateLimiter:
+    """
+    A thread-safe sliding window rate limiter.
+
+    At most `max_calls` calls start in any window of `period` seconds. Unlike a
+    fixed window, this does not allow bursts of twice `max_calls` around the
+    boundary between two windows.
+
+    Each call reserves the next free slot while holding a lock, then sleeps
+    outside of it until that slot comes up. Slots are handed out in the order
+    callers arrive, so waiting threads proceed first-in, first-out, and one
+    limiter can be shared by many threads, or by several clients.
+
+    :param max_calls: Maximum number of calls per period
+    :param period: Time period in seconds
+    :param burst: Maximum number of calls that may start back to back. Calls
+        beyond the burst are spaced evenly, `period / max_calls` seconds
+        apart. By default, this is `max_calls`, i.e. calls are only limited by
+        the window.
+
+    Example:
+
+        limiter = RateLimiter(max_calls=100, period=60, burst=10)
+        client = AllSpice(token_text=TOKEN, ratelimiting=limiter)
+    """
+
+    max_calls: int
+    period: float
+    burst: int
+
+    def __init__(self, max_calls: int, period: float = 1.0, burst: Optional[int] = None):
+        if max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        if burst is not None and burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.max_calls = max_calls
+        self.period = period
+        self.burst = max_calls if burst is None else min(burst, max_calls)
+
+        self._lock = threading.Lock()
+        # Start times of the last `max_calls` reserved calls. These can be in
+        # the future for callers that are still waiting.
+        self._slots: deque[float] = deque(maxlen=max_calls)
+        # The theoretical arrival time used to space out calls beyond the
+        # burst, as in the generic cell rate algorithm.
+        self._tat = 0.0
+
+    def _next_slot(self, now: float) -> float:
+        """The start of the next free slot. Must be called with the lock held."""
+
+        slot = now
+        if len(self._slots) == self.max_calls:
+            slot = max(slot, self._slots[0] + self.period)
+        if self.burst < self.max_calls:
+            interval = self.period / self.max_calls
+            slot = max(slot, self._tat - (self.burst - 1) * interval)
+        return slot
+
+    def _reserve_slot(self, now: float) -> float:
+        """Reserve the next free slot. Must be called with the lock held."""
+
+        slot = self._next_slot(now)
+        if self.burst < self.max_calls:
+            self._tat = max(self._tat, slot) + self.period / self.max_calls
+        self._slots.append(slot)
+        return slot
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot for one call without waiting for it.
+
+        :return: The number of seconds to wait before making the call.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            return self._reserve_slot(now) - now
+
+    def try_reserve(self) -> float:
+        """
+        Reserve a slot for one call only if the call can start now.
+
+        :return: 0 if a slot was reserved. Otherwise, nothing is reserved,
+            and this is the number of seconds until the next slot is free.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            slot = self._next_slot(now)
+            if slot > now:
+                return slot - now
+            self._reserve_slot(now)
+            return 0.0
+
+    def acquire(self) -> float:
+        """
+        Wait until one more call is allowed.
+
+        :return: The number of seconds spent waiting.
+        """
+
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return max(delay, 0.0)
+
+    async def acquire_async(self) -> float:
+        """
+        Wait until one more call is allowed, without blocking the event loop.
+
+        :return: The number of seconds spent waiting.
+        """
+
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return max(delay, 0.0)
+
+    def observe(self, response: Any):
+        """
+        Called with every response received after a call was allowed. This
+        does nothing here, but subclasses can use it to adapt to the server.
+
+        :param response: A requests or httpx response.
+        """
+
+        pass
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header, which is either in seconds or an HTTP date."""
+
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _was_retried_after_429(response: Any) -> bool:
+    """
+    Whether urllib3 retried this request after a 429. The sync client retries
+    429s in its HTTPAdapter, so the response we see may be the successful one.
+    """
+
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    history = getattr(retries, "history", None) or ()
+    return any(attempt.status == 429 for attempt in history)
+
+
+def _rate_limit_header(headers: Mapping, name: str) -> Optional[float]:
+    """Read an `X-RateLimit-*` header, or its `RateLimit-*` equivalent."""
+
+    value = headers.get(f"X-RateLimit-{name}", headers.get(f"RateLimit-{name}"))
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    A thread-safe rate limiter that adapts its pace to the rate limit headers
+    sent by the server.
+
+    Calls are spaced evenly at the current rate, which starts at
+    `max_calls / period` calls per second. After every response:
+
+    - On a 429, including one that urllib3 already retried, the rate is cut
+      by `decrease`, and no calls start until the `Retry-After` given by the
+      server has passed.
+    - If the response has `X-RateLimit-Remaining` and `X-RateLimit-Reset`
+      headers, the rate never exceeds what spends the remaining budget evenly
+      until the reset. Once less than `headroom` of `X-RateLimit-Limit` is
+      left, the rate drops to that pace right away, to slow down before the
+      server starts responding with 429s.
+    - Otherwise, while there is headroom, the rate goes up by `increase` calls
+      per second, up to `max_rate`.
+
+    :param max_calls: Number of calls per period to start at
+    :param period: Time period in seconds
+    :param min_rate: The lowest rate, in calls per second. By default, a tenth
+        of the starting rate.
+    :param max_rate: The highest rate, in calls per second. By default, ten
+        times the starting rate.
+    :param increase: Calls per second to add after each response with
+        headroom. By default, a tenth of the starting rate.
+    :param decrease: Factor to multiply the rate with after a 429.
+    :param headroom: Fraction of the server's limit below which to stop
+        ramping up and follow the server's pace.
+
+    Example:
+
+        client = AllSpice(token_text=TOKEN, ratelimiting=AdaptiveRateLimiter())
+    """
+
+    rate: float
+
+    def __init__(
+        self,
+        max_calls: int = 100,
+        period: float = 60.0,
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        increase: Optional[float] = None,
+        decrease: float = 0.5,
+        headroom: float = 0.2,
+    ):
+        super().__init__(max_calls=max_calls, period=period)
+
+        initial_rate = max_calls / period
+        self.rate = initial_rate
+        self.min_rate = initial_rate / 10 if min_rate is None else min_rate
+        self.max_rate = initial_rate * 10 if max_rate is None else max_rate
+        self.increase = initial_rate / 10 if increase is None else increase
+        self.decrease = decrease
+        self.headroom = headroom
+
+        self._next_start = 0.0
+        self._paused_until = 0.0
+
+    def _next_slot(self, now: float) -> float:
+        return max(now, self._next_start, self._paused_until)
+
+    def _reserve_slot(self, now: float) -> float:
+        slot = self._next_slot(now)
+        self._next_start = slot + 1 / self.rate
+        return slot
+
+    def observe(self, response: Any):
+        headers = response.headers
+        with self._lock:
+            now = time.monotonic()
+
+            if response.status_code == 429 or _was_retried_after_429(response):
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                retry_after = _parse_retry_after(headers.get("Retry-After"))
+                if retry_after is not None:
+                    self._paused_until = max(self._paused_until, now + retry_after)
+                return
+
+            remaining = _rate_limit_header(headers, "Remaining")
+            reset = _rate_limit_header(headers, "Reset")
+            if remaining is None or reset is None:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                return
+
+            # The reset is either a number of seconds, or a Unix timestamp.
+            if reset > 1e9:
+                reset = reset - time.time()
+            reset = max(reset, 0.0)
+
+            if remaining <= 0:
+                self._paused_until = max(self._paused_until, now + reset)
+                return
+
+            sustainable = remaining / reset if reset > 0 else self.max_rate
+            limit = _rate_limit_header(headers, "Limit")
+            if limit is not None and remaining < self.headroom * limit:
+                self.rate = min(self.rate, sustainable)
+            else:
+                self.rate = min(self.rate + self.increase, sustainable)
+            self.rate = min(max(self.rate, self.min_rate), self.max_rate)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    A sliding window rate limiter whose budget is shared by every process on
+    this machine that uses the same `path`.
+
+    This is useful when many worker processes, e.g. in a `multiprocessing`
+    pool, each create their own `AllSpice` client: with a `RateLimiter` per
+    process, the combined rate would be the configured limit times the number
+    of processes.
+
+    The start times of calls are stored in a SQLite database at `path`.
+    Reserving a slot happens in an immediate transaction, which SQLite
+    serializes across processes. As in `RateLimiter`, each caller then waits
+    outside the transaction until its slot comes up.
+
+    Instances can be pickled, so the same limiter can be passed to worker
+    processes.
+
+    :param path: The path to the SQLite database file. It is created if it
+        doesn't exist.
+    :param max_calls: Maximum number of calls per period, across all processes
+    :param period: Time period in seconds
+
+    Example:
+
+        limiter = SharedRateLimiter("/tmp/allspice-ratelimit.db", max_calls=100, period=60)
+        client = AllSpice(token_text=TOKEN, ratelimiting=limiter)
+    """
+
+    path: str
+
+    def __init__(self, path: str, max_calls: int, period: float = 1.0):
+        super().__init__(max_calls=max_calls, period=period)
+        self.path = os.fspath(path)
+        self._local = threading.local()
+
+    def __getstate__(self):
+        return {"path": self.path, "max_calls": self.max_calls, "period": self.period}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_calls"], state["period"])
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections can't be used across threads, or across a fork,
+        # so we keep one per thread and reconnect in child processes.
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            connection.execute("CREATE TABLE IF NOT EXISTS slots (start REAL NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS slots_start ON slots (start)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _reserve(self, only_if_free: bool) -> float:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            # Monotonic clocks can't be compared across processes.
+            now = time.time()
+            rows = connection.execute(
+                "SELECT start FROM slots ORDER BY start DESC LIMIT ?", (self.max_calls,)
+            ).fetchall()
+            slot = now
+            if len(rows) == self.max_calls:
+                slot = max(slot, rows[-1][0] + self.period)
+            if only_if_free and slot > now:
+                connection.execute("ROLLBACK")
+                return slot - now
+            connection.execute("INSERT INTO slots (start) VALUES (?)", (slot,))
+            # Slots are handed out in order, so older slots can never limit a
+            # later call again.
+            connection.execute("DELETE FROM slots WHERE start < ?", (slot - self.period,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return slot - now
+
+    def reserve(self) -> float:
+        return self._reserve(only_if_free=False)
+
+    def try_reserve(self) -> float:
+        return max(self._reserve(only_if_free=True), 0.0)
+
+
+class Priority(IntEnum):
+    """
+    Priority classes for requests scheduled by a `PriorityScheduler`. Lower
+    values go first.
+    """
+
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# The priorities set with `PriorityScheduler.priority` in the current
+# context, by scheduler.
+_priorities: ContextVar[frozendict] = ContextVar(
+    "allspice_request_priorities", default=frozendict()
+)
+
+
+class PriorityScheduler:
+    """
+    Hands out the calls allowed by a rate limiter by priority.
+
+    Callers wait in a queue ordered by priority, then by arrival. Only the
+    caller at the head of the queue reserves a slot from the limiter, and
+    only once the slot is free. Until then, a higher priority caller that
+    arrives takes its place at the head, so interactive requests are not
+    stuck behind a long queue of background requests. All priorities still
+    share the one budget of the limiter.
+
+    With a single priority, this behaves like the limiter on its own:
+    callers proceed first-in, first-out. Threads and asyncio tasks can wait
+    in the same queue.
+
+    :param limiter: The rate limiter to take calls from. It can be shared
+        with other schedulers or clients, which then share its budget.
+    """
+
+    limiter: RateLimiter
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+        self._condition = threading.Condition()
+        self._waiting: List[Tuple[int, int]] = []
+        self._counter = itertools.count()
+        # The futures asyncio callers wait on, by queue entry.
+        self._wakeups: Dict[Tuple[int, int], Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+
+    @contextmanager
+    def priority(self, priority: Union[Priority, int]) -> Iterator[None]:
+        """
+        Make the calls in this block by the current thread or asyncio task at
+        `priority`, unless another priority is passed to `acquire`.
+
+        :param priority: The priority of the calls. Lower values go first.
+        """
+
+        token = _priorities.set(_priorities.get().set(self, int(priority)))
+        try:
+            yield
+        finally:
+            _priorities.reset(token)
+
+    def current_priority(self) -> int:
+        """The priority set with `priority` in the current context."""
+
+        return _priorities.get().get(self, Priority.NORMAL)
+
+    def _wake(self):
+        """Wake up all waiting callers. Must hold the condition."""
+
+        self._condition.notify_all()
+        for loop, wakeup in self._wakeups.values():
+            loop.call_soon_threadsafe(_set_done, wakeup)
+
+    def acquire(self, priority: Union[Priority, int, None] = None) -> float:
+        """
+        Wait until this caller is the first in the queue, and the limiter
+        allows one more call.
+
+        :param priority: The priority of the call. Lower values go first. By
+            default, the priority set with `priority`, or `Priority.NORMAL`.
+        :return: The number of seconds spent waiting.
+        """
+
+        if priority is None:
+            priority = self.current_priority()
+        started = time.monotonic()
+        waited = False
+        entry = (int(priority), next(self._counter))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            # The head may change, so wake up whoever is waiting on it.
+            self._wake()
+            try:
+                while True:
+                    if self._waiting[0] != entry:
+                        self._condition.wait()
+                        waited = True
+                        continue
+                    delay = self.limiter.try_reserve()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                    waited = True
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._wake()
+        return time.monotonic() - started if waited else 0.0
+
+    async def acquire_async(self, priority: Union[Priority, int, None] = None) -> float:
+        """
+        The asyncio equivalent of `acquire`, which waits without blocking the
+        event loop.
+        """
+
+        if priority is None:
+            priority = self.current_priority()
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        waited = False
+        entry = (int(priority), next(self._counter))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            self._wake()
+        try:
+            while True:
+                wakeup = loop.create_future()
+                with self._condition:
+                    delay = None
+                    if self._waiting[0] == entry:
+                        delay = self.limiter.try_reserve()
+                        if delay <= 0:
+                            break
+                    # Registered while holding the condition, so that no
+                    # wake up can be missed before waiting on it.
+                    self._wakeups[entry] = (loop, wakeup)
+                try:
+                    await asyncio.wait([wakeup], timeout=delay)
+                finally:
+                    with self._condition:
+                        del self._wakeups[entry]
+                    wakeup.cancel()
+                waited = True
+        finally:
+            with self._condition:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._wake()
+        return time.monotonic() - started if waited else 0.0
+
+
+def _set_done(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
 
 
 class RateLimitedSession(requests.Session):
@@ -9,6 +538,15 @@ class RateLimitedSession(requests.Session):
 
     :param max_calls: Maximum number of calls per period
     :param period: Time period in seconds
+    :param limiter: A `RateLimiter` to use instead of creating one from
+        `max_calls` and `period`. This allows sharing one budget between
+        sessions.
+
+    Requests are scheduled by a `PriorityScheduler`, at the priority set with
+    `priority`, which is `Priority.NORMAL` by default.
+
+    If `on_wait` is set, it is called with the number of seconds waited for
+    the limiter before each request.
 
     Example:
 
@@ -18,28 +556,42 @@ class RateLimitedSession(requests.Session):
 
     max_calls: int
     period: float
+    limiter: RateLimiter
+    scheduler: PriorityScheduler
+    on_wait: Optional[Callable[[float], None]]
 
-    _calls: int
-    _reset_time: float
-
-    def __init__(self, max_calls, period=1.0):
-        self.max_calls = max_calls
-        self.period = period
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        period: float = 1.0,
+        limiter: Optional[RateLimiter] = None,
+    ):
+        if limiter is None:
+            if max_calls is None:
+                raise ValueError("Either max_calls or limiter must be given")
+            limiter = RateLimiter(max_calls=max_calls, period=period)
 
-        self._calls = 0
-        self._reset_time = time.time()
+        self.limiter = limiter
+        self.max_calls = limiter.max_calls
+        self.period = limiter.period
+        self.scheduler = PriorityScheduler(limiter)
+        self.on_wait = None
         super().__init__()
 
+    def priority(self, priority: Union[Priority, int]):
+        """
+        Schedule the requests made in this block by the current thread at
+        `priority`. See `PriorityScheduler.priority`.
+
+        :param priority: The priority of the requests. Lower values go first.
+        """
+
+        return self.scheduler.priority(priority)
+
     def request(self, *args, **kwargs):
-        if time.time() - self._reset_time > self.period:
-            self._calls = 0
-            self._reset_time = time.time()
-
-        if self._calls < self.max_calls:
-            self._calls += 1
-        else:
-            time.sleep(self.period - (time.time() - self._reset_time))
-            # Note that this is self.request, not super().request.
-            return self.request(*args, **kwargs)
-
-        return super().request(*args, **kwargs)
+        waited = self.scheduler.acquire()
+        if self.on_wait is not None:
+            self.on_wait(waited)
+        response = super().request(*args, **kwargs)
+        self.limiter.observe(response)
+        return response
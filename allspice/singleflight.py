@@ -0,0 +1,103 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping, Optional, TypeVar
+from urllib.parse import urlencode
+
+T = TypeVar("T")
+
+
+def request_key(endpoint: str, params: Mapping) -> str:
+    """
+    The key identifying a GET request for coalescing: the endpoint and the
+    query params, in a stable order. The sudo user is part of the params.
+    """
+
+    return endpoint + "?" + urlencode(sorted(params.items()), doseq=True)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one: while a call for a
+    key is running, other threads calling with that key wait for it and
+    receive its result or exception, instead of making the call themselves.
+
+    Calls are only shared while they run, nothing is cached afterwards.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Call `fn`, or wait for the call already running for `key`.
+
+        :param key: The key identifying the call.
+        :param fn: The function to call.
+        :return: The return value of the call.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """
+    The asyncio equivalent of `SingleFlight`. Concurrent calls with the same
+    key await the same task. Cancelling one caller does not cancel the call
+    for the others.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `fn()`, or the call already running for `key`.
+
+        :param key: The key identifying the call.
+        :param fn: A function returning the awaitable to run.
+        :return: The result of the call.
+        """
+
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Retrieve the exception, so that asyncio doesn't log it as never
+        # retrieved when all callers were cancelled.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Request headers that are never written to a cassette.
+_SECRET_HEADERS = frozenset({"authorization", "cookie"})
+
+
+def _load_yaml():
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError(
+            "YAML cassettes require PyYAML. Install it with `pip install py-allspice[replay]`, "
+            "or use a .json cassette."
+        ) from e
+    return yaml
+
+
+def _cassette_files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(path)
+            for name in names
+            if name.endswith((".yaml", ".yml", ".json"))
+        )
+    return [path]
+
+
+def _read_cassette(path: str) -> List[dict]:
+    with open(path, "rb") as file:
+        content = file.read()
+    if path.endswith(".json"):
+        return json.loads(content)["interactions"]
+    return _load_yaml().safe_load(content)["interactions"]
+
+
+def _request_key(method: str, url: str) -> Tuple[str, str, Tuple[Tuple[str, str], ...]]:
+    """
+    The key to match a request to a recorded one: the method, path and query
+    params. The scheme and host are ignored, so that a cassette recorded
+    against one Hub can be replayed with any `allspice_hub_url`.
+    """
+
+    parts = urlsplit(url)
+    return method.upper(), parts.path, tuple(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def _decode_body(body: Union[str, bytes, None], headers: CaseInsensitiveDict) -> bytes:
+    if body is None:
+        return b""
+    if isinstance(body, str):
+        body = body.encode()
+    # A cassette may hold the body as sent, which requests would decompress.
+    encoding = headers.get("Content-Encoding", "").lower()
+    if encoding == "gzip" and body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        try:
+            body = zlib.decompress(body)
+        except zlib.error:
+            pass
+    return body
+
+
+class ReplayTransport(BaseAdapter):
+    """
+    A transport that serves responses recorded in cassettes instead of
+    making requests, e.g. to benchmark utilities offline and reproducibly.
+
+    Cassettes can be written by `RecordTransport`, or by VCR.py, such as the
+    ones in the tests of this library. Requests are matched to recorded ones
+    by method, path and query params. When a request was recorded several
+    times, e.g. a generated file that returned 503 before it was ready, the
+    responses are replayed in order, and the last one is repeated after that.
+
+    :param path: A cassette file, or a directory of cassette files. YAML
+        cassettes require PyYAML; `.json` cassettes don't.
+    :param latency: Seconds to wait before each response, to simulate the
+        network and server.
+    :param jitter: Maximum seconds to randomly add to or remove from
+        `latency` for each response.
+    :param seed: Seed for the jitter, to make runs reproducible.
+
+    Example:
+
+        client = AllSpice(token_text="-", transport=ReplayTransport("cassettes/", latency=0.1))
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._responses: Dict[Tuple, List[dict]] = defaultdict(list)
+        self._played: Dict[Tuple, int] = defaultdict(int)
+
+        for cassette in _cassette_files(os.fspath(path)):
+            for interaction in _read_cassette(cassette):
+                request = interaction["request"]
+                key = _request_key(request["method"], request["uri"])
+                self._responses[key].append(interaction["response"])
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = request.url or ""
+        key = _request_key(request.method or "GET", url)
+        with self._lock:
+            recorded = self._responses.get(key)
+            if not recorded:
+                raise requests.exceptions.ConnectionError(
+                    f"No recorded response for {request.method} {url}", request=request
+                )
+            index = min(self._played[key], len(recorded) - 1)
+            self._played[key] += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        recorded_response = recorded[index]
+        headers = CaseInsensitiveDict(
+            {
+                name: ", ".join(values) if isinstance(values, list) else values
+                for name, values in recorded_response["headers"].items()
+            }
+        )
+
+        response = requests.Response()
+        response.status_code = recorded_response["status"]["code"]
+        response.reason = recorded_response["status"]["message"]
+        response._content = _decode_body(recorded_response["body"]["string"], headers)
+        # The body is already decompressed, and its length may differ.
+        headers.pop("Content-Encoding", None)
+        headers.pop("Content-Length", None)
+        response.headers = headers
+        response.encoding = get_encoding_from_headers(headers)
+        response.url = url
+        response.request = request
+        response.elapsed = timedelta(seconds=max(delay, 0))
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordTransport(HTTPAdapter):
+    """
+    A transport that makes requests like the default one, and records them
+    in a cassette that `ReplayTransport` can replay.
+
+    The cassette is written when the client's session is closed, or when
+    `save` is called. Authorization headers are not recorded.
+
+    :param path: The cassette file to write. If it ends with `.json`, JSON is
+        written, otherwise YAML, which requires PyYAML.
+    :param kwargs: Passed to `HTTPAdapter`, e.g. `max_retries`.
+
+    Example:
+
+        transport = RecordTransport("bom.yaml", max_retries=DEFAULT_RETRY)
+        client = AllSpice(token_text=TOKEN, transport=transport)
+        generate_bom(client, ...)
+        transport.save()
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = os.fspath(path)
+        self._lock = threading.Lock()
+        self._interactions: List[dict] = []
+
+    def send(self, request, *args, **kwargs):
+        response = super().send(request, *args, **kwargs)
+
+        body = request.body
+        if isinstance(body, bytes):
+            try:
+                body = body.decode()
+            except UnicodeDecodeError:
+                pass
+        try:
+            response_body: Union[str, bytes] = response.content.decode()
+        except UnicodeDecodeError:
+            response_body = response.content
+
+        interaction = {
+            "request": {
+                "body": body,
+                "headers": {
+                    name: [value]
+                    for name, value in request.headers.items()
+                    if name.lower() not in _SECRET_HEADERS
+                },
+                "method": request.method,
+                "uri": request.url,
+            },
+            "response": {
+                "body": {"string": response_body},
+                "headers": {
+                    name: [value]
+                    for name, value in response.headers.items()
+                    # The recorded body is decompressed.
+                    if name.lower() not in ("content-encoding", "content-length")
+                },
+                "status": {"code": response.status_code, "message": response.reason},
+            },
+        }
+        with self._lock:
+            self._interactions.append(interaction)
+        return response
+
+    def save(self):
+        """Write the interactions recorded so far to the cassette."""
+
+        with self._lock:
+            cassette = {"interactions": list(self._interactions), "version": 1}
+        if self.path.endswith(".json"):
+            for interaction in cassette["interactions"]:
+                if isinstance(interaction["response"]["body"]["string"], bytes):
+                    raise ValueError("Binary responses can only be recorded in YAML cassettes.")
+            content = json.dumps(cassette, indent=2)
+        else:
+            content = _load_yaml().safe_dump(cassette, allow_unicode=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(content)
+
+    def close(self):
+        self.save()
+        super().close()
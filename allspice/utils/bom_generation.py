@@ -5,16 +5,19 @@ from __future__ import annotations
 import re
 from dataclasses import dataclass
 from enum import Enum
-from typing import Iterable, Mapping, Optional, Union
+from typing import TYPE_CHECKING, Iterable, Mapping, Optional, Union
 
-from ..allspice import AllSpice
-from ..apiobject import Ref, Repository
 from .list_components import (
     ComponentAttributes,
     SupportedTool,
     infer_project_tool,
     list_components,
 )
+from .profiling import phase
+
+if TYPE_CHECKING:
+    from ..allspice import AllSpice
+    from ..apiobject import Ref, Repository
 
 QUANTITY_COLUMN_NAME = "Quantity"
 
@@ -107,6 +110,7 @@ BomEntry = dict[str, str]
 Bom = list[BomEntry]
 
 
+@phase("generate_bom")
 def generate_bom(
     allspice_client: AllSpice,
     repository: Repository,
@@ -197,11 +201,12 @@ def generate_bom(
         for column_name, column_config in columns.items()
     }
 
-    mapped_components = _map_attributes(components, columns_mapping)
-    bom = _group_entries(mapped_components, group_by, columns_mapping)
-    bom = _filter_rows(bom, columns_mapping)
-    bom = _sort_columns(bom, columns_mapping)
-    bom = _skip_columns(bom, columns_mapping)
+    with phase("group_entries"):
+        mapped_components = _map_attributes(components, columns_mapping)
+        bom = _group_entries(mapped_components, group_by, columns_mapping)
+        bom = _filter_rows(bom, columns_mapping)
+        bom = _sort_columns(bom, columns_mapping)
+        bom = _skip_columns(bom, columns_mapping)
 
     return bom
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-import time
+from typing import TYPE_CHECKING, Optional
 
-from ..apiobject import Ref, Repository
-from ..exceptions import NotYetGeneratedException
+from .retry_generated import WaitStrategy, retry_not_yet_generated
+
+if TYPE_CHECKING:
+    from ..apiobject import Ref, Repository
 
 
 # TODO: We should strongly type the schema for PCB files
@@ -11,22 +13,14 @@ def get_all_pcb_components(
     repository: Repository,
     ref: Ref,
     pcb_file: str,
+    wait: Optional[WaitStrategy] = None,
 ) -> dict:
     """
     Get all component data from a Pcb file.
-    """
 
-    retry_count = 0
-    while True:
-        retry_count += 1
-        try:
-            pcb_json = repository.get_generated_json(pcb_file, ref=ref)
-            break
-        except NotYetGeneratedException:
-            if retry_count > 20:
-                break
-            # Wait a bit before retrying.
-            time.sleep(0.5)
-            continue
+    :param wait: How to wait while the file is generated. By default, the
+        strategy used by `retry_not_yet_generated`.
+    """
 
+    pcb_json = retry_not_yet_generated(repository.get_generated_json, pcb_file, ref, wait=wait)
     return pcb_json["component_instances"]
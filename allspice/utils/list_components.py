@@ -1,5 +1,7 @@
 # cspell:ignore jsons
 
+from __future__ import annotations
+
 import configparser
 import dataclasses
 import functools
@@ -10,12 +12,15 @@ from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
 from logging import Logger
-from typing import Mapping, Optional
+from typing import TYPE_CHECKING, Mapping, Optional
 
-from ..allspice import AllSpice
-from ..apiobject import Ref, Repository
 from ..exceptions import NotFoundException
-from .retry_generated import retry_not_yet_generated
+from .profiling import phase
+from .retry_generated import fetch_all_generated, fetch_generated
+
+if TYPE_CHECKING:
+    from ..allspice import AllSpice
+    from ..apiobject import Ref, Repository
 
 PCB_FOOTPRINT_ATTR_NAME = "PCB Footprint"
 
@@ -129,6 +134,7 @@ Mapping of the name of a sheet to its children.
 """
 
 
+@phase("list_components")
 def list_components(
     allspice_client: AllSpice,
     repository: Repository,
@@ -261,11 +267,12 @@ def list_components_for_altium(
     # Altium adds the Byte Order Mark to UTF-8 files, so we need to decode the
     # file content with utf-8-sig to remove it. However, some files may contain
     # ISO-8859-1 characters, so we'll try UTF-8 and fall back to ISO-8859-1.
-    raw_content = repository.get_raw_file(prjpcb_file, ref=ref)
-    try:
-        prjpcb_file_contents = raw_content.decode("utf-8-sig")
-    except UnicodeDecodeError:
-        prjpcb_file_contents = raw_content.decode("iso-8859-1")
+    with phase("fetch_prjpcb"):
+        raw_content = repository.get_raw_file(prjpcb_file, ref=ref)
+        try:
+            prjpcb_file_contents = raw_content.decode("utf-8-sig")
+        except UnicodeDecodeError:
+            prjpcb_file_contents = raw_content.decode("iso-8859-1")
 
     prjpcb_ini = configparser.ConfigParser(interpolation=None)
     prjpcb_ini.read_string(prjpcb_file_contents)
@@ -288,14 +295,15 @@ def list_components_for_altium(
     if not project_documents:
         raise ValueError("No Project Documents found in the PrjPcb file.")
 
-    try:
-        annotations_data = _fetch_and_parse_annotation_file(repository, prjpcb_file, ref)
-        allspice_client.logger.info("Found annotations file, %d entries", len(annotations_data))
-    except Exception as e:
-        if device_sheets:
-            allspice_client.logger.warning("Failed to fetch annotations file: %s", e)
-            allspice_client.logger.warning("Component designators may not be correct.")
-        annotations_data = {}
+    with phase("fetch_annotations"):
+        try:
+            annotations_data = _fetch_and_parse_annotation_file(repository, prjpcb_file, ref)
+            allspice_client.logger.info("Found annotations file, %d entries", len(annotations_data))
+        except Exception as e:
+            if device_sheets:
+                allspice_client.logger.warning("Failed to fetch annotations file: %s", e)
+                allspice_client.logger.warning("Component designators may not be correct.")
+            annotations_data = {}
 
     # Mapping of schdoc file paths from the project file to their JSON
     schdoc_jsons: dict[str, dict] = {}
@@ -316,38 +324,49 @@ def list_components_for_altium(
     #    referring to using this, which is why `device_sheet_jsons` uses these
     #    as the keys.
 
-    for schdoc_file in project_documents:
-        schdoc_path_from_repo_root = _resolve_prjpcb_relative_path(schdoc_file, prjpcb_file)
-
-        schdoc_json = _normalize_schdoc_json(
-            retry_not_yet_generated(
-                repository.get_generated_json,
-                schdoc_path_from_repo_root,
-                ref,
-                params={"use_new_schdoc_renderer": "true"},
+    with phase("find_device_sheets"):
+        device_sheet_locations = [
+            _find_device_sheet(
+                device_sheet,
+                repository,
+                prjpcb_file,
+                design_reuse_repos,
+                allspice_client.logger,
             )
-        )
-        schdoc_jsons[schdoc_path_from_repo_root] = schdoc_json
+            for device_sheet in device_sheets
+        ]
 
-    for device_sheet in device_sheets:
-        device_sheet_repo, device_sheet_path = _find_device_sheet(
-            device_sheet,
-            repository,
-            prjpcb_file,
-            design_reuse_repos,
-            allspice_client.logger,
+    # Request the JSON of every sheet before waiting for any of them, so that
+    # Hub generates them all at the same time. The components are only read
+    # from the schematics, so the PcbDoc is never fetched here.
+    schematic_params = {"use_new_schdoc_renderer": "true"}
+    fetches = {}
+    for schdoc_file in project_documents:
+        schdoc_path_from_repo_root = _resolve_prjpcb_relative_path(schdoc_file, prjpcb_file)
+        fetches[("schdoc", schdoc_path_from_repo_root)] = functools.partial(
+            fetch_generated,
+            repository.get_generated_json,
+            schdoc_path_from_repo_root,
+            ref,
+            schematic_params,
         )
-        device_sheet_json = _normalize_schdoc_json(
-            retry_not_yet_generated(
-                device_sheet_repo.get_generated_json,
-                device_sheet_path.as_posix(),
-                # Note the default branch here - we can't assume the same ref is
-                # available.
-                device_sheet_repo.default_branch,
-                params={"use_new_schdoc_renderer": "true"},
-            )
+    for device_sheet_repo, device_sheet_path in device_sheet_locations:
+        fetches[("device_sheet", device_sheet_path.stem)] = functools.partial(
+            fetch_generated,
+            device_sheet_repo.get_generated_json,
+            device_sheet_path.as_posix(),
+            # Note the default branch here - we can't assume the same ref is
+            # available.
+            device_sheet_repo.default_branch,
+            schematic_params,
         )
-        device_sheet_jsons[device_sheet_path.stem] = device_sheet_json
+
+    with phase("fetch_schdoc_json"):
+        for (kind, name), generated_json in fetch_all_generated(fetches).items():
+            if kind == "schdoc":
+                schdoc_jsons[name] = _normalize_schdoc_json(generated_json)
+            else:
+                device_sheet_jsons[name] = _normalize_schdoc_json(generated_json)
 
     found_legacy = any(_is_legacy_schdoc_json(schdoc_json) for schdoc_json in schdoc_jsons.values())
     found_multi_page = any(
@@ -361,9 +380,10 @@ def list_components_for_altium(
         )
     use_legacy_processing = found_legacy
 
-    independent_sheets, hierarchy = _build_schdoc_hierarchy(
-        schdoc_jsons, device_sheet_jsons, use_legacy_processing
-    )
+    with phase("build_schdoc_hierarchy"):
+        independent_sheets, hierarchy = _build_schdoc_hierarchy(
+            schdoc_jsons, device_sheet_jsons, use_legacy_processing
+        )
 
     unique_ids_mapping = _create_unique_ids_mapping(prjpcb_ini)
     if device_sheets:
@@ -377,41 +397,43 @@ def list_components_for_altium(
     allspice_client.logger.debug("Hierarchy: %s", hierarchy)
 
     # Now we can build a combined mapping of documents and device sheets:
-    sheets_to_components = {}
-    for schdoc_file, schdoc_json in schdoc_jsons.items():
-        sheets_to_components[schdoc_file] = _extract_components_from_schdoc_json(
-            schdoc_json, use_legacy_processing
-        )
-    for device_sheet_name, device_sheet_json in device_sheet_jsons.items():
-        sheets_to_components[device_sheet_name] = _extract_components_from_schdoc_json(
-            device_sheet_json, use_legacy_processing
-        )
-
-    components = []
+    with phase("extract_components"):
+        sheets_to_components = {}
+        for schdoc_file, schdoc_json in schdoc_jsons.items():
+            sheets_to_components[schdoc_file] = _extract_components_from_schdoc_json(
+                schdoc_json, use_legacy_processing
+            )
+        for device_sheet_name, device_sheet_json in device_sheet_jsons.items():
+            sheets_to_components[device_sheet_name] = _extract_components_from_schdoc_json(
+                device_sheet_json, use_legacy_processing
+            )
 
-    for independent_sheet in independent_sheets:
-        components.extend(
-            _extract_components_altium(
-                independent_sheet,
-                sheets_to_components,
-                hierarchy,
-                parent_sheet_id="",
-                current_sheet=None,
-                use_legacy_processing=use_legacy_processing,
+        components = []
+
+        for independent_sheet in independent_sheets:
+            components.extend(
+                _extract_components_altium(
+                    independent_sheet,
+                    sheets_to_components,
+                    hierarchy,
+                    parent_sheet_id="",
+                    current_sheet=None,
+                    use_legacy_processing=use_legacy_processing,
+                )
             )
-        )
 
     # At this stage, we have components where the designators are not final.
 
-    if annotations_data:
-        components = _apply_annotation_file(
-            components,
-            annotations_data,
-            unique_ids_mapping,
-            allspice_client.logger,
-        )
-    else:
-        components = _compute_repetitions(components)
+    with phase("apply_annotations"):
+        if annotations_data:
+            components = _apply_annotation_file(
+                components,
+                annotations_data,
+                unique_ids_mapping,
+                allspice_client.logger,
+            )
+        else:
+            components = _compute_repetitions(components)
 
     if combine_multi_part:
         # Multi part components must be combined *after* we've processed
@@ -664,11 +686,22 @@ def _list_components_multi_page_schematic(
 
     variant_id = ""
 
-    # verify that the provided variant exists and convert to an id
+    # Request the project data for the variants along with the JSON, so that
+    # Hub generates both at the same time.
+    fetches = {
+        "json": functools.partial(
+            fetch_generated, repository.get_generated_json, schematic_path, ref
+        )
+    }
     if variant is not None:
-        prj_data = retry_not_yet_generated(
-            repository.get_generated_projectdata, schematic_path, ref
+        fetches["projectdata"] = functools.partial(
+            fetch_generated, repository.get_generated_projectdata, schematic_path, ref
         )
+    generated = fetch_all_generated(fetches)
+
+    # verify that the provided variant exists and convert to an id
+    if variant is not None:
+        prj_data = generated["projectdata"]
         if "variants" in prj_data:
             for id, name in prj_data["variants"].items():
                 if name == variant:
@@ -677,8 +710,7 @@ def _list_components_multi_page_schematic(
         if variant_id == "":
             raise NotFoundException("Variant %s does not exist in design." % variant)
 
-    # Get the generated JSON for the schematic.
-    schematic_json = retry_not_yet_generated(repository.get_generated_json, schematic_path, ref)
+    schematic_json = generated["json"]
     pages = schematic_json["pages"]
     components = []
 
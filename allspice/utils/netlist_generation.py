@@ -3,12 +3,15 @@ from __future__ import annotations
 import warnings
 from dataclasses import dataclass
 from logging import Logger
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from allspice.utils.core import get_all_pcb_components
 
-from ..allspice import AllSpice
-from ..apiobject import Content, Ref, Repository
+from .profiling import phase
+
+if TYPE_CHECKING:
+    from ..allspice import AllSpice
+    from ..apiobject import Content, Ref, Repository
 
 
 @dataclass
@@ -46,6 +49,7 @@ Mapping of net names to sets of pin designators.
 """
 
 
+@phase("generate_netlist")
 def generate_netlist(
     allspice_client: AllSpice,
     repository: Repository,
@@ -68,6 +72,9 @@ def generate_netlist(
     allspice_client.logger.info(f"Generating netlist for {repository.name=} on {ref=}")
     allspice_client.logger.info(f"Fetching {pcb_file=}")
 
+    # Deferred, so that importing this module doesn't import the API objects.
+    from ..apiobject import Content
+
     if isinstance(pcb_file, Content):
         pcb_file_path = pcb_file.path
     else:
@@ -80,7 +87,8 @@ def generate_netlist(
         pcb_file_path,
     )
 
-    return _group_netlist_entries(pcb_components)
+    with phase("group_netlist_entries"):
+        return _group_netlist_entries(pcb_components)
 
 
 def _extract_all_pcb_components(
@@ -94,7 +102,8 @@ def _extract_all_pcb_components(
     """
 
     components = []
-    component_instances = get_all_pcb_components(repository, ref, pcb_file)
+    with phase("fetch_pcb_json"):
+        component_instances = get_all_pcb_components(repository, ref, pcb_file)
 
     for component in component_instances.values():
         if "designator" not in component:
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+if TYPE_CHECKING:
+    from ..allspice import AllSpice
+
+
+@dataclass
+class PhaseReport:
+    """The totals recorded for one phase."""
+
+    name: str
+    """
+    The name of the phase, prefixed with the names of the phases it ran in,
+    e.g. "generate_bom/list_components/fetch_schdoc_json".
+    """
+
+    count: int = 0
+    """The number of times the phase ran."""
+
+    wall_time: float = 0.0
+    """The total time spent in the phase, in seconds."""
+
+    api_calls: int = 0
+    """The number of responses received from the API during the phase."""
+
+    peak_memory: Optional[int] = None
+    """
+    The highest memory use traced by tracemalloc during the phase, in bytes,
+    or None if memory was not traced.
+    """
+
+
+@dataclass
+class ProfileReport:
+    """
+    The phases recorded by `profile`, in the order they were first entered.
+    """
+
+    phases: list[PhaseReport] = field(default_factory=list)
+    wall_time: float = 0.0
+    api_calls: int = 0
+    peak_memory: Optional[int] = None
+
+    def phase(self, name: str) -> Optional[PhaseReport]:
+        """Get a phase by its full name."""
+
+        return next((phase for phase in self.phases if phase.name == name), None)
+
+    def to_dict(self) -> dict:
+        """The report as a dict that can be serialized as JSON."""
+
+        return asdict(self)
+
+    def format(self) -> str:
+        """The report as a text table, e.g. for logs or CI output."""
+
+        lines = [
+            f"{'phase':<60} {'count':>6} {'time (s)':>10} {'api calls':>10} {'peak (MiB)':>11}"
+        ]
+        rows = [
+            *self.phases,
+            PhaseReport("total", 1, self.wall_time, self.api_calls, self.peak_memory),
+        ]
+        for phase in rows:
+            peak = "" if phase.peak_memory is None else f"{phase.peak_memory / 1024 / 1024:.1f}"
+            lines.append(
+                f"{phase.name:<60} {phase.count:>6} {phase.wall_time:>10.3f} "
+                f"{phase.api_calls:>10} {peak:>11}"
+            )
+        return "\n".join(lines)
+
+
+class _Frame:
+    """A phase that is currently running."""
+
+    def __init__(self, name: str, api_calls: int):
+        self.name = name
+        self.started = time.perf_counter()
+        self.api_calls = api_calls
+        self.peak_memory = 0
+
+
+class _Profiler:
+    def __init__(self, trace_memory: bool):
+        self.report = ProfileReport()
+        self.trace_memory = trace_memory
+        self.api_calls = 0
+        self._lock = threading.Lock()
+
+    def count_response(self, response, *args, **kwargs):
+        # Responses may be received by other threads.
+        with self._lock:
+            self.api_calls += 1
+
+    def enter(self, stack: tuple[_Frame, ...], name: str) -> _Frame:
+        full_name = f"{stack[-1].name}/{name}" if stack else name
+        # Phases may run in several threads at once, e.g. while fetching
+        # generated files concurrently, and share their outer phases.
+        with self._lock:
+            if self.trace_memory:
+                # Every running phase has seen the peak so far. Reset it so
+                # that the new phase only sees its own.
+                peak = tracemalloc.get_traced_memory()[1]
+                for frame in stack:
+                    frame.peak_memory = max(frame.peak_memory, peak)
+                tracemalloc.reset_peak()
+            return _Frame(full_name, self.api_calls)
+
+    def exit(self, stack: tuple[_Frame, ...], frame: _Frame):
+        wall_time = time.perf_counter() - frame.started
+        with self._lock:
+            phase = self.report.phase(frame.name)
+            if phase is None:
+                phase = PhaseReport(frame.name)
+                self.report.phases.append(phase)
+            phase.count += 1
+            phase.wall_time += wall_time
+            phase.api_calls += self.api_calls - frame.api_calls
+            if self.trace_memory:
+                frame.peak_memory = max(frame.peak_memory, tracemalloc.get_traced_memory()[1])
+                phase.peak_memory = max(phase.peak_memory or 0, frame.peak_memory)
+                if stack:
+                    stack[-1].peak_memory = max(stack[-1].peak_memory, frame.peak_memory)
+
+
+_profiler: ContextVar[Optional[_Profiler]] = ContextVar("allspice_profiler", default=None)
+_stack: ContextVar[tuple[_Frame, ...]] = ContextVar("allspice_profile_stack", default=())
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Mark a named phase of a utility for `profile`. This does nothing when not
+    profiling. Can also be used as a decorator.
+
+    :param name: The name of the phase.
+    """
+
+    profiler = _profiler.get()
+    if profiler is None:
+        yield
+        return
+
+    stack = _stack.get()
+    frame = profiler.enter(stack, name)
+    token = _stack.set((*stack, frame))
+    try:
+        yield
+    finally:
+        _stack.reset(token)
+        profiler.exit(stack, frame)
+
+
+@contextmanager
+def profile(
+    allspice_client: Optional[AllSpice] = None,
+    trace_memory: bool = True,
+) -> Iterator[ProfileReport]:
+    """
+    Profile the phases of utilities such as `list_components`, `generate_bom`
+    and `generate_netlist`, recording the wall time, API calls and peak memory
+    of each phase.
+
+    Phases are tracked per thread and per asyncio task, so only phases run by
+    the code in the `with` block are recorded. API calls are counted for all
+    requests made by `allspice_client` while a phase runs, including requests
+    made by other threads.
+
+    :param allspice_client: The client to count API calls of. If None, API
+        calls are not counted.
+    :param trace_memory: If True, trace memory allocations with tracemalloc to
+        record the peak memory use of each phase. This slows down Python code
+        noticeably.
+    :return: A `ProfileReport`, which is filled in when the block exits.
+
+    Example:
+
+        with profile(allspice_client) as report:
+            generate_bom(allspice_client, repository, "Project.PrjPcb", columns)
+        print(report.format())
+    """
+
+    profiler = _Profiler(trace_memory)
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    hooks = allspice_client.requests.hooks["response"] if allspice_client is not None else []
+    hooks.append(profiler.count_response)
+    profiler_token = _profiler.set(profiler)
+    stack_token = _stack.set(())
+    started = time.perf_counter()
+    try:
+        yield profiler.report
+    finally:
+        profiler.report.wall_time = time.perf_counter() - started
+        profiler.report.api_calls = profiler.api_calls
+        if trace_memory:
+            profiler.report.peak_memory = max(
+                [tracemalloc.get_traced_memory()[1]]
+                + [phase.peak_memory or 0 for phase in profiler.report.phases]
+            )
+        _stack.reset(stack_token)
+        _profiler.reset(profiler_token)
+        hooks.remove(profiler.count_response)
+        if started_tracing:
+            tracemalloc.stop()
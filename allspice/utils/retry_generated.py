@@ -1,16 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import random
 import time
-from typing import Callable, Optional, TypeVar, Union
+from concurrent import futures
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, Mapping, Optional, TypeVar, Union
 
-from ..apiobject import Content, Ref
 from ..exceptions import InternalServerException, NotYetGeneratedException, RenderException
+from .profiling import phase
+
+if TYPE_CHECKING:
+    from ..apiobject import Content, Ref
 
 MAX_RETRIES_FOR_GENERATED = 10
 """The maximum number of times to retry fetching generated JSON files."""
 
 SLEEP_FOR_GENERATED = 1
-"""The amount of time to sleep between attempts to fetch generated JSON files."""
+"""
+The time to wait before the first retry of fetching generated JSON files.
+Later waits back off, or follow the Retry-After sent by the server, within a
+total of `MAX_RETRIES_FOR_GENERATED * SLEEP_FOR_GENERATED` seconds. Set this
+to 0 to never wait.
+"""
 
+T = TypeVar("T")
 TReturn = TypeVar("TReturn")
+TKey = TypeVar("TKey", bound=Hashable)
+
+
+class WaitStrategy:
+    """
+    How to wait between attempts to fetch a file that AllSpice Hub is still
+    generating.
+
+    When the server sends a Retry-After with its 503, that is how long we
+    wait. Otherwise, the wait starts at `initial_delay` and is multiplied by
+    `multiplier` after every attempt, up to `max_delay`, with random jitter so
+    that many clients waiting for the same file don't retry in lockstep.
+
+    :param initial_delay: Seconds to wait before the first retry.
+    :param max_delay: The longest wait between two attempts, in seconds,
+        including waits asked for by Retry-After.
+    :param multiplier: Factor to grow the wait by after each attempt.
+    :param jitter: Fraction of the backoff to randomly add or remove, e.g.
+        0.25 for waits between 75% and 125% of the backoff.
+    :param max_attempts: The maximum number of attempts, or None for no limit.
+    :param deadline: The maximum number of seconds to keep trying for, or
+        None for no limit. The last wait is shortened to end at the deadline.
+
+    Example:
+
+        wait = WaitStrategy(initial_delay=0.5, deadline=120)
+        pcb_json = wait.call(lambda: repository.get_generated_json("Board.PcbDoc"))
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 16.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.25,
+        max_attempts: Optional[int] = 10,
+        deadline: Optional[float] = None,
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        The number of seconds to wait after a failed attempt.
+
+        :param attempt: The number of attempts made so far, starting at 1.
+        :param retry_after: The Retry-After sent by the server, if any.
+        """
+
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        backoff = min(self.initial_delay * self.multiplier ** (attempt - 1), self.max_delay)
+        return backoff * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _next_delay(
+        self,
+        attempt: int,
+        started: float,
+        exception: NotYetGeneratedException,
+    ) -> Optional[float]:
+        """The wait before the next attempt, or None if we should give up."""
+
+        if self.max_attempts is not None and attempt >= self.max_attempts:
+            return None
+        delay = self.delay(attempt, exception.retry_after)
+        if self.deadline is not None:
+            remaining = self.deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                return None
+            delay = min(delay, remaining)
+        return delay
+
+    def call(self, fn: Callable[[], T], description: str = "generated file") -> T:
+        """
+        Call `fn` until it stops raising `NotYetGeneratedException`, waiting
+        between attempts.
+
+        :param fn: The function fetching the file.
+        :param description: What is being fetched, for the error message.
+        :return: The return value of `fn`.
+        :raises TimeoutError: If the attempts or the deadline ran out.
+        """
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return fn()
+            except NotYetGeneratedException as e:
+                delay = self._next_delay(attempt, started, e)
+                if delay is None:
+                    raise TimeoutError(
+                        f"Failed to fetch {description} after {attempt} attempts."
+                    ) from e
+            with phase("wait_for_generation"):
+                time.sleep(delay)
+
+    async def call_async(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        description: str = "generated file",
+    ) -> T:
+        """
+        The asyncio equivalent of `call`: await `fn()` until it stops raising
+        `NotYetGeneratedException`, without blocking the event loop.
+        """
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await fn()
+            except NotYetGeneratedException as e:
+                delay = self._next_delay(attempt, started, e)
+                if delay is None:
+                    raise TimeoutError(
+                        f"Failed to fetch {description} after {attempt} attempts."
+                    ) from e
+            with phase("wait_for_generation"):
+                await asyncio.sleep(delay)
+
+
+def default_wait_strategy() -> WaitStrategy:
+    """
+    The wait strategy configured by `SLEEP_FOR_GENERATED` and
+    `MAX_RETRIES_FOR_GENERATED`, which are read on every call so that they
+    can be changed at runtime.
+
+    The first wait is `SLEEP_FOR_GENERATED`, and later ones back off or
+    follow Retry-After, but the total wait stays within
+    `MAX_RETRIES_FOR_GENERATED * SLEEP_FOR_GENERATED`. To wait longer, e.g.
+    for files that take minutes to generate, pass a `WaitStrategy` with a
+    larger `deadline` instead.
+    """
+
+    if SLEEP_FOR_GENERATED <= 0:
+        return WaitStrategy(initial_delay=0, max_delay=0, max_attempts=MAX_RETRIES_FOR_GENERATED)
+    return WaitStrategy(
+        initial_delay=SLEEP_FOR_GENERATED,
+        max_attempts=MAX_RETRIES_FOR_GENERATED,
+        deadline=MAX_RETRIES_FOR_GENERATED * SLEEP_FOR_GENERATED,
+    )
+
+
+def _render_exception(
+    e: InternalServerException,
+    file_path: Union[Content, str],
+    ref: Optional[Ref],
+) -> Optional[RenderException]:
+    return RenderException.from_internal(e, str(file_path), str(ref) if ref is not None else None)
+
+
+def fetch_generated(
+    method: Callable[[Union[Content, str], Optional[Ref], Optional[dict]], TReturn],
+    file_path: Union[Content, str],
+    ref: Optional[Ref] = None,
+    params: Optional[dict] = None,
+) -> TReturn:
+    """
+    Request an AllSpice generated endpoint once, raising a `RenderException`
+    if rendering the file failed.
+
+    :param method: The request method, as for `retry_not_yet_generated`.
+    :param file_path: The path to the design document
+    :param ref: The git ref to check.
+    :param params: Optional parameters to pass to the method.
+    :raises NotYetGeneratedException: If the file is still being generated.
+    """
+
+    try:
+        return method(file_path, ref, params)
+    except InternalServerException as e:
+        render_exception = _render_exception(e, file_path, ref)
+        if render_exception is not None:
+            raise render_exception from e
+        raise
+
+
+def fetch_all_generated(
+    fetches: Mapping[TKey, Callable[[], T]],
+    wait: Optional[WaitStrategy] = None,
+    concurrency: int = 8,
+) -> dict[TKey, T]:
+    """
+    Fetch many generated files, waiting for all of them at once.
+
+    Every fetch is first made once, which makes AllSpice Hub start generating
+    every file that isn't ready yet. The ones that were not ready are then
+    polled round-robin, each waiting as given by `wait`, until all are
+    ready. Compared to fetching the files one after another, waiting for
+    files that are not generated yet takes as long as the slowest file, not
+    as long as all of them together.
+
+    :param fetches: Functions that each fetch one file, and raise
+        `NotYetGeneratedException` while it isn't ready, e.g. made with
+        `fetch_generated`. The keys identify the files.
+    :param wait: How to wait between attempts for each file. By default, the
+        strategy configured by `SLEEP_FOR_GENERATED` and
+        `MAX_RETRIES_FOR_GENERATED`.
+    :param concurrency: The maximum number of requests made at once.
+    :return: The return values of the fetches, by key, in the order of
+        `fetches`.
+    :raises TimeoutError: If the attempts or the deadline ran out for a file.
+
+    Example:
+
+        schdoc_jsons = fetch_all_generated(
+            {
+                path: functools.partial(fetch_generated, repository.get_generated_json, path, ref)
+                for path in schdoc_paths
+            }
+        )
+    """
+
+    wait = wait or default_wait_strategy()
+    results: dict[TKey, T] = {}
+    attempts = dict.fromkeys(fetches, 0)
+    started = time.monotonic()
+    # Fetches waiting for their next attempt, as (time, order, key).
+    scheduled: list[tuple[float, int, TKey]] = []
+    order = {key: index for index, key in enumerate(fetches)}
+
+    executor = futures.ThreadPoolExecutor(max_workers=concurrency)
+
+    def submit(key: TKey) -> futures.Future:
+        # Run each fetch in a copy of this context, e.g. so that requests are
+        # made at the priority set by the caller.
+        return executor.submit(contextvars.copy_context().run, fetches[key])
+
+    try:
+        running = {submit(key): key for key in fetches}
+        while running or scheduled:
+            now = time.monotonic()
+            while scheduled and scheduled[0][0] <= now:
+                key = heapq.heappop(scheduled)[2]
+                running[submit(key)] = key
+            timeout = scheduled[0][0] - now if scheduled else None
+
+            if not running:
+                with phase("wait_for_generation"):
+                    time.sleep(max(timeout or 0.0, 0.0))
+                continue
+
+            done, _ = futures.wait(running, timeout=timeout, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                key = running.pop(future)
+                attempts[key] += 1
+                try:
+                    results[key] = future.result()
+                except NotYetGeneratedException as e:
+                    delay = wait._next_delay(attempts[key], started, e)
+                    if delay is None:
+                        raise TimeoutError(
+                            f"Failed to fetch {key} after {attempts[key]} attempts."
+                        ) from e
+                    heapq.heappush(scheduled, (time.monotonic() + delay, order[key], key))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return {key: results[key] for key in fetches}
 
 
 def retry_not_yet_generated(
@@ -18,6 +300,7 @@ def retry_not_yet_generated(
     file_path: Union[Content, str],
     ref: Optional[Ref] = None,
     params: Optional[dict] = None,
+    wait: Optional[WaitStrategy] = None,
 ) -> TReturn:
     """
     Request AllSpice generated endpoints with retries if not yet available.
@@ -31,25 +314,36 @@ def retry_not_yet_generated(
     :param file_path: The path to the design document
     :param ref: The git ref to check.
     :param params: Optional parameters to pass to the method.
+    :param wait: How to wait between attempts. By default, the strategy
+        configured by `SLEEP_FOR_GENERATED` and `MAX_RETRIES_FOR_GENERATED`.
     :returns: The return value of the method if successful
     """
-    attempts = 0
-    while attempts < MAX_RETRIES_FOR_GENERATED:
-        try:
-            return method(file_path, ref, params)
-        except NotYetGeneratedException:
-            attempts += 1
-            time.sleep(SLEEP_FOR_GENERATED)
-        except InternalServerException as e:
-            render_exception = RenderException.from_internal(
-                e, str(file_path), str(ref) if ref is not None else None
-            )
-
-            if render_exception is not None:
-                raise render_exception from e
-            else:
-                raise
-
-    raise TimeoutError(
-        f"Failed to fetch JSON for {file_path} after {MAX_RETRIES_FOR_GENERATED} attempts."
+
+    wait = wait or default_wait_strategy()
+    return wait.call(
+        lambda: fetch_generated(method, file_path, ref, params), f"JSON for {file_path}"
     )
+
+
+async def retry_not_yet_generated_async(
+    method: Callable[[Union[Content, str], Optional[Ref], Optional[dict]], Awaitable[TReturn]],
+    file_path: Union[Content, str],
+    ref: Optional[Ref] = None,
+    params: Optional[dict] = None,
+    wait: Optional[WaitStrategy] = None,
+) -> TReturn:
+    """
+    The asyncio equivalent of `retry_not_yet_generated`, for coroutine
+    functions such as the methods of `AsyncAllSpice`.
+    """
+
+    wait = wait or default_wait_strategy()
+    try:
+        return await wait.call_async(
+            lambda: method(file_path, ref, params), f"JSON for {file_path}"
+        )
+    except InternalServerException as e:
+        render_exception = _render_exception(e, file_path, ref)
+        if render_exception is not None:
+            raise render_exception from e
+        raise
@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+
+"""
+Benchmark `Util.convert_time` on the timestamps of many commit and issue
+records, comparing it with the strptime based parsing it replaced.
+
+Usage: python scripts/benchmark_convert_time.py [--records 100000] [--repeat 3]
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+
+from allspice.apiobject import Util, _convert_time
+
+
+def convert_time_strptime(time: str) -> datetime:
+    """`Util.convert_time` before it used fromisoformat and a cache."""
+
+    try:
+        return datetime.strptime(time[:-3] + "00", "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        return datetime.strptime(time[:-3] + "00", "%Y-%m-%dT%H:%M:%S")
+
+
+def timestamps(records: int, seed: int) -> list[str]:
+    """
+    The created and updated timestamps of `records` records, as sent by Hub.
+    Like in real listings, many records were never updated after they were
+    created, and share timestamps with records created at the same time.
+    """
+
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    times = []
+    for _ in range(records):
+        created = start + timedelta(seconds=rng.randrange(0, 30 * 24 * 3600, 60))
+        updated = created
+        if rng.random() < 0.5:
+            updated += timedelta(seconds=rng.randrange(0, 30 * 24 * 3600, 60))
+        for time in (created, updated):
+            if rng.random() < 0.1:
+                times.append(time.astimezone(timezone(timedelta(hours=-7))).isoformat())
+            else:
+                times.append(time.strftime("%Y-%m-%dT%H:%M:%SZ"))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Util.convert_time.")
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    times = timestamps(args.records, args.seed)
+    assert [Util.convert_time(time) for time in times] == [
+        convert_time_strptime(time) for time in times
+    ]
+
+    def run(convert):
+        def parse_all():
+            for time in times:
+                convert(time)
+
+        return min(timeit.repeat(parse_all, number=1, repeat=args.repeat))
+
+    baseline = run(convert_time_strptime)
+
+    results = [
+        ("strptime", baseline),
+        ("fromisoformat", run(_convert_time.__wrapped__)),
+    ]
+    _convert_time.cache_clear()
+    results.append(("cached", run(Util.convert_time)))
+
+    print(f"{len(times):,} timestamps of {args.records:,} records")
+    for name, duration in results:
+        print(
+            f"  {name:<14}{len(times) / duration:12,.0f} timestamps/s  ({baseline / duration:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+
+"""
+Measure how long `import allspice` takes with `python -X importtime`, and
+fail if it is slower than a budget, or if it imports modules that should only
+be imported when first used.
+
+Usage: python scripts/benchmark_import_time.py [--runs 5] [--max-ms 50]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+# Modules that `import allspice` must not import. They are imported when the
+# client or the API objects are first used.
+DEFERRED_MODULES = ["requests", "urllib3", "frozendict", "allspice.allspice", "allspice.apiobject"]
+
+
+def import_time(statement: str) -> list[tuple[str, int, int]]:
+    """
+    Run `statement` in a new interpreter with `-X importtime`.
+
+    :return: The modules imported by the statement, in the order their imports
+        finished, with their self and cumulative import times in
+        microseconds. Names are indented by the depth of the import.
+    """
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, cumulative, name = line.removeprefix("import time:").split("|")
+        if not self_time.strip().isdigit():
+            # The header line.
+            continue
+        imports.append((name.rstrip()[1:], int(self_time), int(cumulative)))
+
+    # Only keep the imports made by `import allspice`, i.e. the top level
+    # import of allspice and the nested imports listed before it.
+    end = next(i for i, (name, _, _) in enumerate(imports) if name == "allspice")
+    start = end
+    while start > 0 and imports[start - 1][0].startswith(" "):
+        start -= 1
+    return imports[start : end + 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs, the fastest is used")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail above this import time")
+    args = parser.parse_args()
+
+    runs = [import_time("import allspice") for _ in range(args.runs)]
+    fastest = min(runs, key=lambda imports: imports[-1][2])
+    total_ms = fastest[-1][2] / 1000
+    print(f"import allspice: {total_ms:.1f} ms (fastest of {args.runs} runs)\n")
+    print(f"  {'module':<50} {'self (ms)':>10} {'cumulative (ms)':>16}")
+    for name, self_time, cumulative in fastest:
+        print(f"  {name:<50} {self_time / 1000:>10.2f} {cumulative / 1000:>16.2f}")
+
+    failed = False
+    imported_names = {name.strip() for name, _, _ in fastest}
+    imported = [name for name in DEFERRED_MODULES if name in imported_names]
+    if imported:
+        print(f"\nFAIL: import allspice imported {', '.join(imported)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"\nFAIL: import allspice took {total_ms:.1f} ms, more than {args.max_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
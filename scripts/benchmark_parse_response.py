@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+
+"""
+Benchmark `parse_response` throughput for API objects, comparing the current
+per class properties with adding the properties for every object parsed, as
+was done before, with lazy parsing of fields, and with the identity map.
+
+Usage: python scripts/benchmark_parse_response.py [--count 5000] [--repeat 5]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+from allspice import AllSpice, Repository
+from allspice.baseapiobject import ReadonlyApiObject
+
+CASSETTE = (
+    Path(__file__).parent.parent
+    / "tests/cassettes/test_utils/test_bom_generation_altium_with_device_sheets.yaml"
+)
+
+
+def repository_json() -> dict:
+    """A repository response recorded in the test cassettes."""
+
+    with open(CASSETTE) as file:
+        interactions = yaml.safe_load(file)["interactions"]
+    for interaction in interactions:
+        request = interaction["request"]
+        if request["method"] == "GET" and request["uri"].endswith(
+            "/repos/test/test-test_bom_generation_altium_with_device_sheets"
+        ):
+            return json.loads(interaction["response"]["body"]["string"])
+    raise ValueError("No repository response found in the cassette.")
+
+
+class LegacyRepository(Repository):
+    """`Repository`, parsed the way all API objects were before."""
+
+    @classmethod
+    def _initialize(cls, allspice_client, api_object, result):
+        for name, value in result.items():
+            if name in cls._fields_to_parsers and value is not None:
+                parse_func = cls._fields_to_parsers[name]
+                value = parse_func(allspice_client, value)
+            cls._add_read_property(name, value, api_object)
+        for name in cls._fields_to_parsers.keys():
+            if not hasattr(api_object, name):
+                cls._add_read_property(name, None, api_object)
+        for name in cls._patchable_fields:
+            cls._add_write_property(name, None, api_object)
+
+    @classmethod
+    def _add_read_property(cls, name: str, value: Any, api_object: ReadonlyApiObject):
+        if not hasattr(api_object, name):
+            setattr(api_object, "_" + name, value)
+            prop = property((lambda n: lambda self: self._get_var(n))(name))
+            setattr(cls, name, prop)
+        else:
+            raise AttributeError(f"Attribute {name} already exists on api object.")
+
+    @classmethod
+    def _add_write_property(cls, name: str, value: Any, api_object):
+        if not hasattr(api_object, "_" + name):
+            setattr(api_object, "_" + name, value)
+        prop = property(
+            (lambda n: lambda self: self._get_var(n))(name),
+            (lambda n: lambda self, v: self._ApiObject__set_var(n, v))(name),
+        )
+        setattr(cls, name, prop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_response throughput.")
+    parser.add_argument("--count", type=int, default=5000, help="Repositories per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs")
+    args = parser.parse_args()
+
+    client = AllSpice(token_text="benchmark", ratelimiting=None)
+    lazy_client = AllSpice(token_text="benchmark", ratelimiting=None, lazy_parsing=True)
+    interning_client = AllSpice(token_text="benchmark", ratelimiting=None, identity_map=True)
+    template = repository_json()
+    results = [{**template, "id": index} for index in range(args.count)]
+
+    timings = {}
+    runs = [
+        ("per object", LegacyRepository, client),
+        ("per class", Repository, client),
+        ("lazy", Repository, lazy_client),
+        ("identity map", Repository, interning_client),
+    ]
+    for name, cls, parse_client in runs:
+
+        def run():
+            # Keep the objects, as a listing would.
+            return [cls.parse_response(parse_client, result) for result in results]
+
+        timings[name] = min(timeit.repeat(run, number=1, repeat=args.repeat))
+
+    baseline = timings["per object"]
+    for name, duration in timings.items():
+        print(
+            f"{name:<14}{args.count / duration:12,.0f} repositories/s  ({baseline / duration:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
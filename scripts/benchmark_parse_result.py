@@ -0,0 +1,94 @@
+#! /usr/bin/env python3
+
+"""
+Benchmark `AllSpice.parse_result` on the largest generated JSON responses in
+the test cassettes, comparing the previous str based parsing with parsing the
+bytes directly with each JSON backend that is installed.
+
+Usage: python scripts/benchmark_parse_result.py [--count 5] [--repeat 20]
+"""
+
+import argparse
+import json
+import timeit
+from pathlib import Path
+
+import requests
+import yaml
+
+from allspice.allspice import AllSpice, _json_loads
+
+CASSETTES = Path(__file__).parent.parent / "tests" / "cassettes"
+
+
+def largest_generated_json(count: int) -> list[tuple[str, bytes]]:
+    """Find the largest allspice_generated/json response bodies in the cassettes."""
+
+    bodies = {}
+    for cassette in CASSETTES.rglob("*.yaml"):
+        with open(cassette) as file:
+            interactions = yaml.safe_load(file)["interactions"]
+        for interaction in interactions:
+            uri = interaction["request"]["uri"]
+            if "/allspice_generated/json/" not in uri:
+                continue
+            body = interaction["response"]["body"]["string"]
+            if isinstance(body, str):
+                body = body.encode()
+            name = uri.split("/allspice_generated/json/")[1].split("?")[0]
+            bodies[name] = body
+    return sorted(bodies.items(), key=lambda item: len(item[1]), reverse=True)[:count]
+
+
+def make_response(body: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = body
+    # Like most Hub responses, leave the charset to be detected.
+    response.encoding = None
+    return response
+
+
+def parse_result_text(result):
+    """`AllSpice.parse_result` before it parsed bytes."""
+
+    if result.text and len(result.text) > 3:
+        return json.loads(result.text)
+    return {}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=5, help="Number of documents to parse")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of times to parse each")
+    args = parser.parse_args()
+
+    backends = {}
+    for backend in ("json", "ujson", "orjson"):
+        try:
+            backends[backend] = _json_loads(backend)
+        except ImportError:
+            print(f"{backend} is not installed, skipping it.")
+
+    for name, body in largest_generated_json(args.count):
+        print(f"\n{name} ({len(body) / 1024 / 1024:.2f} MiB)")
+
+        def run_text():
+            parse_result_text(make_response(body))
+
+        baseline = timeit.timeit(run_text, number=args.repeat) / args.repeat
+        print(f"  {'text + json':<16}{baseline * 1000:9.2f} ms")
+        for backend, loads in backends.items():
+
+            def run_bytes():
+                AllSpice.parse_result(make_response(body), loads)
+
+            duration = timeit.timeit(run_bytes, number=args.repeat) / args.repeat
+            print(
+                f"  {'bytes + ' + backend:<16}{duration * 1000:9.2f} ms"
+                f"  ({baseline / duration:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
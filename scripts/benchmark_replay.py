@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+
+"""
+Benchmark `generate_bom` offline, by replaying the responses recorded in one
+of the test cassettes with simulated latency, e.g. to compare concurrency
+settings without a live Hub.
+
+Usage: python scripts/benchmark_replay.py [--runs 5] [--latency 0.05] [--jitter 0.01]
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from allspice import AllSpice
+from allspice.transport import ReplayTransport
+from allspice.utils import retry_generated
+from allspice.utils.bom_generation import generate_bom_for_altium
+
+ROOT = Path(__file__).parent.parent
+CASSETTE = ROOT / "tests/cassettes/test_utils/test_bom_generation_altium_with_device_sheets.yaml"
+
+
+def run(latency: float, jitter: float, seed: int) -> float:
+    # A new transport for every run, so that each one replays the cassette
+    # from the start, including the 503s before files were generated.
+    instance = AllSpice(
+        "http://localhost:3000",
+        token_text="replay",
+        ratelimiting=None,
+        log_level="WARNING",
+        transport=ReplayTransport(CASSETTE, latency=latency, jitter=jitter, seed=seed),
+    )
+    started = time.perf_counter()
+    repo = instance.get_repository("test", "test-test_bom_generation_altium_with_device_sheets")
+    reuse_repo = instance.get_repository(
+        "test", "test-test_bom_generation_altium_with_device_sheets_reuse"
+    )
+    bom = generate_bom_for_altium(
+        instance,
+        repo,
+        "DCDC Regulators Breakout/DCDC Regulators Breakout.PrjPcb",
+        {"Name": ["_name"], "Designator": ["Designator"], "Comment": ["Comment"]},
+        group_by=["Comment"],
+        design_reuse_repos=[reuse_repo],
+        ref="5f2bdd30f57eb8ea6699dc9dcb098bc34d60f7a3",
+    )
+    elapsed = time.perf_counter() - started
+    assert len(bom) == 13
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_bom offline.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per response.")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Seconds of random jitter.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # The recorded 503s are for files that were being generated. Don't wait
+    # between them, only the simulated latency should count.
+    retry_generated.SLEEP_FOR_GENERATED = 0
+
+    times = [run(args.latency, args.jitter, args.seed + i) for i in range(args.runs)]
+    print(
+        f"generate_bom: median {statistics.median(times):.3f}s, "
+        f"min {min(times):.3f}s, max {max(times):.3f}s over {args.runs} runs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ put a ".token" file into your directory containg only the token for AllSpice Hub
 """
 
 import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, ClassVar, Optional
 
 import pytest
 
@@ -41,3 +44,66 @@ def instance(scope="module"):
                 - Token at .token   \
                     ?"
         )
+
+
+@pytest.fixture
+def stub_server():
+    """
+    A local, threaded HTTP server standing in for AllSpice Hub.
+
+    Set `responder` on the yielded handler class to a function taking the
+    method and path (including the query string) of a request and returning a
+    `(status, body, headers)` tuple. For simple cases, set
+    `scripted_responses` to a list of `(status, body)` tuples instead, which
+    are sent in order, repeating the last one. Requests received are recorded
+    in `requests_received` as `(method, path)` tuples, and their headers in
+    `headers_received`.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        responder: ClassVar[Optional[Callable[[str, str], tuple[int, str, dict]]]] = None
+        scripted_responses: ClassVar[list[tuple[int, str]]] = []
+        requests_received: ClassVar[list[tuple[str, str]]] = []
+        headers_received: ClassVar[list[dict]] = []
+
+        def do_GET(self):
+            self._respond()
+
+        def do_POST(self):
+            self._respond()
+
+        def do_PUT(self):
+            self._respond()
+
+        def do_PATCH(self):
+            self._respond()
+
+        def do_DELETE(self):
+            self._respond()
+
+        def _respond(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.requests_received.append((self.command, self.path))
+            self.headers_received.append(dict(self.headers))
+            responder = type(self).responder
+            if responder is not None:
+                status, body, headers = responder(self.command, self.path)
+            else:
+                scripted = self.scripted_responses
+                status, body = scripted[min(len(self.requests_received), len(scripted)) - 1]
+                headers = {}
+            self.send_response(status)
+            self.send_header("Content-type", "application/json")
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body.encode() if isinstance(body, str) else body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("localhost", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield Handler, f"http://localhost:{server.server_port}"
+    server.shutdown()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+from allspice import AsyncAllSpice, NotFoundException, Repository
+from allspice.allspice import DEFAULT_RETRY
+from allspice.exceptions import (
+    ConflictException,
+    InternalServerException,
+    NotYetGeneratedException,
+)
+
+REPO = {
+    "id": 1,
+    "name": "repo",
+    "full_name": "owner/repo",
+    "owner": {"id": 2, "username": "owner", "email": ""},
+    "updated_at": "2024-01-01T00:00:00+00:00",
+    "default_branch": "main",
+}
+
+
+def run(coroutine_fn, url, **kwargs):
+    async def main():
+        async with AsyncAllSpice(allspice_hub_url=url, token_text="test", **kwargs) as client:
+            return await coroutine_fn(client)
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize(
+    "status,exception",
+    [
+        (404, NotFoundException),
+        (409, ConflictException),
+        (503, NotYetGeneratedException),
+        (500, InternalServerException),
+    ],
+)
+def test_get_maps_errors_like_sync_client(stub_server, status, exception):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (status, "{}", {})
+
+    with pytest.raises(exception):
+        run(lambda client: client.requests_get("/repos/o/r"), url, ratelimiting=None)
+
+
+def test_retries_with_sync_retry_policy(stub_server):
+    handler, url = stub_server
+    responses = iter([(429, "{}", {}), (200, json.dumps({"version": "1.0.0"}), {})])
+    handler.responder = lambda method, path: next(responses)
+
+    retry = DEFAULT_RETRY.new(backoff_factor=0, backoff_jitter=0)
+    assert run(lambda client: client.get_version(), url, retry=retry) == "1.0.0"
+    assert len(handler.requests_received) == 2
+
+
+def test_paginated_get(stub_server):
+    handler, url = stub_server
+
+    def responder(method, path):
+        if "page=1" in path:
+            return 200, json.dumps([{"n": 1}, {"n": 2}]), {}
+        if "page=2" in path:
+            return 200, json.dumps([{"n": 3}]), {}
+        return 200, "[]", {}
+
+    handler.responder = responder
+
+    result = run(lambda client: client.requests_get_paginated("/repos/o/r/issues"), url)
+    assert result == [{"n": 1}, {"n": 2}, {"n": 3}]
+
+
+def test_concurrent_generated_json_with_repository(stub_server):
+    handler, url = stub_server
+
+    def responder(method, path):
+        if path.startswith("/api/v1/repos/owner/repo/allspice_generated/json/"):
+            return 200, json.dumps({"path": path.split("?")[0].rsplit("/", 1)[1]}), {}
+        return 200, json.dumps(REPO), {}
+
+    handler.responder = responder
+
+    async def fetch(client):
+        repo = await client.get_repository("owner", "repo")
+        assert isinstance(repo, Repository)
+        assert repo.allspice_client is client.sync_client
+        return await asyncio.gather(
+            *(client.get_generated_json(repo, f"sheet{i}.SchDoc", ref="main") for i in range(5))
+        )
+
+    results = run(fetch, url, ratelimiting=None)
+    assert [result["path"] for result in results] == [f"sheet{i}.SchDoc" for i in range(5)]
+    assert all("ref=main" in path for _, path in handler.requests_received[1:])
+
+
+def test_post_and_patch(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (201 if method == "POST" else 200, '{"id": 1}', {})
+
+    async def mutate(client):
+        created = await client.requests_post("/repos/o/r/issues", data={"title": "t"})
+        patched = await client.requests_patch("/repos/o/r/issues/1", data={"title": "u"})
+        return created, patched
+
+    assert run(mutate, url) == ({"id": 1}, {"id": 1})
+    assert [method for method, _ in handler.requests_received] == ["POST", "PATCH"]
+
+
+def test_concurrent_paginated_get(stub_server):
+    handler, url = stub_server
+    entries = [{"n": n} for n in range(7)]
+
+    def responder(method, path):
+        page = int(path.split("page=")[1].split("&")[0])
+        body = entries[(page - 1) * 2 : page * 2]
+        return 200, json.dumps(body), {"X-Total-Count": str(len(entries))}
+
+    handler.responder = responder
+
+    result = run(
+        lambda client: client.requests_get_paginated("/repos/o/r/issues", concurrency=3, limit=2),
+        url,
+    )
+    assert result == entries
+    assert len(handler.requests_received) == 4
@@ -0,0 +1,219 @@
+import copy
+import gc
+import multiprocessing
+import pickle
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from allspice import AllSpice, Issue, Repository
+from allspice.apiobject import Util
+
+REPO = {
+    "id": 1,
+    "name": "repo",
+    "owner": {"id": 2, "username": "owner", "email": ""},
+    "default_branch": "main",
+}
+
+
+@pytest.fixture
+def client():
+    return AllSpice(token_text="test", ratelimiting=None)
+
+
+def test_properties_are_added_to_the_class_once(client):
+    first = Repository.parse_response(client, REPO)
+    name_property = Repository.__dict__["name"]
+    second = Repository.parse_response(client, {**REPO, "id": 3, "name": "other"})
+
+    assert Repository.__dict__["name"] is name_property
+    assert (first.name, second.name) == ("repo", "other")
+    assert second.owner.username == "owner"
+
+
+def test_missing_patchable_fields_are_writable(client):
+    repo = Repository.parse_response(client, REPO)
+
+    assert repo.description is None
+    repo.description = "A repo"
+    assert repo.description == "A repo"
+    assert repo.get_dirty_fields() == {"description": "A repo"}
+    assert Repository.parse_response(client, REPO).description is None
+
+
+def test_fields_clashing_with_attributes_are_rejected(client):
+    with pytest.raises(AttributeError):
+        Repository.parse_response(client, {**REPO, "get_branches": []})
+    with pytest.raises(AttributeError):
+        Repository.parse_response(client, {**REPO, "deleted": True})
+
+
+def test_pickled_objects_drop_the_client(client):
+    repo = Repository.parse_response(client, REPO)
+    repo.description = "A repo"
+    loaded = pickle.loads(pickle.dumps(repo))
+
+    assert loaded.allspice_client is None
+    assert loaded.owner.allspice_client is None
+    assert (loaded.name, loaded.description) == ("repo", "A repo")
+    assert loaded.get_dirty_fields() == {"description": "A repo"}
+    assert loaded.attach(client) is loaded
+    assert loaded.owner.allspice_client is client
+    assert copy.copy(repo).allspice_client is client
+
+
+def read_pickled_repository(data):
+    repo = pickle.loads(data)
+    repo.default_branch = "develop"
+    return repo.name, repo.owner.username, repo.default_branch, repo.updated_at.year
+
+
+def test_pickled_objects_load_in_new_processes():
+    client = AllSpice(token_text="test", ratelimiting=None, lazy_parsing=True)
+    repo = Repository.parse_response(client, {**REPO, "updated_at": "2024-01-02T03:04:05Z"})
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        result = executor.submit(read_pickled_repository, pickle.dumps(repo)).result()
+    assert result == ("repo", "owner", "develop", 2024)
+
+
+def test_lazy_parsing_parses_fields_when_first_read():
+    client = AllSpice(token_text="test", ratelimiting=None, lazy_parsing=True)
+    repo = Repository.parse_response(
+        client, {**REPO, "updated_at": "2024-01-02T03:04:05Z", "created_at": None}
+    )
+
+    assert repo.__dict__["_owner"] == REPO["owner"]
+    owner = repo.owner
+    assert owner.username == "owner"
+    assert repo.owner is owner
+    assert repo.updated_at.year == 2024
+    assert repo.created_at is None
+
+
+def test_copies_parse_and_change_their_own_fields():
+    client = AllSpice(token_text="test", ratelimiting=None, lazy_parsing=True)
+    repo = Repository.parse_response(client, {**REPO, "updated_at": "2024-01-02T03:04:05Z"})
+
+    clone = copy.copy(repo)
+    assert clone.owner.username == "owner"
+    clone.description = "A repo"
+    assert repo.owner.username == "owner"
+    assert repo.updated_at.year == 2024
+    assert repo.get_dirty_fields() == {}
+    assert clone.allspice_client is client
+
+
+def test_deep_copies_keep_the_client(client):
+    repo = Repository.parse_response(client, REPO)
+    clone = copy.deepcopy(repo)
+
+    assert clone.allspice_client is client
+    assert clone.owner.allspice_client is client
+    assert clone.owner is not repo.owner
+    assert (clone.name, clone.owner.username) == ("repo", "owner")
+
+
+def test_lazy_fields_are_parsed_once_across_threads():
+    client = AllSpice(token_text="test", ratelimiting=None, lazy_parsing=True)
+    repos = [
+        Repository.parse_response(client, {**REPO, "id": n, "updated_at": "2024-01-02T03:04:05Z"})
+        for n in range(200)
+    ]
+    barrier = threading.Barrier(8)
+    errors = []
+    owners = []
+
+    def read():
+        barrier.wait()
+        try:
+            for repo in repos:
+                owners.append((repo, repo.owner))
+                assert repo.updated_at.year == 2024
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads often, so that they race to parse the same fields.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert all(owner is repo.owner for repo, owner in owners)
+
+
+def test_lazy_fields_can_be_written_before_they_are_read():
+    client = AllSpice(token_text="test", ratelimiting=None, lazy_parsing=True)
+    issue = Issue.parse_response(client, {"id": 1, "number": 1, "state": "open"})
+
+    issue.state = Issue.CLOSED
+    assert issue.state == Issue.CLOSED
+    assert issue.get_dirty_fields() == {"state": "closed"}
+
+
+def test_identity_map_shares_identical_owners():
+    client = AllSpice(token_text="test", ratelimiting=None, identity_map=True)
+    repos = [Repository.parse_response(client, {**REPO, "id": i}) for i in range(3)]
+    renamed = Repository.parse_response(
+        client, {**REPO, "owner": {**REPO["owner"], "username": "renamed"}}
+    )
+
+    assert repos[0].owner is repos[1].owner is repos[2].owner
+    assert renamed.owner is not repos[0].owner
+    assert renamed.owner.username == "renamed"
+    assert client.identity_map is not None
+    assert client.identity_map.hits == 2
+
+
+def test_identity_map_does_not_keep_objects_alive():
+    client = AllSpice(token_text="test", ratelimiting=None, identity_map=True)
+    repos = [Repository.parse_response(client, {**REPO, "id": i}) for i in range(3)]
+    assert client.identity_map is not None
+    assert len(client.identity_map) == 1
+
+    del repos
+    gc.collect()
+    assert len(client.identity_map) == 0
+
+
+def test_owners_are_not_shared_by_default(client):
+    first = Repository.parse_response(client, REPO)
+    second = Repository.parse_response(client, REPO)
+    assert first.owner is not second.owner
+
+
+@pytest.mark.parametrize(
+    "time,expected",
+    [
+        (
+            "2024-01-02T03:04:05+01:00",
+            datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=1))),
+        ),
+        # The minutes of the offset are dropped, as they always were.
+        (
+            "2024-01-02T03:04:05+05:30",
+            datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5))),
+        ),
+        ("2024-01-02T03:04:05Z", datetime(2024, 1, 2, 3, 4)),
+    ],
+)
+def test_convert_time(time, expected):
+    assert Util.convert_time(time) == expected
+    assert Util.convert_time(time).tzinfo == expected.tzinfo
+
+
+def test_convert_time_rejects_other_formats():
+    with pytest.raises(ValueError):
+        Util.convert_time("2024-01-02T03:04:05.123Z")
@@ -0,0 +1,64 @@
+import functools
+import json
+import threading
+import time
+
+import pytest
+
+from allspice import AllSpice
+
+
+def test_bulk_runs_operations_concurrently(stub_server):
+    handler, url = stub_server
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def responder(method, path):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.05)
+        with lock:
+            in_flight -= 1
+        if path.endswith("/topics/bad"):
+            return 422, "{}", {}
+        return 204, "", {}
+
+    handler.responder = responder
+
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None, retry=None)
+    topics = [f"topic{n}" for n in range(20)] + ["bad"]
+    progress = []
+    summary = instance.bulk(
+        (
+            functools.partial(instance.requests_put, f"/repos/owner/repo/topics/{topic}")
+            for topic in topics
+        ),
+        concurrency=4,
+        progress=progress.append,
+    )
+
+    assert max_in_flight == 4
+    assert len(progress) == 21
+    assert [result.index for result in summary.results] == list(range(21))
+    assert (summary.succeeded, summary.failed) == (20, 1)
+    assert summary.errors[0].index == 20
+    with pytest.raises(Exception):
+        summary.raise_for_errors()
+
+
+def test_bulk_respects_rate_limit(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (201, json.dumps({"id": 1}), {})
+
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=(2, 0.2))
+    summary = instance.bulk(
+        [lambda: instance.requests_post("/repos/owner/repo/issues", {"title": "t"})] * 5,
+        concurrency=5,
+    )
+
+    assert [result.value for result in summary.results] == [{"id": 1}] * 5
+    # Five calls at two per 0.2s need at least two more windows.
+    assert summary.elapsed >= 0.4
@@ -0,0 +1,180 @@
+import json
+
+import pytest
+
+from allspice import AllSpice, Repository
+from allspice.cache import DiskCache, GeneratedContentCache, MemoryCache, SQLiteCache
+
+BRANCH = {"name": "main", "commit": {"id": "a" * 40}}
+REPO = {
+    "id": 1,
+    "name": "repo",
+    "owner": {"id": 2, "username": "owner", "email": ""},
+    "default_branch": "main",
+}
+
+
+def make_instance(url, cache, token="test"):
+    return AllSpice(allspice_hub_url=url, token_text=token, ratelimiting=None, cache=cache)
+
+
+def etag_responder(handler):
+    def responder(method, path):
+        if handler.headers_received[-1].get("If-None-Match") == '"v1"':
+            return 304, "", {"ETag": '"v1"'}
+        return 200, json.dumps(BRANCH), {"ETag": '"v1"', "X-Total-Count": "1"}
+
+    return responder
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_size=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == b"1234"
+    cache.set("d", b"x" * 11)
+    assert cache.get("d") is None
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_size=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.set("c", b"1234")
+
+    assert cache.get("a") is None
+    assert DiskCache(tmp_path).get("c") == b"1234"
+
+
+def test_revalidates_with_etag(stub_server):
+    handler, url = stub_server
+    handler.responder = etag_responder(handler)
+
+    instance = make_instance(url, MemoryCache())
+    first = instance.requests_get("/repos/owner/repo/branches/main")
+    second = instance.requests_get("/repos/owner/repo/branches/main")
+
+    assert first == second == BRANCH
+    assert len(handler.requests_received) == 2
+    assert "If-None-Match" not in handler.headers_received[0]
+    assert handler.headers_received[1]["If-None-Match"] == '"v1"'
+
+
+def test_cache_is_keyed_by_credentials(stub_server, tmp_path):
+    handler, url = stub_server
+    handler.responder = etag_responder(handler)
+
+    cache = DiskCache(tmp_path)
+    make_instance(url, cache).requests_get("/repos/owner/repo/branches/main")
+    make_instance(url, cache, token="other").requests_get("/repos/owner/repo/branches/main")
+    make_instance(url, cache).requests_get("/repos/owner/repo/branches/main")
+
+    conditional = ["If-None-Match" in headers for headers in handler.headers_received]
+    assert conditional == [False, False, True]
+
+
+def test_responses_without_validators_are_not_cached(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, json.dumps(BRANCH), {})
+
+    cache = MemoryCache()
+    make_instance(url, cache).requests_get("/repos/owner/repo/branches/main")
+    assert len(cache) == 0
+
+
+SHA = "b" * 40
+
+
+def generated_responder(method, path):
+    if path.startswith("/api/v1/repos/owner/repo/git/commits/"):
+        return 200, json.dumps({"sha": SHA}), {}
+    if path.startswith("/api/v1/repos/owner/repo/allspice_generated/json/board.PcbDoc"):
+        return 200, json.dumps({"ref": path.split("ref=")[1]}), {}
+    return 404, "{}", {}
+
+
+@pytest.mark.parametrize("store", ["memory", "disk", "sqlite"])
+def test_generated_content_is_cached_by_commit(stub_server, tmp_path, store):
+    handler, url = stub_server
+    handler.responder = generated_responder
+
+    stores = {
+        "memory": lambda: MemoryCache(),
+        "disk": lambda: DiskCache(tmp_path / "cache"),
+        "sqlite": lambda: SQLiteCache(tmp_path / "cache.db"),
+    }
+    instance = AllSpice(
+        allspice_hub_url=url,
+        token_text="test",
+        ratelimiting=None,
+        generated_cache=GeneratedContentCache(stores[store]()),
+    )
+    repo = Repository.parse_response(instance, REPO)
+
+    for _ in range(3):
+        assert repo.get_generated_json("board.PcbDoc", ref="main") == {"ref": SHA}
+    assert repo.get_generated_json("board.PcbDoc", ref=SHA) == {"ref": SHA}
+
+    paths = [path for _, path in handler.requests_received]
+    # The branch is resolved once, and the file is generated once.
+    assert len(paths) == 2
+    assert "/git/commits/main" in paths[0]
+
+
+def test_generated_content_is_cached_by_credentials(stub_server):
+    handler, url = stub_server
+    handler.responder = generated_responder
+
+    cache = GeneratedContentCache()
+    for token in ["test", "other", "test"]:
+        instance = AllSpice(
+            allspice_hub_url=url, token_text=token, ratelimiting=None, generated_cache=cache
+        )
+        repo = Repository.parse_response(instance, REPO)
+        assert repo.get_generated_json("board.PcbDoc", ref=SHA) == {"ref": SHA}
+
+    paths = [path.split("?")[0] for _, path in handler.requests_received]
+    # Each token resolves the commit and gets the file itself once.
+    assert (
+        paths
+        == [
+            f"/api/v1/repos/owner/repo/git/commits/{SHA}",
+            "/api/v1/repos/owner/repo/allspice_generated/json/board.PcbDoc",
+        ]
+        * 2
+    )
+
+
+def test_generated_content_cache_forgets_old_refs(stub_server):
+    handler, url = stub_server
+    handler.responder = generated_responder
+
+    repo = Repository.parse_response(
+        AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None), REPO
+    )
+
+    cache = GeneratedContentCache(max_refs=3)
+    for branch in ["main", "develop", "feature"]:
+        assert cache.resolve_ref(repo, branch) == SHA
+    assert len(cache._resolved) == 3
+
+    # Expired refs are dropped.
+    cache = GeneratedContentCache(ref_ttl=0)
+    for branch in ["main", "develop", "main"]:
+        assert cache.resolve_ref(repo, branch) == SHA
+    assert len(cache._resolved) == 0
+
+
+def test_sqlite_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", max_size=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.set("c", b"1234")
+
+    assert cache.get("b") is None
+    assert SQLiteCache(tmp_path / "cache.db").get("c") == b"1234"
@@ -0,0 +1,90 @@
+import importlib.util
+import json
+from array import array
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from allspice import AllSpice, Repository
+from allspice.columns import Columns
+
+ISSUES = [
+    {
+        "id": n,
+        "number": n + 1,
+        "title": f"Issue {n}",
+        "state": "open" if n % 2 else "closed",
+        "user": {"id": 2, "login": "owner"} if n else None,
+    }
+    for n in range(5)
+]
+
+
+def test_columns_hold_one_list_per_field():
+    columns = Columns(["number", "title", "user.login"], types={"number": "q"})
+    assert columns.extend(ISSUES) is columns
+
+    assert len(columns) == 5
+    assert list(columns) == ["number", "title", "user.login"]
+    assert columns["number"] == array("q", [1, 2, 3, 4, 5])
+    assert columns["title"] == [issue["title"] for issue in ISSUES]
+    assert columns["user.login"] == [None, "owner", "owner", "owner", "owner"]
+
+
+def test_rejected_rows_leave_columns_aligned():
+    columns = Columns(["title", "number"], types={"number": "q"})
+    columns.append(ISSUES[0])
+    with pytest.raises(TypeError, match="number"):
+        columns.append({"title": "No number"})
+    with pytest.raises(TypeError):
+        columns.extend([ISSUES[1], {"title": "Float", "number": 1.5}, ISSUES[2]])
+
+    with pytest.raises(OverflowError, match="number"):
+        columns.append({"title": "Too large", "number": 2**63})
+
+    assert len(columns) == 2
+    assert columns.to_dict() == {"title": ["Issue 0", "Issue 1"], "number": array("q", [1, 2])}
+
+
+def test_columns_reject_types_for_unknown_fields():
+    with pytest.raises(ValueError):
+        Columns(["title"], types={"number": "q"})
+
+
+def test_columns_from_raw_issues(stub_server):
+    handler, url = stub_server
+
+    def responder(method, path):
+        if path.startswith("/api/v1/repos/owner/repo/issues"):
+            page = int(parse_qs(urlparse(path).query)["page"][0])
+            return 200, json.dumps(ISSUES[(page - 1) * 2 : page * 2]), {}
+        return 404, "{}", {}
+
+    handler.responder = responder
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None)
+    repo = Repository.parse_response(
+        instance,
+        {"id": 1, "name": "repo", "owner": {"id": 2, "username": "owner", "email": ""}},
+    )
+
+    columns = Columns(["number", "state"]).extend(repo.iter_issues(raw=True))
+    assert columns.to_dict() == {
+        "number": [1, 2, 3, 4, 5],
+        "state": ["closed", "open", "closed", "open", "closed"],
+    }
+    assert [issue.number for issue in repo.get_issues(fields=["number"])] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.skipif(importlib.util.find_spec("pandas") is not None, reason="pandas is installed")
+def test_to_pandas_requires_pandas():
+    with pytest.raises(ImportError, match="pip install pandas"):
+        Columns(["number"]).to_pandas()
+
+
+def test_to_pandas():
+    pandas = pytest.importorskip("pandas")
+    data_frame = Columns(["number", "title"], types={"number": "q"}).extend(ISSUES).to_pandas()
+
+    assert isinstance(data_frame, pandas.DataFrame)
+    assert list(data_frame.columns) == ["number", "title"]
+    assert data_frame["number"].tolist() == [1, 2, 3, 4, 5]
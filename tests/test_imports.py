@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+import pytest
+
+import allspice
+
+
+def test_import_defers_heavy_modules():
+    # Run in a new interpreter, as the tests have already imported everything.
+    code = (
+        "import sys, allspice; "
+        "print(','.join(m for m in ['requests', 'urllib3', 'frozendict', "
+        "'allspice.allspice', 'allspice.apiobject'] if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_exported_names_are_importable():
+    for name in allspice.__all__:
+        assert getattr(allspice, name).__name__ == name
+    assert set(allspice.__all__) <= set(dir(allspice))
+
+    with pytest.raises(AttributeError):
+        allspice.DoesNotExist
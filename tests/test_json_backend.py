@@ -0,0 +1,32 @@
+import json
+
+import pytest
+
+from allspice import AllSpice
+
+
+@pytest.mark.parametrize("backend", ["auto", "json", "orjson"])
+def test_requests_get_with_backend(stub_server, backend):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    handler, url = stub_server
+    body = {"name": "Ω résistance", "values": [1, 2.5, None, True]}
+    handler.responder = lambda method, path: (200, json.dumps(body, ensure_ascii=False), {})
+
+    instance = AllSpice(
+        allspice_hub_url=url, token_text="test", ratelimiting=None, json_backend=backend
+    )
+    assert instance.requests_get("/repos/owner/repo") == body
+
+
+def test_short_bodies_parse_to_empty_dict(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, "[]", {})
+
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None)
+    assert instance.requests_get("/repos/owner/repo") == {}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        AllSpice(token_text="test", json_backend="yaml")
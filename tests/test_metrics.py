@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from allspice import AllSpice
+from allspice.allspice import DEFAULT_RETRY
+from allspice.metrics import RequestMetrics, endpoint_template
+
+
+@pytest.mark.parametrize(
+    "endpoint,template",
+    [
+        (
+            "/repos/jdoe/board/allspice_generated/json/Sheets/main.SchDoc",
+            "/repos/{owner}/{repo}/allspice_generated/json/{content}",
+        ),
+        ("/repos/jdoe/board/git/trees/main?recursive=1", "/repos/{owner}/{repo}/git/trees/{ref}"),
+        ("/repos/jdoe/board/issues/12/comments", "/repos/{owner}/{repo}/issues/{id}/comments"),
+        ("/repos/jdoe/board/branches/feature/x", "/repos/{owner}/{repo}/branches/{branch}"),
+        ("/repos/search", "/repos/search"),
+        ("/users/jdoe/repos", "/users/{username}/repos"),
+        ("/version", "/version"),
+    ],
+)
+def test_endpoint_template(endpoint, template):
+    assert endpoint_template(endpoint) == template
+
+
+def test_records_requests_per_endpoint(stub_server):
+    handler, url = stub_server
+    responses = iter(
+        [
+            (429, "{}", {}),
+            (200, json.dumps({"id": 1}), {}),
+            (200, json.dumps({"id": 2}), {}),
+            (404, "{}", {}),
+        ]
+    )
+    handler.responder = lambda method, path: next(responses)
+
+    records = []
+    metrics = RequestMetrics(callback=records.append)
+    instance = AllSpice(
+        allspice_hub_url=url,
+        token_text="test",
+        ratelimiting=(1, 0.1),
+        retry=DEFAULT_RETRY.new(backoff_factor=0, backoff_jitter=0),
+        metrics=metrics,
+    )
+    instance.requests_get("/repos/jdoe/board/issues/1")
+    instance.requests_post("/repos/jdoe/board/issues", data={"title": "t"})
+    with pytest.raises(Exception):
+        instance.requests_get("/repos/jdoe/other/issues/3")
+
+    snapshot = {(entry["method"], entry["endpoint"]): entry for entry in metrics.snapshot()}
+    get = snapshot[("GET", "/repos/{owner}/{repo}/issues/{id}")]
+    assert get["count"] == 2
+    assert get["errors"] == 1
+    assert get["statuses"] == {200: 1, 404: 1}
+    assert get["retries"] == 1
+    assert get["duration_seconds_histogram"]["+Inf"] == 2
+
+    post = snapshot[("POST", "/repos/{owner}/{repo}/issues")]
+    assert post["bytes_sent"] == len(json.dumps({"title": "t"}))
+    assert post["bytes_received"] == len(json.dumps({"id": 2}))
+    # The limiter allows one call per 0.1s, so the later calls waited.
+    assert post["rate_limit_wait_seconds"] > 0
+
+    assert [record.template for record in records] == [
+        "/repos/{owner}/{repo}/issues/{id}",
+        "/repos/{owner}/{repo}/issues",
+        "/repos/{owner}/{repo}/issues/{id}",
+    ]
+    json.loads(metrics.to_json())
+
+
+def test_prometheus_export(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, json.dumps({"version": "1.0.0"}), {})
+
+    metrics = RequestMetrics(buckets=[0.5, 60])
+    AllSpice(allspice_hub_url=url, token_text="test", metrics=metrics).get_version()
+
+    text = metrics.to_prometheus()
+    assert 'allspice_client_requests_total{method="GET",endpoint="/version",status="200"} 1' in text
+    assert '_bucket{method="GET",endpoint="/version",le="60"} 1' in text
+    assert '_bucket{method="GET",endpoint="/version",le="+Inf"} 1' in text
+    assert "# TYPE allspice_client_request_duration_seconds histogram" in text
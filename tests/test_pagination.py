@@ -0,0 +1,188 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from allspice import AllSpice, Repository
+
+ENTRIES = [{"n": n} for n in range(23)]
+
+
+def make_instance(url, **kwargs):
+    return AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None, **kwargs)
+
+
+def paged_responder(headers_for_page):
+    def responder(method, path):
+        query = parse_qs(urlparse(path).query)
+        page = int(query["page"][0])
+        limit = int(query.get("limit", ["10"])[0])
+        body = ENTRIES[(page - 1) * limit : page * limit]
+        return 200, json.dumps(body), headers_for_page(page, limit)
+
+    return responder
+
+
+def link_headers(page, limit):
+    last = -(-len(ENTRIES) // limit)
+    links = []
+    if page < last:
+        links.append(f'<http://hub/api/v1/repos/search?limit={limit}&page={page + 1}>; rel="next"')
+        links.append(f'<http://hub/api/v1/repos/search?limit={limit}&page={last}>; rel="last"')
+    return {"Link": ", ".join(links)} if links else {}
+
+
+def total_count_headers(page, limit):
+    return {"X-Total-Count": str(len(ENTRIES))}
+
+
+def pages_requested(handler):
+    return sorted(
+        int(parse_qs(urlparse(path).query)["page"][0]) for _, path in handler.requests_received
+    )
+
+
+def test_sequential_pagination_reads_until_empty_page(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(lambda page, limit: {})
+
+    assert make_instance(url).requests_get_paginated("/repos/search") == ENTRIES
+    assert pages_requested(handler) == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("headers_for_page", [link_headers, total_count_headers])
+def test_concurrent_pagination_uses_headers(stub_server, headers_for_page):
+    handler, url = stub_server
+    handler.responder = paged_responder(headers_for_page)
+
+    result = make_instance(url).requests_get_paginated("/repos/search", concurrency=4, limit=5)
+    assert result == ENTRIES
+    # No empty page is requested past the last one.
+    assert pages_requested(handler) == [1, 2, 3, 4, 5]
+
+
+def test_concurrent_pagination_uses_client_defaults(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(total_count_headers)
+
+    instance = make_instance(url, pagination_concurrency=4, pagination_limit=5)
+    assert instance.requests_get_paginated("/repos/search") == ENTRIES
+    assert pages_requested(handler) == [1, 2, 3, 4, 5]
+
+
+def test_concurrent_pagination_falls_back_without_headers(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(lambda page, limit: {})
+
+    result = make_instance(url).requests_get_paginated("/repos/search", concurrency=4)
+    assert result == ENTRIES
+    assert pages_requested(handler) == [1, 2, 3, 4]
+
+
+def test_iter_paginated_is_lazy(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(lambda page, limit: {})
+
+    entries = make_instance(url).requests_iter_paginated("/repos/search")
+    assert handler.requests_received == []
+    assert next(entries) == ENTRIES[0]
+    assert pages_requested(handler) == [1]
+    assert list(entries) == ENTRIES[1:]
+
+
+def test_iter_paginated_stops_at_max_items(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(lambda page, limit: {})
+
+    entries = make_instance(url).requests_iter_paginated("/repos/search", max_items=12)
+    assert list(entries) == ENTRIES[:12]
+    assert pages_requested(handler) == [1, 2]
+
+
+def tree_responder(method, path):
+    # Git trees page with `per_page`, and ignore `limit`.
+    query = parse_qs(urlparse(path).query)
+    page = int(query["page"][0])
+    per_page = int(query.get("per_page", ["10"])[0])
+    tree = [
+        {"path": f"file{entry['n']}", "sha": f"{entry['n']:040x}", "type": "blob"}
+        for entry in ENTRIES[(page - 1) * per_page : page * per_page]
+    ]
+    return 200, json.dumps({"tree": tree, "total_count": len(ENTRIES)}), {}
+
+
+def make_repository(instance):
+    return Repository.parse_response(
+        instance,
+        {"id": 1, "name": "repo", "owner": {"id": 2, "username": "owner", "email": ""}},
+    )
+
+
+def test_tree_pagination_uses_per_page(stub_server):
+    handler, url = stub_server
+    handler.responder = tree_responder
+
+    instance = make_instance(url, pagination_concurrency=4, pagination_limit=5)
+    tree = make_repository(instance).get_tree("main", recursive=True)
+    assert [entry.path for entry in tree] == [f"file{entry['n']}" for entry in ENTRIES]
+    assert pages_requested(handler) == [1, 2, 3, 4, 5]
+    for _, path in handler.requests_received:
+        query = parse_qs(urlparse(path).query)
+        assert query["per_page"] == ["5"]
+        assert "limit" not in query
+
+    handler.requests_received.clear()
+    entries = make_repository(instance).iter_tree("main", max_items=7)
+    assert [entry.path for entry in entries] == [f"file{n}" for n in range(7)]
+    assert pages_requested(handler) == [1, 2]
+
+
+def test_sequential_pagination_sends_given_limit(stub_server):
+    handler, url = stub_server
+    handler.responder = paged_responder(lambda page, limit: {})
+
+    instance = make_instance(url, pagination_limit=20)
+    assert instance.requests_get_paginated("/repos/search", limit=5) == ENTRIES
+    assert pages_requested(handler) == [1, 2, 3, 4, 5, 6]
+    for _, path in handler.requests_received:
+        assert parse_qs(urlparse(path).query)["limit"] == ["5"]
+
+
+def test_sequential_tree_pagination_uses_per_page(stub_server):
+    handler, url = stub_server
+    handler.responder = tree_responder
+
+    instance = make_instance(url, pagination_limit=5)
+    tree = make_repository(instance).get_tree("main", recursive=True)
+    assert len(tree) == len(ENTRIES)
+    assert pages_requested(handler) == [1, 2, 3, 4, 5, 6]
+    for _, path in handler.requests_received:
+        query = parse_qs(urlparse(path).query)
+        assert query["per_page"] == ["5"]
+        assert "limit" not in query
+
+
+def test_repository_iter_commits(stub_server):
+    handler, url = stub_server
+    commits = [
+        {
+            "sha": f"{n:040x}",
+            "url": f"{url}/api/v1/repos/owner/repo/git/commits/{n:040x}",
+            "commit": {"message": f"commit {n}"},
+            "author": None,
+        }
+        for n in range(5)
+    ]
+
+    def responder(method, path):
+        if path.startswith("/api/v1/repos/owner/repo/commits"):
+            page = int(parse_qs(urlparse(path).query)["page"][0])
+            return 200, json.dumps(commits[(page - 1) * 2 : page * 2]), {}
+        return 404, "{}", {}
+
+    handler.responder = responder
+
+    repo = make_repository(make_instance(url))
+    shas = [commit.sha for commit in repo.iter_commits(max_items=3)]
+    assert shas == [commit["sha"] for commit in commits[:3]]
+    assert len(handler.requests_received) == 2
@@ -0,0 +1,91 @@
+import contextvars
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from allspice import AllSpice, Repository
+from allspice.utils.netlist_generation import generate_netlist
+from allspice.utils.profiling import phase, profile
+
+REPO = {
+    "id": 1,
+    "name": "repo",
+    "owner": {"id": 2, "username": "owner", "email": ""},
+    "default_branch": "main",
+}
+
+PCB_JSON = {
+    "component_instances": {
+        "1": {
+            "designator": "R1",
+            "pads": {"1": {"designator": "1", "net_name": "GND"}},
+        },
+        "2": {
+            "designator": "C1",
+            "pads": {"1": {"designator": "1", "net_name": "GND"}},
+        },
+    }
+}
+
+
+def test_phase_does_nothing_without_profile():
+    with phase("outside"):
+        pass
+
+
+def test_profile_records_phases_run_in_threads():
+    def work():
+        for _ in range(2000):
+            with phase("fetch"):
+                pass
+
+    # Switch threads often, so that they race to record the phases.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with profile(trace_memory=False) as report:
+            with phase("outer"), ThreadPoolExecutor(max_workers=8) as executor:
+                for _ in range(8):
+                    executor.submit(contextvars.copy_context().run, work)
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert [phase.name for phase in report.phases] == ["outer/fetch", "outer"]
+    fetch = report.phase("outer/fetch")
+    assert fetch is not None
+    assert fetch.count == 8 * 2000
+
+
+def test_profile_records_nested_phases(stub_server):
+    handler, url = stub_server
+    responses = iter([(503, "{}", {}), (200, json.dumps(PCB_JSON), {})])
+    handler.responder = lambda method, path: next(responses)
+
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None, retry=None)
+    repo = Repository.parse_response(instance, REPO)
+
+    with profile(instance) as report:
+        netlist = generate_netlist(instance, repo, "board.PcbDoc")
+
+    assert netlist == {"GND": {"R1.1", "C1.1"}}
+    assert [phase.name for phase in report.phases] == [
+        "generate_netlist/fetch_pcb_json/wait_for_generation",
+        "generate_netlist/fetch_pcb_json",
+        "generate_netlist/group_netlist_entries",
+        "generate_netlist",
+    ]
+
+    fetch = report.phase("generate_netlist/fetch_pcb_json")
+    assert fetch is not None
+    assert fetch.api_calls == 2
+    assert fetch.peak_memory is not None and fetch.peak_memory > 0
+    wait = report.phase("generate_netlist/fetch_pcb_json/wait_for_generation")
+    assert wait is not None
+    assert wait.count == 1
+    assert wait.wall_time >= 0.5
+    assert report.api_calls == 2
+    assert "generate_netlist/group_netlist_entries" in report.format()
+    json.dumps(report.to_dict())
+
+    # Hooks are removed afterwards.
+    assert instance.requests.hooks["response"] == []
@@ -0,0 +1,64 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from allspice import AllSpice, Repository
+from allspice.projection import Projection, projection
+
+REPOS = [
+    {
+        "id": n,
+        "name": f"repo{n}",
+        "full_name": f"owner/repo{n}",
+        "updated_at": "2024-01-02T03:04:05Z",
+        "owner": {"id": 2, "login": "owner", "email": "owner@example.com"},
+    }
+    for n in range(3)
+]
+
+
+@pytest.fixture
+def instance(stub_server):
+    handler, url = stub_server
+
+    def responder(method, path):
+        if path.startswith("/api/v1/repos/search"):
+            page = int(parse_qs(urlparse(path).query)["page"][0])
+            return 200, json.dumps({"ok": True, "data": REPOS if page == 1 else []}), {}
+        return 404, "{}", {}
+
+    handler.responder = responder
+    return AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=None)
+
+
+def test_projection_keeps_only_requested_fields():
+    project = Projection(["name", "owner.login", "missing", "owner.login.deeper"])
+    record = project(REPOS[0])
+
+    assert record == ("repo0", "owner", None, None)
+    assert record.owner_login == "owner"
+    assert type(record) is type(Projection(project.fields)(REPOS[1]))
+    assert not hasattr(record, "__dict__")
+
+
+def test_projection_rejects_conflicting_arguments():
+    with pytest.raises(ValueError):
+        projection(["name"], raw=True)
+    with pytest.raises(TypeError):
+        Projection("name")
+    assert projection(None, raw=False) is None
+
+
+def test_search_with_fields(instance):
+    records = Repository.search(instance, "repo", fields=["full_name", "updated_at"])
+
+    assert [record.full_name for record in records] == [repo["full_name"] for repo in REPOS]
+    assert records[0].updated_at == "2024-01-02T03:04:05Z"
+
+
+def test_iter_search_raw(instance):
+    assert list(Repository.iter_search(instance, "repo", raw=True)) == REPOS
+    assert [repo.name for repo in Repository.iter_search(instance, "repo")] == [
+        repo["name"] for repo in REPOS
+    ]
@@ -0,0 +1,281 @@
+import asyncio
+import multiprocessing
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+from requests.structures import CaseInsensitiveDict
+
+from allspice import AllSpice, AsyncAllSpice
+from allspice.ratelimiter import (
+    AdaptiveRateLimiter,
+    Priority,
+    PriorityScheduler,
+    RateLimitedSession,
+    RateLimiter,
+    SharedRateLimiter,
+)
+
+
+def test_calls_within_limit_do_not_wait():
+    limiter = RateLimiter(max_calls=5, period=10)
+    assert [limiter.reserve() for _ in range(5)] == [0.0] * 5
+
+
+def test_window_is_sliding():
+    limiter = RateLimiter(max_calls=3, period=1)
+    delays = [limiter.reserve() for _ in range(7)]
+
+    assert delays[:3] == [0.0] * 3
+    # Calls 4-6 each wait until the call `max_calls` before them is a full
+    # period old, so there is never more than max_calls in any period.
+    for delay in delays[3:6]:
+        assert delay == pytest.approx(1.0, abs=0.05)
+    assert delays[6] == pytest.approx(2.0, abs=0.05)
+
+
+def test_burst_spaces_out_calls():
+    limiter = RateLimiter(max_calls=10, period=1, burst=2)
+    delays = [limiter.reserve() for _ in range(5)]
+
+    assert delays[:2] == [0.0, 0.0]
+    assert delays[2:] == pytest.approx([0.1, 0.2, 0.3], abs=0.02)
+
+
+def test_threads_share_budget_in_arrival_order():
+    limiter = RateLimiter(max_calls=4, period=0.2)
+    started = []
+    lock = threading.Lock()
+
+    def worker():
+        limiter.acquire()
+        with lock:
+            started.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(12)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    started.sort()
+    assert len(started) == 12
+    for first, fifth in zip(started, started[4:]):
+        # Allow for scheduling jitter when the threads wake up.
+        assert fifth - first >= 0.2 - 0.01
+
+
+def test_session_uses_shared_limiter():
+    limiter = RateLimiter(max_calls=2, period=1)
+    first = AllSpice(token_text="test", ratelimiting=limiter)
+    second = AllSpice(token_text="test", ratelimiting=limiter)
+
+    assert isinstance(first.requests, RateLimitedSession)
+    assert isinstance(second.requests, RateLimitedSession)
+    assert first.requests.limiter is second.requests.limiter is limiter
+    assert (first.requests.max_calls, first.requests.period) == (2, 1)
+
+
+def test_session_rate_limits_requests(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, '{"version": "1.0.0"}', {})
+
+    instance = AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=(3, 0.3))
+    start = time.monotonic()
+    for _ in range(4):
+        instance.get_version()
+
+    assert time.monotonic() - start >= 0.3
+
+
+def test_try_reserve_only_reserves_free_slots():
+    limiter = RateLimiter(max_calls=1, period=1)
+    assert limiter.try_reserve() == 0
+    assert limiter.try_reserve() == pytest.approx(1, abs=0.05)
+    # The failed attempt did not take a slot.
+    assert limiter.reserve() == pytest.approx(1, abs=0.05)
+
+
+def test_scheduler_lets_high_priority_skip_the_queue():
+    scheduler = PriorityScheduler(RateLimiter(max_calls=1, period=0.1))
+    scheduler.acquire()
+    order = []
+
+    def worker(name, priority):
+        scheduler.acquire(priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(f"low{i}", Priority.LOW)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.02)
+    high = threading.Thread(target=worker, args=("high", Priority.HIGH))
+    high.start()
+    for thread in [*threads, high]:
+        thread.join()
+
+    assert order[0] == "high"
+    assert sorted(order[1:]) == ["low0", "low1", "low2"]
+
+
+def test_client_priority_applies_to_bulk_operations():
+    instance = AllSpice(token_text="test", ratelimiting=(10, 1))
+    session = instance.requests
+    assert isinstance(session, RateLimitedSession)
+
+    with instance.priority(Priority.LOW):
+        summary = instance.bulk([session.scheduler.current_priority] * 2)
+    assert [result.value for result in summary.results] == [Priority.LOW] * 2
+    assert session.scheduler.current_priority() == Priority.NORMAL
+
+
+def test_priority_is_set_per_scheduler():
+    first = PriorityScheduler(RateLimiter(max_calls=1, period=1))
+    second = PriorityScheduler(first.limiter)
+
+    with first.priority(Priority.HIGH):
+        assert first.current_priority() == Priority.HIGH
+        assert second.current_priority() == Priority.NORMAL
+    assert first.current_priority() == Priority.NORMAL
+
+
+def test_async_scheduler_lets_high_priority_skip_the_queue():
+    scheduler = PriorityScheduler(RateLimiter(max_calls=1, period=0.1))
+    order = []
+
+    async def worker(name, priority):
+        with scheduler.priority(priority):
+            await scheduler.acquire_async()
+        order.append(name)
+
+    async def main():
+        await scheduler.acquire_async()
+        low = [asyncio.create_task(worker(f"low{i}", Priority.LOW)) for i in range(3)]
+        await asyncio.sleep(0.02)
+        # A thread waits in the same queue as the tasks.
+        thread = threading.Thread(target=lambda: order.append(("thread", scheduler.acquire())))
+        thread.start()
+        await asyncio.sleep(0.02)
+        await asyncio.gather(worker("high", Priority.HIGH), *low)
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(main())
+    assert order[0] == "high"
+    assert order[1] == ("thread", pytest.approx(0.15, abs=0.06))
+    assert sorted(order[2:]) == ["low0", "low1", "low2"]
+
+
+def test_async_client_priority(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, '{"version": "1.0.0"}', {})
+    client = AsyncAllSpice(allspice_hub_url=url, token_text="test", ratelimiting=(10, 1))
+    scheduler = client.scheduler
+    assert scheduler is not None
+
+    async def main():
+        with client.priority(Priority.LOW):
+            assert scheduler.current_priority() == Priority.LOW
+            await client.get_version()
+        await client.aclose()
+
+    asyncio.run(main())
+    assert len(handler.requests_received) == 1
+
+
+def response(status_code=200, headers=None):
+    return SimpleNamespace(status_code=status_code, headers=CaseInsensitiveDict(headers or {}))
+
+
+def test_adaptive_ramps_up_without_headers():
+    limiter = AdaptiveRateLimiter(max_calls=10, period=1, max_rate=12)
+    for _ in range(5):
+        limiter.observe(response())
+    assert limiter.rate == pytest.approx(12)
+
+
+def test_adaptive_backs_off_on_429():
+    limiter = AdaptiveRateLimiter(max_calls=10, period=1)
+    limiter.observe(response(429, {"Retry-After": "1"}))
+
+    assert limiter.rate == pytest.approx(5)
+    assert limiter.reserve() == pytest.approx(1, abs=0.05)
+
+
+def test_adaptive_slows_down_before_limit_is_reached():
+    limiter = AdaptiveRateLimiter(max_calls=10, period=1)
+    limiter.observe(
+        response(
+            headers={
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": "10",
+                "X-RateLimit-Reset": "5",
+            }
+        )
+    )
+    assert limiter.rate == pytest.approx(2)
+
+    limiter.observe(
+        response(
+            headers={
+                "X-RateLimit-Limit": "100",
+                "X-RateLimit-Remaining": "90",
+                "X-RateLimit-Reset": "5",
+            }
+        )
+    )
+    assert limiter.rate == pytest.approx(3)
+
+
+def test_adaptive_paces_calls_evenly():
+    limiter = AdaptiveRateLimiter(max_calls=10, period=1)
+    delays = [limiter.reserve() for _ in range(3)]
+    assert delays == pytest.approx([0, 0.1, 0.2], abs=0.02)
+
+
+def test_adaptive_observes_session_responses(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (
+        200,
+        '{"version": "1.0.0"}',
+        {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "1", "X-RateLimit-Reset": "10"},
+    )
+
+    limiter = AdaptiveRateLimiter(max_calls=60, period=1)
+    AllSpice(allspice_hub_url=url, token_text="test", ratelimiting=limiter).get_version()
+    assert limiter.rate == pytest.approx(limiter.min_rate)
+
+
+def reserve_from_process(limiter):
+    return [limiter.reserve() for _ in range(3)]
+
+
+def test_shared_limiter_shares_budget_between_processes(tmp_path):
+    limiter = SharedRateLimiter(tmp_path / "ratelimit.db", max_calls=3, period=1)
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        delays = sorted(
+            delay
+            for delays in executor.map(reserve_from_process, [limiter, limiter])
+            for delay in delays
+        )
+
+    # Six calls against a budget of three per second: the second three wait
+    # for the first ones to leave the window.
+    assert delays[:3] == pytest.approx([0, 0, 0], abs=0.5)
+    assert all(delay > 0.5 for delay in delays[3:])
+
+
+def test_shared_limiter_instances_share_budget(tmp_path):
+    first = SharedRateLimiter(tmp_path / "ratelimit.db", max_calls=2, period=1)
+    second = SharedRateLimiter(tmp_path / "ratelimit.db", max_calls=2, period=1)
+
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() == pytest.approx(1, abs=0.05)
+    assert isinstance(pickle.loads(pickle.dumps(first)), SharedRateLimiter)
+    session = AllSpice(token_text="test", ratelimiting=first).requests
+    assert isinstance(session, RateLimitedSession)
+    assert session.limiter is first
@@ -1,7 +1,8 @@
+import asyncio
+import functools
 import json
-import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import ClassVar
+import time
+from unittest.mock import MagicMock
 
 import pytest
 from requests.adapters import HTTPAdapter
@@ -10,6 +11,9 @@ from urllib3.util import Retry
 from allspice import AllSpice, NotFoundException
 from allspice.allspice import DEFAULT_RETRY
 from allspice.exceptions import InternalServerException, NotYetGeneratedException
+from allspice.utils import retry_generated
+from allspice.utils.core import get_all_pcb_components
+from allspice.utils.retry_generated import WaitStrategy
 
 
 def make_instance(url="https://example.com", **kwargs):
@@ -37,39 +41,6 @@ def test_none_opts_out():
     assert mounted_retries(make_instance(retry=None)).total == HTTPAdapter().max_retries.total
 
 
-@pytest.fixture
-def stub_server():
-    class Handler(BaseHTTPRequestHandler):
-        scripted_responses: ClassVar[list[tuple[int, str]]] = []
-        requests_received: ClassVar[list[str]] = []
-
-        def do_GET(self):
-            self._respond()
-
-        def do_POST(self):
-            self.rfile.read(int(self.headers.get("Content-Length", 0)))
-            self._respond()
-
-        def _respond(self):
-            self.requests_received.append(self.path)
-            status, body = self.scripted_responses[
-                min(len(self.requests_received) - 1, len(self.scripted_responses) - 1)
-            ]
-            self.send_response(status)
-            self.send_header("Content-type", "application/json")
-            self.end_headers()
-            self.wfile.write(body.encode())
-
-        def log_message(self, format, *args):
-            pass
-
-    server = HTTPServer(("localhost", 0), Handler)
-    thread = threading.Thread(target=server.serve_forever, daemon=True)
-    thread.start()
-    yield Handler, f"http://localhost:{server.server_port}"
-    server.shutdown()
-
-
 @pytest.mark.parametrize("status", [429, 502])
 def test_retries_by_default_then_succeeds(stub_server, status):
     handler, url = stub_server
@@ -122,3 +93,128 @@ def test_exhausted_retries_return_final_response(stub_server):
     with pytest.raises(Exception, match="429"):
         instance.requests_get("/version")
     assert len(handler.requests_received) == 3
+
+
+def test_wait_strategy_backs_off_exponentially():
+    wait = WaitStrategy(initial_delay=0.5, max_delay=3, jitter=0)
+    assert [wait.delay(attempt) for attempt in range(1, 6)] == [0.5, 1, 2, 3, 3]
+    assert wait.delay(1, retry_after=2) == 2
+    assert wait.delay(1, retry_after=60) == 3
+
+
+def failing(times, retry_after=None):
+    calls = []
+
+    def fn(*args):
+        calls.append(args)
+        if len(calls) <= times:
+            raise NotYetGeneratedException("503", retry_after=retry_after)
+        return "done"
+
+    return fn, calls
+
+
+def test_wait_strategy_uses_retry_after(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(retry_generated.time, "sleep", sleeps.append)
+    fn, calls = failing(2, retry_after=0.25)
+
+    assert WaitStrategy(initial_delay=5).call(fn) == "done"
+    assert sleeps == [0.25, 0.25]
+    assert len(calls) == 3
+
+
+def test_wait_strategy_gives_up_at_deadline():
+    fn, calls = failing(100)
+    wait = WaitStrategy(initial_delay=0.05, max_attempts=None, deadline=0.2)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        wait.call(fn)
+    assert 0.2 <= time.monotonic() - started < 0.4
+    assert 2 < len(calls) < 10
+
+
+def test_retry_not_yet_generated_uses_module_settings(monkeypatch):
+    monkeypatch.setattr(retry_generated, "SLEEP_FOR_GENERATED", 0)
+    monkeypatch.setattr(retry_generated, "MAX_RETRIES_FOR_GENERATED", 3)
+    fn, calls = failing(5, retry_after=1)
+
+    with pytest.raises(TimeoutError, match=r"JSON for foo\.SchDoc after 3 attempts"):
+        retry_generated.retry_not_yet_generated(fn, "foo.SchDoc", "main")
+    assert calls == [("foo.SchDoc", "main", None)] * 3
+
+
+def test_default_wait_strategy_keeps_the_total_budget(monkeypatch):
+    monkeypatch.setattr(retry_generated, "SLEEP_FOR_GENERATED", 2)
+    wait = retry_generated.default_wait_strategy()
+
+    assert wait.delay(1) <= 2 * (1 + wait.jitter)
+    assert wait.delay(4) > 2 * (1 + wait.jitter)
+    assert wait.delay(1, retry_after=5) == 5
+    assert wait.deadline == 20
+
+    monkeypatch.setattr(retry_generated, "SLEEP_FOR_GENERATED", 0)
+    wait = retry_generated.default_wait_strategy()
+    assert wait.delay(4, retry_after=5) == 0
+
+
+def test_retry_not_yet_generated_async():
+    fn, calls = failing(2)
+
+    async def method(*args):
+        return fn(*args)
+
+    wait = WaitStrategy(initial_delay=0.01, jitter=0)
+    result = asyncio.run(
+        retry_generated.retry_not_yet_generated_async(method, "foo.SchDoc", wait=wait)
+    )
+    assert result == "done"
+    assert len(calls) == 3
+
+
+def test_not_yet_generated_carries_retry_after(stub_server):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (503, "{}", {"Retry-After": "7"})
+
+    instance = make_instance(url=url, ratelimiting=None, retry=None)
+    with pytest.raises(NotYetGeneratedException) as info:
+        instance.requests_get("/repos/o/r/allspice_generated/json/file")
+    assert info.value.retry_after == 7
+
+
+def test_fetch_all_generated_requests_every_file_before_waiting():
+    calls = []
+
+    def fetch(name):
+        calls.append(name)
+        if calls.count(name) == 1:
+            raise NotYetGeneratedException("503", retry_after=0.2)
+        return name.upper()
+
+    fetches = {name: functools.partial(fetch, name) for name in ["a", "b", "c"]}
+    started = time.monotonic()
+    results = retry_generated.fetch_all_generated(fetches)
+
+    assert results == {"a": "A", "b": "B", "c": "C"}
+    assert sorted(calls[:3]) == ["a", "b", "c"]
+    # The files were waited for at the same time, not one after another.
+    assert time.monotonic() - started < 0.5
+
+
+def test_fetch_all_generated_times_out():
+    fn, _ = failing(100)
+    wait = WaitStrategy(initial_delay=0.01, max_attempts=3)
+
+    with pytest.raises(TimeoutError, match="slow after 3 attempts"):
+        retry_generated.fetch_all_generated({"fast": lambda: 1, "slow": fn}, wait=wait)
+
+
+def test_get_all_pcb_components_waits_for_generation():
+    fn, calls = failing(2)
+    repository = MagicMock()
+    repository.get_generated_json = lambda *args: {"component_instances": {"U1": fn(*args)}}
+    wait = WaitStrategy(initial_delay=0.01, jitter=0)
+
+    assert get_all_pcb_components(repository, "main", "Board.PcbDoc", wait=wait) == {"U1": "done"}
+    assert calls == [("Board.PcbDoc", "main", None)] * 3
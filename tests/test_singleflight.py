@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from allspice import AllSpice, AsyncAllSpice, NotFoundException
+
+
+def slow_responder(status=200):
+    def responder(method, path):
+        time.sleep(0.2)
+        return status, json.dumps({"path": path}), {}
+
+    return responder
+
+
+def test_concurrent_identical_gets_share_one_request(stub_server):
+    handler, url = stub_server
+    handler.responder = slow_responder()
+
+    instance = AllSpice(
+        allspice_hub_url=url, token_text="test", ratelimiting=None, coalesce_requests=True
+    )
+    barrier = threading.Barrier(8)
+
+    def get(params):
+        barrier.wait()
+        return instance.requests_get("/repos/owner/repo/git/trees/main", params)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(
+            executor.map(get, [{"recursive": "true"}] * 6 + [{"recursive": "false"}] * 2)
+        )
+
+    assert len(handler.requests_received) == 2
+    assert results[0] == results[5]
+    # Each caller gets its own parsed result.
+    assert results[0] is not results[5]
+
+
+def test_coalesced_errors_are_raised_by_every_caller(stub_server):
+    handler, url = stub_server
+    handler.responder = slow_responder(404)
+
+    instance = AllSpice(
+        allspice_hub_url=url, token_text="test", ratelimiting=None, coalesce_requests=True
+    )
+    barrier = threading.Barrier(4)
+
+    def get(_):
+        barrier.wait()
+        with pytest.raises(NotFoundException):
+            instance.requests_get("/repos/owner/repo")
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(get, range(4)))
+    assert len(handler.requests_received) == 1
+
+
+def test_async_concurrent_identical_gets_share_one_request(stub_server):
+    handler, url = stub_server
+    handler.responder = slow_responder()
+
+    async def main():
+        async with AsyncAllSpice(
+            allspice_hub_url=url, token_text="test", ratelimiting=None, coalesce_requests=True
+        ) as client:
+            results = await asyncio.gather(
+                *(client.requests_get("/repos/owner/repo/branches/main") for _ in range(5))
+            )
+            # Nothing is cached once the request is done.
+            await client.requests_get("/repos/owner/repo/branches/main")
+            return results
+
+    results = asyncio.run(main())
+    assert len(results) == 5
+    assert len(handler.requests_received) == 2
@@ -0,0 +1,103 @@
+import json
+import time
+
+import pytest
+import requests
+
+from allspice import AllSpice
+from allspice.transport import RecordTransport, ReplayTransport
+
+VERSION = {"version": "1.0.0"}
+
+
+def interaction(method, uri, status, body):
+    return {
+        "request": {"body": None, "headers": {}, "method": method, "uri": uri},
+        "response": {
+            "body": {"string": body},
+            "headers": {"Content-Type": ["application/json"]},
+            "status": {"code": status, "message": "OK" if status == 200 else "Unavailable"},
+        },
+    }
+
+
+@pytest.fixture
+def cassette(tmp_path):
+    path = tmp_path / "cassette.json"
+    path.write_text(
+        json.dumps(
+            {
+                "interactions": [
+                    interaction(
+                        "GET", "http://localhost:3000/api/v1/version", 200, '{"version": "1.0.0"}'
+                    ),
+                    interaction("GET", "http://localhost:3000/api/v1/file?a=1&b=2", 503, ""),
+                    interaction(
+                        "GET", "http://localhost:3000/api/v1/file?a=1&b=2", 200, '{"ok": true}'
+                    ),
+                ]
+            }
+        )
+    )
+    return path
+
+
+def test_replays_regardless_of_host(cassette):
+    instance = AllSpice(
+        allspice_hub_url="https://hub.example.com",
+        token_text="test",
+        ratelimiting=None,
+        transport=ReplayTransport(cassette),
+    )
+    assert instance.requests_get("/version") == VERSION
+
+
+def test_replays_repeated_requests_in_order(cassette):
+    session = requests.Session()
+    session.mount("http://", ReplayTransport(cassette))
+
+    statuses = [session.get("http://any/api/v1/file?b=2&a=1").status_code for _ in range(3)]
+    assert statuses == [503, 200, 200]
+
+
+def test_unknown_requests_raise(cassette):
+    session = requests.Session()
+    session.mount("http://", ReplayTransport(cassette))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get("http://any/api/v1/users")
+
+
+def test_simulates_latency(cassette):
+    session = requests.Session()
+    session.mount("http://", ReplayTransport(cassette, latency=0.05, jitter=0.01, seed=1))
+
+    start = time.monotonic()
+    session.get("http://any/api/v1/version")
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.parametrize("name", ["cassette.json", "cassette.yaml"])
+def test_recorded_cassette_replays(stub_server, tmp_path, name):
+    handler, url = stub_server
+    handler.responder = lambda method, path: (200, json.dumps(VERSION), {})
+
+    path = tmp_path / name
+    recording = AllSpice(
+        allspice_hub_url=url,
+        token_text="secret",
+        ratelimiting=None,
+        transport=RecordTransport(path),
+    )
+    assert recording.requests_get("/version") == VERSION
+    recording.requests.close()
+
+    assert "secret" not in path.read_text()
+    replaying = AllSpice(
+        allspice_hub_url=url,
+        token_text="test",
+        ratelimiting=None,
+        transport=ReplayTransport(path),
+    )
+    assert replaying.requests_get("/version") == VERSION
+    assert len(handler.requests_received) == 1